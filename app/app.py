@@ -1,6 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from app.controllers.utils.ping import router as ping_router
 from app.controllers.utils.reset import router as reset_router
+from app.controllers.utils.metrics import router as metrics_router
 from app.controllers.users import router as users_router
 from app.controllers.organizers import router as organizers_router
 from app.controllers.events import router as events_router
@@ -8,7 +9,12 @@ from app.controllers.favourites import router as favourites_router
 from app.controllers.bookings import router as bookings_router
 from app.controllers.complaints import router as complaints_router
 from app.controllers.stats import router as stats_router
-from app.config.constants import PORT
+from app.controllers.export import router as export_router
+from app.config.constants import DB_MONITORING, PORT
+from app.repositories.dependencies import rollup_repository
+from app.utils.jobs import schedulers
+from app.repositories.monitoring import track_db_operations
+from app.repositories.indexes import create_indexes, check_indexes
 from app.utils.config import log_config
 
 from app.config.logger import setup_logger
@@ -27,11 +33,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+
+@app.middleware("http")
+async def count_db_operations(request: Request, call_next):
+    # Commands are only counted with DB_MONITORING set, as in tests and benchmarks
+    if not DB_MONITORING:
+        return await call_next(request)
+    with track_db_operations() as operations:
+        response = await call_next(request)
+    response.headers["X-DB-Operations"] = str(operations.calls)
+    return response
+
+
+# Runs before the schedulers, so their jobs find the indexes in place
+@app.on_event("startup")
+async def prepare_database():
+    create_indexes()
+    check_indexes()
+    if rollup_repository.is_empty():
+        logger.warning("Stats rollups are empty, run make migrate to build them")
+
+
+# Background jobs
+@app.on_event("startup")
+async def start_schedulers():
+    for scheduler in schedulers:
+        scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_schedulers():
+    for scheduler in schedulers:
+        await scheduler.stop()
+
+
 # Routes
 app.include_router(ping_router, prefix="/api")
 app.include_router(reset_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
 app.include_router(organizers_router, prefix="/api")
 app.include_router(events_router, prefix="/api")
@@ -39,6 +81,7 @@ app.include_router(favourites_router, prefix="/api")
 app.include_router(bookings_router, prefix="/api")
 app.include_router(complaints_router, prefix="/api")
 app.include_router(stats_router, prefix="/api")
+app.include_router(export_router, prefix="/api")
 
 logger.info(f"Server started on port: {PORT}")
 log_config()
@@ -1,4 +1,12 @@
-from app.schemas.bookings import BookingCreateSchema, BookingSchema
+from collections import Counter
+from datetime import datetime, timedelta
+from app.schemas.bookings import (
+    BookingCreateSchema,
+    BookingManifestSchema,
+    BookingScanResultSchema,
+    BookingScanSchema,
+    BookingSchema,
+)
 from app.models.booking import Booking
 
 from .errors import (
@@ -8,20 +16,31 @@ from .errors import (
     BookingAlreadyVerifiedError,
     EventNotPublishedError,
     EventFinishedError,
+    InvalidSyncTokenError,
 )
 from app.repositories.bookings import (
     BookingRepository,
+    VERIFIED_TIME_FORMAT,
 )
 from app.repositories.event import EventRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.errors import BookingNotFoundError, DuplicatedBookingError
+from app.models.errors import BusinessError
 from app.config.logger import setup_logger
 import uuid
-from typing import List
+from typing import List, Optional
 from app.schemas.event import State
 from app.schemas.stats import EventBookingsByHourStatSchema
-from app.utils.now import getNow
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.now import getNow, getTimezone
 
 logger = setup_logger(__name__)
 
+MANIFEST_VERSION = 1
+# Deltas read a bit before the token, for writes that were in flight when it
+# was taken. Adding a booking or a verification twice changes nothing.
+SYNC_OVERLAP = timedelta(seconds=5)
+
 
 class CreateBookingCommand:
     def __init__(
@@ -42,6 +61,18 @@ class CreateBookingCommand:
             verified=False,
             verified_time="Not_verified",
         )
+        event = self.event_repository.reserve_vacant(booking.event_id)
+        if event is None:
+            self.raise_reservation_error(booking)
+        try:
+            booking = self.booking_repository.add_booking(booking)
+        except DuplicatedBookingError:
+            self.event_repository.release_vacant(booking.event_id)
+            raise BookingAlreadyExistsError
+
+        return BookingSchema.from_model(booking)
+
+    def raise_reservation_error(self, booking: Booking):
         already_exists = self.booking_repository.booking_exists(
             booking.event_id, booking.reserver_id
         )
@@ -56,12 +87,7 @@ class CreateBookingCommand:
         time = getNow().time()
         if event.date < now or (event.date == now and event.end_time < time):
             raise EventFinishedError
-        self.event_repository.update_vacants_left_event(
-            event.id, event.vacants_left - 1
-        )
-        booking = self.booking_repository.add_booking(booking)
-
-        return BookingSchema.from_model(booking)
+        raise EventFullError
 
 
 class GetBookingsByReserverCommand:
@@ -97,27 +123,96 @@ class VerifyBookingCommand:
         event_repository: EventRepository,
         booking_id: str,
         event_id: str,
+        rollup_repository: StatsRollupRepository,
     ):
         self.booking_repository = booking_repository
         self.booking_id = booking_id
         self.event_id = event_id
         self.event_repository = event_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> BookingSchema:
-        booking = self.booking_repository.get_booking(self.booking_id)
-        if booking.event_id != self.event_id:
-            raise IncorrectEventError
-        if booking.verified:
-            raise BookingAlreadyVerifiedError
-        booking = self.booking_repository.verify_booking(self.booking_id)
-        event = self.event_repository.get_event(self.event_id)
-        self.event_repository.update_verified_vacants(
-            self.event_id, event.verified_vacants + 1
+        verified_time = getNow().strftime(VERIFIED_TIME_FORMAT)
+        booking = self.booking_repository.check_in(
+            self.booking_id, self.event_id, verified_time
+        )
+        if booking is None:
+            raise check_in_error(
+                self.booking_repository.get_booking(self.booking_id), self.event_id
+            )
+        event = self.event_repository.add_verified_vacants(self.event_id, 1)
+        self.rollup_repository.verify_booking(
+            booking.verified_time, event.organizer, str(event.created_at)
         )
 
         return BookingSchema.from_model(booking)
 
 
+class VerifyBookingsCommand:
+    def __init__(
+        self,
+        booking_repository: BookingRepository,
+        event_repository: EventRepository,
+        scans: List[BookingScanSchema],
+        rollup_repository: StatsRollupRepository,
+    ):
+        self.booking_repository = booking_repository
+        self.event_repository = event_repository
+        self.scans = scans
+        self.rollup_repository = rollup_repository
+
+    def execute(self) -> List[BookingScanResultSchema]:
+        bookings = {
+            booking.id: booking
+            for booking in self.booking_repository.get_bookings(
+                [scan.booking_id for scan in self.scans]
+            )
+        }
+        results = []
+        checked_in = {}
+        for index, scan in enumerate(self.scans):
+            booking = bookings.get(scan.booking_id)
+            if booking is None:
+                error = BookingNotFoundError()
+            elif booking.event_id != scan.event_id or booking.verified:
+                # Also a repeated scan of a booking checked in earlier in the batch
+                error = check_in_error(booking, scan.event_id)
+            else:
+                booking.verified = True
+                booking.verified_time = scan_time(scan.scanned_at)
+                checked_in[index] = booking
+                results.append(
+                    BookingScanResultSchema(index=index, status=200, id=booking.id)
+                )
+                continue
+            results.append(scan_error(index, scan.booking_id, error))
+
+        verified = self.booking_repository.check_in_many(list(checked_in.values()))
+        verified_ids = {booking.id for booking in verified}
+        for index, booking in checked_in.items():
+            if booking.id not in verified_ids:
+                results[index] = scan_error(
+                    index, booking.id, BookingAlreadyVerifiedError()
+                )
+
+        events = {
+            event_id: self.event_repository.add_verified_vacants(event_id, count)
+            for event_id, count in Counter(
+                booking.event_id for booking in verified
+            ).items()
+        }
+        hours = Counter(
+            (booking.verified_time[:13], booking.event_id) for booking in verified
+        )
+        for (hour, event_id), count in hours.items():
+            event = events[event_id]
+            self.rollup_repository.verify_booking(
+                hour, event.organizer, str(event.created_at), count
+            )
+        logger.info(f"Checked in {len(verified)} of {len(self.scans)} scans")
+        return results
+
+
 class GetBookingsByEventCommand:
     def __init__(self, booking_repository: BookingRepository, event_id: str):
         self.booking_repository = booking_repository
@@ -139,6 +234,36 @@ class GetBookingsByEventVerifiedCommand:
         return [BookingSchema.from_model(booking) for booking in sorted_bookings]
 
 
+class GetBookingsManifestCommand:
+    def __init__(
+        self,
+        booking_repository: BookingRepository,
+        event_repository: EventRepository,
+        event_id: str,
+        sync_token: Optional[str],
+    ):
+        self.booking_repository = booking_repository
+        self.event_repository = event_repository
+        self.event_id = event_id
+        self.sync_token = sync_token
+
+    def execute(self) -> BookingManifestSchema:
+        since = None
+        if self.sync_token:
+            since = decode_sync_token(self.sync_token) - SYNC_OVERLAP
+        self.event_repository.get_event(self.event_id)
+        # Taken before reading, so what is written meanwhile is in the next delta
+        synced_at = getNow()
+        bookings = self.booking_repository.get_bookings_by_event(self.event_id, since)
+        return BookingManifestSchema(
+            event_id=self.event_id,
+            full=since is None,
+            bookings=sorted(booking.id for booking in bookings),
+            verified=sorted(booking.id for booking in bookings if booking.verified),
+            sync_token=encode_cursor([MANIFEST_VERSION, synced_at.isoformat()]),
+        )
+
+
 class GetBookingsByHourCommand:
     def __init__(self, booking_repository: BookingRepository, event_id: str):
         self.booking_repository = booking_repository
@@ -148,3 +273,33 @@ class GetBookingsByHourCommand:
         stats = self.booking_repository.get_bookings_by_hour(self.event_id)
         sorted_stats = sorted(stats, key=lambda x: x.time)
         return [EventBookingsByHourStatSchema.from_model(stat) for stat in sorted_stats]
+
+
+def check_in_error(booking: Booking, event_id: str) -> BusinessError:
+    if booking.event_id != event_id:
+        return IncorrectEventError()
+    return BookingAlreadyVerifiedError()
+
+
+def scan_error(index: int, id: str, error: Exception) -> BookingScanResultSchema:
+    status = 404 if isinstance(error, BookingNotFoundError) else 400
+    return BookingScanResultSchema(index=index, status=status, id=id, detail=str(error))
+
+
+def scan_time(scanned_at: Optional[datetime]) -> str:
+    # Scanners may send their own offset; times are kept in local time
+    if scanned_at is None:
+        return getNow().strftime(VERIFIED_TIME_FORMAT)
+    if scanned_at.tzinfo is not None:
+        scanned_at = scanned_at.astimezone(getTimezone())
+    return scanned_at.strftime(VERIFIED_TIME_FORMAT)
+
+
+def decode_sync_token(sync_token: str) -> datetime:
+    try:
+        version, synced_at = decode_cursor(sync_token)
+        if version != MANIFEST_VERSION:
+            raise InvalidSyncTokenError
+        return datetime.fromisoformat(synced_at)
+    except (ValueError, TypeError):
+        raise InvalidSyncTokenError
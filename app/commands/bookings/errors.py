@@ -35,3 +35,9 @@ class EventFinishedError(BusinessError):
     def __init__(self):
         msg = "event_already_finished"
         super().__init__(msg)
+
+
+class InvalidSyncTokenError(BusinessError):
+    def __init__(self):
+        msg = "invalid_sync_token"
+        super().__init__(msg)
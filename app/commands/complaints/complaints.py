@@ -7,6 +7,7 @@ from app.schemas.complaints import (
 from app.models.complaint import Complaint
 from app.repositories.complaints import ComplaintRepository, Filter
 from app.repositories.event import EventRepository
+from app.repositories.rollups import StatsRollupRepository
 from app.config.logger import setup_logger
 from typing import List
 from app.commands.complaints.errors import ComplaintAlreadyExistsError
@@ -20,10 +21,12 @@ class CreateComplaintCommand:
         complaint_repository: ComplaintRepository,
         event_repository: EventRepository,
         complaint: ComplaintCreateSchema,
+        rollup_repository: StatsRollupRepository,
     ):
         self.complaint_repository = complaint_repository
         self.complaint_data = complaint
         self.event_repository = event_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> ComplaintSchema:
         event = self.event_repository.get_event(self.complaint_data.event_id)
@@ -42,6 +45,7 @@ class CreateComplaintCommand:
         )
 
         complaint = self.complaint_repository.add_complaint(complaint)
+        self.rollup_repository.add_complaint(str(complaint.date))
 
         return ComplaintSchema.from_model(complaint)
 
@@ -101,3 +101,21 @@ class TimeCanNotBeUpdatedWithoutAgendaError(BusinessError):
     def __init__(self):
         msg = "time_can_not_be_updated_without_agenda"
         super().__init__(msg)
+
+
+class TooManyEventsError(BusinessError):
+    def __init__(self):
+        msg = "too_many_events"
+        super().__init__(msg)
+
+
+class EventNotInsertedError(BusinessError):
+    def __init__(self):
+        msg = "event_not_inserted"
+        super().__init__(msg)
+
+
+class EventSkippedError(BusinessError):
+    def __init__(self):
+        msg = "event_skipped_after_failure"
+        super().__init__(msg)
@@ -1,10 +1,27 @@
 import json
+from collections import Counter
 from typing import List
-from app.models.event import Agenda, Event, Faq, Location, State, Collaborator
-from app.schemas.event import EventCreateSchema, EventSchema, EventUpdateSchema
+from pydantic import ValidationError
+from app.models.event import (
+    Agenda,
+    Event,
+    EventView,
+    Faq,
+    Location,
+    State,
+    Collaborator,
+)
+from app.schemas.event import (
+    EventCreateSchema,
+    EventSchema,
+    EventUpdateSchema,
+    EventPageSchema,
+    EventResultSchema,
+    EventSummaryResultSchema,
+    BulkEventResultSchema,
+)
 from .errors import (
     EventAlreadyExistsError,
-    EventNotFoundError,
     AgendaEmptyError,
     AgendaEmptySpaceError,
     AgendaOverlapError,
@@ -20,15 +37,24 @@ from .errors import (
     EventTimeError,
     AgendaDoesNotEndError,
     TimeCanNotBeUpdatedWithoutAgendaError,
+    TooManyEventsError,
+    EventNotInsertedError,
+    EventSkippedError,
 )
 from app.repositories.event import (
     EventRepository,
     Search,
 )
 from app.repositories.organizers import OrganizerRepository
+from app.repositories.suggestions import SuggestionRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.schemas.suggestion import SuggestionSchema
+from app.repositories.errors import OrganizerNotFoundError
 from app.config.logger import setup_logger
+from app.utils.error import TicketAppError
 from datetime import time
 from app.utils.now import getNow
+from app.utils.cursor import encode_cursor
 
 logger = setup_logger(__name__)
 
@@ -38,88 +64,99 @@ class CreateEventCommand:
         self,
         event_repository: EventRepository,
         event: EventCreateSchema,
+        rollup_repository: StatsRollupRepository,
     ):
         self.event_repository = event_repository
         self.event_data = event
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> EventSchema:
-        location = Location(
-            description=self.event_data.location.description,
-            lat=self.event_data.location.lat,
-            lng=self.event_data.location.lng,
-        )
-        agenda = [
-            Agenda(
-                time_init=element.time_init,
-                time_end=element.time_end,
-                owner=element.owner,
-                title=element.title,
-                description=element.description,
-            )
-            for element in self.event_data.agenda
-        ]
-
-        faq = [
-            Faq(
-                question=element.question,
-                answer=element.answer,
-            )
-            for element in self.event_data.FAQ
-        ]
-        if len(faq) > 30:
-            raise TooManyFaqsError
-
-        today = getNow().date()
-        event = Event.new(
-            name=self.event_data.name,
-            description=self.event_data.description,
-            location=location,
-            type=self.event_data.type,
-            images=self.event_data.images,
-            preview_image=self.event_data.preview_image,
-            date=self.event_data.date,
-            organizer=self.event_data.organizer,
-            start_time=self.event_data.start_time,
-            end_time=self.event_data.end_time,
-            scan_time=self.event_data.scan_time,
-            agenda=agenda,
-            vacants=self.event_data.vacants,
-            vacants_left=self.event_data.vacants,
-            FAQ=faq,
-            created_at=today,
-        )
-        if event.start_time >= event.end_time:
-            raise EventTimeError
-        verify_agenda(agenda, event.end_time)
+        event = new_event(self.event_data)
         already_exists = self.event_repository.event_exists(event.id)
         if already_exists:
             raise EventAlreadyExistsError
-        if len(event.images) > 9:
-            raise TooManyImagesError
         event = self.event_repository.add_event(event)
+        self.rollup_repository.add_event(str(event.created_at))
 
         return EventSchema.from_model(event)
 
 
+class CreateEventsCommand:
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        events: List[dict],
+        rollup_repository: StatsRollupRepository,
+        ordered: bool,
+        limit: int,
+    ):
+        self.event_repository = event_repository
+        self.events_data = events
+        self.rollup_repository = rollup_repository
+        self.ordered = ordered
+        self.limit = limit
+
+    def execute(self) -> List[BulkEventResultSchema]:
+        if len(self.events_data) > self.limit:
+            raise TooManyEventsError
+        results = []
+        events = {}
+        for index, data in enumerate(self.events_data):
+            try:
+                event = new_event(EventCreateSchema.parse_obj(data))
+            except ValidationError as e:
+                results.append(
+                    BulkEventResultSchema(index=index, status=422, detail=e.errors())
+                )
+                continue
+            except TicketAppError as e:
+                results.append(
+                    BulkEventResultSchema(index=index, status=400, detail=str(e))
+                )
+                continue
+            events[index] = event
+            results.append(BulkEventResultSchema(index=index, status=201, id=event.id))
+
+        inserted, duplicated, failed = self.event_repository.add_events(
+            list(events.values()), self.ordered
+        )
+        inserted_ids = {event.id for event in inserted}
+        for index, event in events.items():
+            if event.id in duplicated:
+                results[index] = BulkEventResultSchema(
+                    index=index, status=400, detail=str(EventAlreadyExistsError())
+                )
+            elif event.id in failed:
+                results[index] = BulkEventResultSchema(
+                    index=index, status=500, detail=str(EventNotInsertedError())
+                )
+            elif event.id not in inserted_ids:
+                # Not attempted, as an ordered insert stops at the first failure
+                results[index] = BulkEventResultSchema(
+                    index=index, status=424, detail=str(EventSkippedError())
+                )
+        for created_at, count in Counter(
+            str(event.created_at) for event in inserted
+        ).items():
+            self.rollup_repository.add_event(created_at, count)
+        logger.info(f"Bulk created {len(inserted)} of {len(self.events_data)} events")
+        return results
+
+
 class GetEventCommand:
     def __init__(self, event_repository: EventRepository, _id: str):
         self.event_repository = event_repository
         self.id = _id
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
         event = self.event_repository.get_event(self.id)
         event_with_finished = self.check_finished(event)
 
         return EventSchema.from_model(event_with_finished)
 
     def check_finished(self, event: Event) -> Event:
-        now = getNow().date()
-        time = getNow().time()
-        if event.date < now or (event.date == now and event.end_time < time):
-            event = self.event_repository.update_state_event(event.id, State.Finalizado)
+        if is_finished(event):
+            event.state = State.Finalizado
         return event
 
 
@@ -128,68 +165,164 @@ class SearchEventsCommand:
         self,
         event_repository: EventRepository,
         search: Search,
+        view: EventView = EventView.full,
     ):
         self.event_repository = event_repository
         self.search = search
+        self.view = view
 
-    def execute(self) -> List[EventSchema]:
-        events = self.event_repository.search_events(self.search)
-        events_with_finished = self.check_finished(events)
-        if not self.search.organizer:
-            events_ordered = sorted(
-                events_with_finished, key=lambda h: (h.vacants), reverse=False
-            )
+    def execute(self) -> EventPageSchema:
+        if self.view == EventView.summary:
+            events = self.event_repository.search_event_summaries(self.search)
+            schema = EventSummaryResultSchema
         else:
-            events_ordered = sorted(
-                events_with_finished,
-                key=lambda h: (h.date, h.start_time),
-                reverse=False,
-            )
-        return list(map(EventSchema.from_model, events_ordered))
+            events = self.event_repository.search_events(self.search)
+            schema = EventResultSchema
+        events_with_finished = self.check_finished(events)
+        next_cursor = None
+        if len(events) == self.search.limit:
+            next_cursor = encode_cursor(self.search.sort_values(events[-1]))
+        return EventPageSchema(
+            events=list(map(schema.from_model, events_with_finished)),
+            next_cursor=next_cursor,
+        )
 
     def check_finished(self, events: List[Event]) -> List[Event]:
-        now = getNow().date()
-        time = getNow().time()
         new_events = []
         for event in events:
-            if event.date < now or (event.date == now and event.end_time < time):
-                event = self.event_repository.update_state_event(
-                    event.id, State.Finalizado
-                )
+            if is_finished(event):
+                event.state = State.Finalizado
             new_events.append(event)
         return new_events
 
 
+class FinalizeEventsCommand:
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        rollup_repository: StatsRollupRepository,
+    ):
+        self.event_repository = event_repository
+        self.rollup_repository = rollup_repository
+
+    def execute(self) -> int:
+        now = getNow()
+        # Counted before finalizing, with the same cutoff, so the rollups
+        # move exactly the events being finalized
+        expired = self.event_repository.get_expired_events_stat(now)
+        finalized = self.event_repository.update_state_all_events(now)
+        for stat in expired:
+            self.rollup_repository.change_state(
+                stat.created_at, stat.state, State.Finalizado, stat.events
+            )
+        return finalized
+
+
+class SuggestEventsCommand:
+    def __init__(
+        self, suggestion_repository: SuggestionRepository, query: str, limit: int
+    ):
+        self.suggestion_repository = suggestion_repository
+        self.query = query
+        self.limit = limit
+
+    def execute(self) -> List[SuggestionSchema]:
+        now = getNow()
+        suggestions = self.suggestion_repository.suggest(
+            self.query, self.limit, f"{now.date()}T{now.time()}"
+        )
+        return list(map(SuggestionSchema.from_model, suggestions))
+
+
+class RebuildSuggestionsCommand:
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        organizer_repository: OrganizerRepository,
+        suggestion_repository: SuggestionRepository,
+    ):
+        self.event_repository = event_repository
+        self.organizer_repository = organizer_repository
+        self.suggestion_repository = suggestion_repository
+
+    def execute(self) -> int:
+        search = Search(
+            organizer=None,
+            type=None,
+            location=None,
+            limit=0,
+            name=None,
+            only_published=True,
+            not_finished=True,
+        )
+        events = self.event_repository.search_event_summaries(search)
+        organizers = self.organizer_repository.get_organizers_by_id(
+            list({event.organizer for event in events})
+        )
+        organizers = [organizer for organizer in organizers if not organizer.suspended]
+        self.suggestion_repository.replace_all(events, organizers)
+        return len(events) + len(organizers)
+
+
 class PublishEventCommand:
-    def __init__(self, event_repository: EventRepository, _id: str):
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        _id: str,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
+    ):
         self.event_repository = event_repository
         self.id = _id
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
-        event = self.event_repository.get_event(self.id)
-        if event.state == State.Borrador:
-            event = self.event_repository.update_state_event(self.id, State.Publicado)
-            event = self.event_repository.update_published_at(
-                self.id, str(getNow().date())
-            )
-        else:
+        # Checked against the state in the database, as the cached copy may
+        # be outdated
+        transition = self.event_repository.transition_event(
+            self.id,
+            [State.Borrador],
+            State.Publicado,
+            published_at=str(getNow().date()),
+        )
+        if transition is None:
             raise EventNotBorradorError
+        _, event = transition
+        self.rollup_repository.change_state(
+            str(event.created_at), State.Borrador, State.Publicado
+        )
+        self.rollup_repository.publish_event(event.published_at)
+        self.suggestion_repository.add_event(event)
         return EventSchema.from_model(event)
 
 
 class CancelEventCommand:
-    def __init__(self, event_repository: EventRepository, _id: str):
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        _id: str,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
+    ):
         self.event_repository = event_repository
         self.id = _id
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
-        event = self.event_repository.update_state_event(self.id, State.Cancelado)
+        transition = self.event_repository.transition_event(
+            self.id,
+            [state for state in State if state != State.Cancelado],
+            State.Cancelado,
+        )
+        if transition is None:
+            return EventSchema.from_model(self.event_repository.get_event(self.id))
+        previous, event = transition
+        self.rollup_repository.change_state(
+            str(event.created_at), previous.state, State.Cancelado
+        )
+        self.suggestion_repository.remove_event(self.id)
         return EventSchema.from_model(event)
 
 
@@ -199,10 +332,12 @@ class UpdateEventCommand:
         event_repository: EventRepository,
         update: EventUpdateSchema,
         id: str,
+        suggestion_repository: SuggestionRepository,
     ):
         self.event_repository = event_repository
         self.update = update
         self.id = id
+        self.suggestion_repository = suggestion_repository
 
     def execute(self) -> EventSchema:
         if self.update.start_time and not self.update.agenda:
@@ -281,45 +416,77 @@ class UpdateEventCommand:
         if event.start_time >= event.end_time:
             raise EventTimeError
         verify_agenda(event.agenda, event.end_time)
+        # The event read may be an outdated cached copy: vacants are moved
+        # against the booked ones in the database and the rest of the update
+        # leaves the counters and the state alone
+        if self.update.vacants and (
+            self.event_repository.update_vacants(self.id, self.update.vacants) is None
+        ):
+            raise VacantsCannotBeUpdatedError
         event = self.event_repository.update_event(event)
+        if event is None:
+            raise EventCannotBeUpdatedError
+        if event.state == State.Publicado:
+            self.suggestion_repository.add_event(event)
 
         return EventSchema.from_model(event)
 
 
 class SuspendEventCommand:
-    def __init__(self, event_repository: EventRepository, _id: str):
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        _id: str,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
+    ):
         self.event_repository = event_repository
         self.id = _id
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
-        event = self.event_repository.get_event(self.id)
-        if event.state == State.Publicado:
-            event = self.event_repository.update_state_event(self.id, State.Suspendido)
-            event = self.event_repository.update_suspended_at(
-                self.id, str(getNow().date())
-            )
-        else:
+        transition = self.event_repository.transition_event(
+            self.id,
+            [State.Publicado],
+            State.Suspendido,
+            suspended_at=str(getNow().date()),
+        )
+        if transition is None:
             raise EventCannotBeSuspendedError
+        previous, event = transition
+        self.rollup_repository.change_state(
+            str(event.created_at), State.Publicado, State.Suspendido
+        )
+        self.rollup_repository.suspend_event(event.suspended_at, previous.suspended_at)
+        self.suggestion_repository.remove_event(self.id)
         return EventSchema.from_model(event)
 
 
 class UnSuspendEventCommand:
-    def __init__(self, event_repository: EventRepository, _id: str):
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        _id: str,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
+    ):
         self.event_repository = event_repository
         self.id = _id
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
-        event = self.event_repository.get_event(self.id)
-        if event.state == State.Suspendido:
-            event = self.event_repository.update_state_event(self.id, State.Publicado)
-        else:
+        transition = self.event_repository.transition_event(
+            self.id, [State.Suspendido], State.Publicado
+        )
+        if transition is None:
             raise EventCannotBeUnSuspendedError
+        _, event = transition
+        self.rollup_repository.change_state(
+            str(event.created_at), State.Suspendido, State.Publicado
+        )
+        self.suggestion_repository.add_event(event)
         return EventSchema.from_model(event)
 
 
@@ -337,24 +504,15 @@ class AddCollaboratorEventCommand:
         self.collaborator_email = collaborator_email
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
-        collaborator_exists = self.organizer_repository.organizer_exists_by_email(
-            self.collaborator_email
-        )
-        if not collaborator_exists:
+        self.event_repository.get_event(self.id)
+        try:
+            collaborator = self.organizer_repository.get_organizer_by_email(
+                self.collaborator_email
+            )
+        except OrganizerNotFoundError:
             raise CollaboratorNotFoundError
-        collaborator = self.organizer_repository.get_organizer_by_email(
-            self.collaborator_email
-        )
-        event = self.event_repository.get_event(self.id)
-        collaborators = event.collaborators
         collaborator = Collaborator(id=collaborator.id, email=collaborator.email)
-        if collaborator not in collaborators:
-            collaborators.append(collaborator)
-        event.collaborators = collaborators
-        event = self.event_repository.update_event(event)
+        event = self.event_repository.add_collaborator(self.id, collaborator)
         return EventSchema.from_model(event)
 
 
@@ -372,26 +530,77 @@ class RemoveCollaboratorEventCommand:
         self.collaborator_id = collaborator_id
 
     def execute(self) -> EventSchema:
-        exists = self.event_repository.event_exists(self.id)
-        if not exists:
-            raise EventNotFoundError
         event = self.event_repository.get_event(self.id)
-        collaborators = event.collaborators
 
-        collaborator_exists = self.organizer_repository.organizer_exists(
-            self.collaborator_id
-        )
-        if collaborator_exists:
+        try:
             collaborator = self.organizer_repository.get_organizer(self.collaborator_id)
-            collaborator = Collaborator(id=collaborator.id, email=collaborator.email)
-            if collaborator in collaborators:
-                collaborators.remove(collaborator)
-            event.collaborators = collaborators
-
-        event = self.event_repository.update_event(event)
+        except OrganizerNotFoundError:
+            collaborator = None
+        if collaborator:
+            event = self.event_repository.remove_collaborator(self.id, collaborator.id)
         return EventSchema.from_model(event)
 
 
+def is_finished(event: Event) -> bool:
+    now = getNow().date()
+    time = getNow().time()
+    return event.date < now or (event.date == now and event.end_time < time)
+
+
+def new_event(event_data: EventCreateSchema) -> Event:
+    location = Location(
+        description=event_data.location.description,
+        lat=event_data.location.lat,
+        lng=event_data.location.lng,
+    )
+    agenda = [
+        Agenda(
+            time_init=element.time_init,
+            time_end=element.time_end,
+            owner=element.owner,
+            title=element.title,
+            description=element.description,
+        )
+        for element in event_data.agenda
+    ]
+
+    faq = [
+        Faq(
+            question=element.question,
+            answer=element.answer,
+        )
+        for element in event_data.FAQ
+    ]
+    if len(faq) > 30:
+        raise TooManyFaqsError
+
+    today = getNow().date()
+    event = Event.new(
+        name=event_data.name,
+        description=event_data.description,
+        location=location,
+        type=event_data.type,
+        images=event_data.images,
+        preview_image=event_data.preview_image,
+        date=event_data.date,
+        organizer=event_data.organizer,
+        start_time=event_data.start_time,
+        end_time=event_data.end_time,
+        scan_time=event_data.scan_time,
+        agenda=agenda,
+        vacants=event_data.vacants,
+        vacants_left=event_data.vacants,
+        FAQ=faq,
+        created_at=today,
+    )
+    if event.start_time >= event.end_time:
+        raise EventTimeError
+    verify_agenda(agenda, event.end_time)
+    if len(event.images) > 9:
+        raise TooManyImagesError
+    return event
+
+
 def verify_agenda(agenda: List[Agenda], end_time: str):
     if len(agenda) == 0:
         raise AgendaEmptyError
@@ -0,0 +1 @@
+from .export import *
@@ -0,0 +1,65 @@
+from typing import Iterator, Optional
+from app.repositories.bookings import BookingRepository
+from app.repositories.complaints import ComplaintRepository
+from app.repositories.event import EventRepository
+from app.schemas.bookings import BookingSchema
+from app.schemas.complaints import ComplaintSchema
+from app.schemas.event import EventSchema
+from app.schemas.export import ExportFormat
+from app.utils.export import export
+
+
+class ExportEventsCommand:
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        format: ExportFormat,
+        batch_size: int,
+    ):
+        self.event_repository = event_repository
+        self.format = format
+        self.batch_size = batch_size
+
+    def execute(self) -> Iterator[str]:
+        events = self.event_repository.iterate_events(self.batch_size)
+        return export(map(EventSchema.from_model, events), EventSchema, self.format)
+
+
+class ExportBookingsCommand:
+    def __init__(
+        self,
+        booking_repository: BookingRepository,
+        event_id: Optional[str],
+        format: ExportFormat,
+        batch_size: int,
+    ):
+        self.booking_repository = booking_repository
+        self.event_id = event_id
+        self.format = format
+        self.batch_size = batch_size
+
+    def execute(self) -> Iterator[str]:
+        bookings = self.booking_repository.iterate_bookings(
+            self.event_id, self.batch_size
+        )
+        return export(
+            map(BookingSchema.from_model, bookings), BookingSchema, self.format
+        )
+
+
+class ExportComplaintsCommand:
+    def __init__(
+        self,
+        complaint_repository: ComplaintRepository,
+        format: ExportFormat,
+        batch_size: int,
+    ):
+        self.complaint_repository = complaint_repository
+        self.format = format
+        self.batch_size = batch_size
+
+    def execute(self) -> Iterator[str]:
+        complaints = self.complaint_repository.iterate_complaints(self.batch_size)
+        return export(
+            map(ComplaintSchema.from_model, complaints), ComplaintSchema, self.format
+        )
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Union
 from app.commands.events.errors import EventNotFoundError
 from app.commands.users.errors import UserNotFoundError
 from app.models.favourite import Favourite
 from app.models.user import User
 from app.repositories.event import EventRepository
-from app.schemas.event import EventSchema
+from app.models.event import EventView
+from app.schemas.event import EventSchema, EventSummarySchema
 from app.schemas.favourite import FavouriteSchema
 from app.repositories import (
     UserRepository,
@@ -50,18 +51,26 @@ class GetFavouritesCommand:
         user_repository: UserRepository,
         event_repository: EventRepository,
         user_id: str,
+        view: EventView = EventView.full,
     ):
         self.user_repository = user_repository
         self.event_repository = event_repository
         self.user_id = user_id
+        self.view = view
 
-    def execute(self) -> List[EventSchema]:
+    def execute(self) -> List[Union[EventSchema, EventSummarySchema]]:
         user: User
         try:
             user = self.user_repository.get_user(self.user_id)
         except Exception:
             raise UserNotFoundError
 
+        if self.view == EventView.summary:
+            events = self.event_repository.get_event_summaries_by_id_with_date_filter(
+                user.favourites
+            )
+            return list(map(lambda x: EventSummarySchema.from_model(x), events))
+
         events = self.event_repository.get_events_by_id_with_date_filter(
             user.favourites
         )
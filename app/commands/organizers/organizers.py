@@ -5,11 +5,13 @@ from app.schemas.organizers import (
 )
 from app.models.organizer import Organizer
 from app.models.event import State
-from .errors import OrganizerAlreadyExistsError, OrganizerNotFoundError
+from .errors import OrganizerAlreadyExistsError
 from app.repositories.organizers import (
     OrganizerRepository,
 )
 from app.repositories.event import EventRepository, Search
+from app.repositories.suggestions import SuggestionRepository
+from app.repositories.rollups import StatsRollupRepository
 from app.config.logger import setup_logger
 from app.utils.now import getNow
 
@@ -54,9 +56,6 @@ class GetOrganizerCommand:
         self.id = _id
 
     def execute(self) -> OrganizerSchema:
-        exists = self.organizer_repository.organizer_exists(self.id)
-        if not exists:
-            raise OrganizerNotFoundError
         organizer = self.organizer_repository.get_organizer(self.id)
 
         return OrganizerSchema.from_model(organizer)
@@ -96,32 +95,32 @@ class SuspendOrganizerCommand:
         organizer_repository: OrganizerRepository,
         _id: str,
         event_repository: EventRepository,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
     ):
         self.organizer_repository = organizer_repository
         self.id = _id
         self.event_repository = event_repository
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> OrganizerSchema:
-        exists = self.organizer_repository.organizer_exists(self.id)
-        if not exists:
-            raise OrganizerNotFoundError
         organizer = self.organizer_repository.suspend_organizer(self.id)
-        search = Search(
-            organizer=self.id,
-            type=None,
-            location=None,
-            limit=100000,
-            name=None,
-            only_published=False,
-            not_finished=False,
+        suspended_at = str(getNow().date())
+        groups = self.event_repository.update_organizer_events_state(
+            self.id, State.Publicado, State.Suspendido, suspended_at
         )
-        events = self.event_repository.search_events(search)
-        for event in events:
-            if event.state == State.Publicado:
-                self.event_repository.update_state_event(event.id, State.Suspendido)
-                self.event_repository.update_suspended_at(
-                    event.id, str(getNow().date())
-                )
+        suspended = 0
+        for group in groups:
+            suspended += group.count
+            self.rollup_repository.change_state(
+                group.created_at, State.Publicado, State.Suspendido, group.count
+            )
+            self.rollup_repository.suspend_event(
+                suspended_at, group.suspended_at, group.count
+            )
+        self.suggestion_repository.remove_organizer(self.id)
+        logger.info(f"Organizer {self.id} suspended with {suspended} events")
         return OrganizerSchema.from_model(organizer)
 
 
@@ -131,27 +130,38 @@ class UnSuspendOrganizerCommand:
         organizer_repository: OrganizerRepository,
         _id: str,
         event_repository: EventRepository,
+        suggestion_repository: SuggestionRepository,
+        rollup_repository: StatsRollupRepository,
     ):
         self.organizer_repository = organizer_repository
         self.id = _id
         self.event_repository = event_repository
+        self.suggestion_repository = suggestion_repository
+        self.rollup_repository = rollup_repository
 
     def execute(self) -> OrganizerSchema:
-        exists = self.organizer_repository.organizer_exists(self.id)
-        if not exists:
-            raise OrganizerNotFoundError
         organizer = self.organizer_repository.unsuspend_organizer(self.id)
-        search = Search(
-            organizer=self.id,
-            type=None,
-            location=None,
-            limit=100000,
-            name=None,
-            only_published=False,
-            not_finished=False,
+        groups = self.event_repository.update_organizer_events_state(
+            self.id, State.Suspendido, State.Publicado, None
         )
-        events = self.event_repository.search_events(search)
-        for event in events:
-            if event.state == State.Suspendido:
-                self.event_repository.update_state_event(event.id, State.Publicado)
+        unsuspended = 0
+        for group in groups:
+            unsuspended += group.count
+            self.rollup_repository.change_state(
+                group.created_at, State.Suspendido, State.Publicado, group.count
+            )
+        if unsuspended:
+            search = Search(
+                organizer=self.id,
+                type=None,
+                location=None,
+                limit=100000,
+                name=None,
+                only_published=True,
+                not_finished=False,
+            )
+            for event in self.event_repository.search_event_summaries(search):
+                self.suggestion_repository.add_event(event)
+        self.suggestion_repository.add_organizer(organizer)
+        logger.info(f"Organizer {self.id} unsuspended with {unsuspended} events")
         return OrganizerSchema.from_model(organizer)
@@ -1,13 +1,20 @@
-import json
+import time
 from app.repositories.event import (
     EventRepository,
 )
 from app.repositories.organizers import OrganizerRepository
 from app.repositories.bookings import BookingRepository
 from app.repositories.complaints import ComplaintRepository
+from app.repositories.rollups import StatsRollupRepository
 from app.config.logger import setup_logger
-from app.schemas.stats import StatParams, AppStatsSchema
+from app.schemas.stats import (
+    StatParams,
+    AppStatsSchema,
+    StatsRollupCheckSchema,
+    StatsRollupRebuildSchema,
+)
 from app.models.stat import AppStats, OrganizerStat
+from app.utils.executor import run_queries
 
 logger = setup_logger(__name__)
 
@@ -15,64 +22,112 @@ logger = setup_logger(__name__)
 class GetStatsCommand:
     def __init__(
         self,
-        event_repository: EventRepository,
         organizer_repository: OrganizerRepository,
-        booking_repository: BookingRepository,
-        complaint_repository: ComplaintRepository,
+        rollup_repository: StatsRollupRepository,
         params: StatParams,
     ):
-        self.event_repository = event_repository
         self.params = params
         self.organizer_repository = organizer_repository
-        self.booking_repository = booking_repository
-        self.complaint_repository = complaint_repository
+        self.rollup_repository = rollup_repository
+        self.timings = {}
 
     def execute(self) -> AppStatsSchema:
-        self.event_repository.update_state_all_events()
-        event_states_stat = self.event_repository.get_event_states_stat(
-            self.params.start_date, self.params.end_date
+        start = time.perf_counter()
+        stats = self.rollup_repository.get_stats(
+            self.params.start_date, self.params.end_date, self.params.group_by
         )
-        top_organizers_stat = self.event_repository.get_top_organizers_stat(
-            self.params.start_date, self.params.end_date
+        self.timings['rollups'] = time.perf_counter() - start
+        start = time.perf_counter()
+        names = self.organizer_repository.get_organizer_names(
+            [organizer.id for organizer in stats.top_organizers]
         )
-        top_organizers_stat = [
+        stats.top_organizers = [
             OrganizerStat(
-                name=self.get_organizer_name(organizer.id),
+                name=names.get(organizer.id, organizer.id),
                 verified_bookings=organizer.verified_bookings,
                 id=organizer.id,
             )
-            for organizer in top_organizers_stat
+            for organizer in stats.top_organizers
         ]
-        verified_bookings_stat = self.booking_repository.get_verified_bookings_stat(
-            self.params.start_date, self.params.end_date, self.params.group_by
-        )
-        complaints_by_time = self.complaint_repository.get_complaints_by_time(
-            self.params.start_date, self.params.end_date
-        )
+        self.timings['organizers'] = time.perf_counter() - start
+        return AppStatsSchema.from_model(stats)
 
-        suspended_by_time = self.event_repository.get_suspended_by_time(
-            self.params.start_date, self.params.end_date
-        )
 
-        events_by_time = self.event_repository.get_events_by_time(
-            self.params.start_date, self.params.end_date
+class CheckStatsRollupsCommand:
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        booking_repository: BookingRepository,
+        complaint_repository: ComplaintRepository,
+        rollup_repository: StatsRollupRepository,
+        params: StatParams,
+    ):
+        self.event_repository = event_repository
+        self.booking_repository = booking_repository
+        self.complaint_repository = complaint_repository
+        self.rollup_repository = rollup_repository
+        self.params = params
+        self.timings = {}
+
+    def execute(self) -> StatsRollupCheckSchema:
+        expected = self.serialize(self.get_raw_stats())
+        start = time.perf_counter()
+        actual = self.serialize(
+            self.rollup_repository.get_stats(
+                self.params.start_date, self.params.end_date, self.params.group_by
+            )
         )
+        self.timings['rollups'] = time.perf_counter() - start
+        mismatches = [stat for stat in expected if expected[stat] != actual[stat]]
+        for stat in mismatches:
+            logger.warning(
+                f"Stats rollup {stat} differs: {actual[stat]} != {expected[stat]}"
+            )
+        return StatsRollupCheckSchema(consistent=not mismatches, mismatches=mismatches)
 
-        events_published_by_time = self.event_repository.get_events_published_by_time(
-            self.params.start_date, self.params.end_date
+    def get_raw_stats(self) -> AppStats:
+        start, end = self.params.start_date, self.params.end_date
+        group_by = self.params.group_by
+        stats, self.timings = run_queries(
+            {
+                'event_stats': lambda: self.event_repository.get_event_stats(
+                    start, end
+                ),
+                'verified_bookings': lambda: (
+                    self.booking_repository.get_verified_bookings_stat(
+                        start, end, group_by
+                    )
+                ),
+                'complaints_by_time': lambda: (
+                    self.complaint_repository.get_complaints_by_time(start, end)
+                ),
+            }
+        )
+        events = stats['event_stats']
+        return AppStats(
+            event_states=events.event_states,
+            top_organizers=events.top_organizers,
+            verified_bookings=stats['verified_bookings'],
+            complaints_by_time=stats['complaints_by_time'],
+            suspended_by_time=events.suspended_by_time,
+            events_by_time=events.events_by_time,
+            events_published_by_time=events.events_published_by_time,
         )
 
-        stats = AppStats(
-            event_states=event_states_stat,
-            top_organizers=top_organizers_stat,
-            verified_bookings=verified_bookings_stat,
-            complaints_by_time=complaints_by_time,
-            suspended_by_time=suspended_by_time,
-            events_by_time=events_by_time,
-            events_published_by_time=events_published_by_time,
+    def serialize(self, stats: AppStats) -> dict:
+        data = AppStatsSchema.from_model(stats).dict()
+        # Organizers with the same count come in no particular order
+        data['top_organizers'] = sorted(
+            data['top_organizers'], key=lambda o: (-o['verified_bookings'], o['id'])
         )
-        return AppStatsSchema.from_model(stats)
+        return data
+
+
+class RebuildStatsRollupsCommand:
+    def __init__(self, rollup_repository: StatsRollupRepository):
+        self.rollup_repository = rollup_repository
 
-    def get_organizer_name(self, organizer_id: str) -> str:
-        organizer = self.organizer_repository.get_organizer(organizer_id)
-        return f"{organizer.first_name} {organizer.last_name}"
+    def execute(self) -> StatsRollupRebuildSchema:
+        days = self.rollup_repository.rebuild()
+        logger.info(f"Stats rollups rebuilt for {days} days")
+        return StatsRollupRebuildSchema(days=days)
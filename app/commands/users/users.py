@@ -1,7 +1,7 @@
 from typing import Optional
 from app.schemas.users import UserCreateSchema, UserSchema
 from app.models.user import User
-from .errors import UserAlreadyExistsError, UserNotFoundError
+from .errors import UserAlreadyExistsError
 from app.repositories import (
     UserRepository,
 )
@@ -45,9 +45,6 @@ class GetUserCommand:
         self.id = _id
 
     def execute(self) -> UserSchema:
-        exists = self.user_repository.user_exists(self.id)
-        if not exists:
-            raise UserNotFoundError
         user = self.user_repository.get_user(self.id)
 
         return UserSchema.from_model(user)
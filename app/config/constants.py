@@ -4,3 +4,31 @@ PORT = int(os.environ.get('PORT', 8080))
 DB_URL = os.getenv('DB_URL')
 DB_NAME = os.environ.get('DB_NAME', "TicketApp")
 ENV_NAME = os.environ.get('ENV_NAME')
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+TIMEZONE = os.environ.get('TIMEZONE', '-03:00')
+COMMAND_EXECUTOR = os.environ.get('COMMAND_EXECUTOR', "thread_pool")
+COMMAND_EXECUTOR_WORKERS = int(os.environ.get('COMMAND_EXECUTOR_WORKERS', 32))
+QUERY_EXECUTOR_WORKERS = int(os.environ.get('QUERY_EXECUTOR_WORKERS', 16))
+DB_MAX_POOL_SIZE = int(os.environ.get('DB_MAX_POOL_SIZE', 100))
+DB_MIN_POOL_SIZE = int(os.environ.get('DB_MIN_POOL_SIZE', 0))
+DB_MAX_IDLE_TIME_MS = int(os.environ.get('DB_MAX_IDLE_TIME_MS', 60_000))
+DB_CONNECT_TIMEOUT_MS = int(os.environ.get('DB_CONNECT_TIMEOUT_MS', 20_000))
+DB_SOCKET_TIMEOUT_MS = int(os.environ.get('DB_SOCKET_TIMEOUT_MS', 30_000))
+DB_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.environ.get('DB_SERVER_SELECTION_TIMEOUT_MS', 5_000)
+)
+FINALIZE_EVENTS_INTERVAL = int(os.environ.get('FINALIZE_EVENTS_INTERVAL', 60))
+REBUILD_SUGGESTIONS_INTERVAL = int(os.environ.get('REBUILD_SUGGESTIONS_INTERVAL', 300))
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 1_000))
+EVENT_STATS_PIPELINE = os.environ.get('EVENT_STATS_PIPELINE', "facet")
+BULK_EVENTS_LIMIT = int(os.environ.get('BULK_EVENTS_LIMIT', 1_000))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1_000))
+EVENT_CACHE_SIZE = int(os.environ.get('EVENT_CACHE_SIZE', 10_000))
+EVENT_CACHE_TTL = float(os.environ.get('EVENT_CACHE_TTL', 30))
+GEO_CACHE_SIZE = int(os.environ.get('GEO_CACHE_SIZE', 1_000))
+GEO_CACHE_TTL = float(os.environ.get('GEO_CACHE_TTL', 60))
+GEO_TILE_SIZE = float(os.environ.get('GEO_TILE_SIZE', 0.01))
+GEO_TILE_MAX_EVENTS = int(os.environ.get('GEO_TILE_MAX_EVENTS', 5_000))
+ORGANIZER_NAME_CACHE_SIZE = int(os.environ.get('ORGANIZER_NAME_CACHE_SIZE', 10_000))
+ORGANIZER_NAME_CACHE_TTL = float(os.environ.get('ORGANIZER_NAME_CACHE_TTL', 300))
+DB_MONITORING = os.environ.get('DB_MONITORING', str(ENV_NAME == 'TEST')) == 'True'
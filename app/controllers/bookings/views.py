@@ -1,19 +1,35 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.bookings import PersistentBookingRepository
-from app.repositories.event import PersistentEventRepository
-from fastapi import status, APIRouter
+from app.repositories.bookings import BookingRepository
+from app.repositories.event import EventRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.dependencies import (
+    get_booking_repository,
+    get_event_repository,
+    get_rollup_repository,
+)
+from fastapi import status, APIRouter, Depends
 from app.config.logger import setup_logger
-from app.schemas.bookings import BookingCreateSchema, BookingSchema, verifyBookingSchema
+from app.schemas.bookings import (
+    BookingCreateSchema,
+    BookingManifestSchema,
+    BookingSchema,
+    BookingScansSchema,
+    BookingScanResultSchema,
+    verifyBookingSchema,
+)
 from app.schemas.stats import EventBookingsByHourStatSchema
 from app.commands.bookings import (
     CreateBookingCommand,
     VerifyBookingCommand,
+    VerifyBookingsCommand,
     GetBookingsByEventCommand,
     GetBookingsByEventVerifiedCommand,
     GetBookingsByHourCommand,
+    GetBookingsManifestCommand,
 )
 from app.utils.error import TicketAppError
-from typing import List
+from app.utils.executor import run_command
+from typing import List, Optional
 
 
 logger = setup_logger(name=__name__)
@@ -23,13 +39,15 @@ router = APIRouter()
 @router.post(
     '/bookings', status_code=status.HTTP_201_CREATED, response_model=BookingSchema
 )
-async def create_booking(booking_body: BookingCreateSchema):
+async def create_booking(
+    booking_body: BookingCreateSchema,
+    repository: BookingRepository = Depends(get_booking_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+):
     try:
-        repository = PersistentBookingRepository()
-        event_repository = PersistentEventRepository()
-        booking = CreateBookingCommand(
-            repository, booking_body, event_repository
-        ).execute()
+        booking = await run_command(
+            CreateBookingCommand(repository, booking_body, event_repository)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -45,13 +63,23 @@ async def create_booking(booking_body: BookingCreateSchema):
     status_code=status.HTTP_200_OK,
     response_model=BookingSchema,
 )
-async def verify_booking(id: str, verify_body: verifyBookingSchema):
+async def verify_booking(
+    id: str,
+    verify_body: verifyBookingSchema,
+    repository: BookingRepository = Depends(get_booking_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentBookingRepository()
-        event_repository = PersistentEventRepository()
-        booking = VerifyBookingCommand(
-            repository, event_repository, id, verify_body.event_id
-        ).execute()
+        booking = await run_command(
+            VerifyBookingCommand(
+                repository,
+                event_repository,
+                id,
+                verify_body.event_id,
+                rollup_repository,
+            )
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -62,15 +90,44 @@ async def verify_booking(id: str, verify_body: verifyBookingSchema):
     return booking
 
 
+@router.post(
+    '/bookings/verify',
+    status_code=status.HTTP_200_OK,
+    response_model=List[BookingScanResultSchema],
+)
+async def verify_bookings(
+    scans_body: BookingScansSchema,
+    repository: BookingRepository = Depends(get_booking_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
+    # For scanners syncing the scans they queued, each one gets its own result
+    try:
+        results = await run_command(
+            VerifyBookingsCommand(
+                repository, event_repository, scans_body.scans, rollup_repository
+            )
+        )
+    except TicketAppError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+    return results
+
+
 @router.get(
     '/bookings/event/{event_id}',
     status_code=status.HTTP_200_OK,
     response_model=List[BookingSchema],
 )
-async def get_bookings_by_event(event_id: str):
+async def get_bookings_by_event(
+    event_id: str, repository: BookingRepository = Depends(get_booking_repository)
+):
     try:
-        repository = PersistentBookingRepository()
-        bookings = GetBookingsByEventCommand(repository, event_id).execute()
+        bookings = await run_command(GetBookingsByEventCommand(repository, event_id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -86,10 +143,13 @@ async def get_bookings_by_event(event_id: str):
     status_code=status.HTTP_200_OK,
     response_model=List[BookingSchema],
 )
-async def get_bookings_by_event_verified(event_id: str):
+async def get_bookings_by_event_verified(
+    event_id: str, repository: BookingRepository = Depends(get_booking_repository)
+):
     try:
-        repository = PersistentBookingRepository()
-        bookings = GetBookingsByEventVerifiedCommand(repository, event_id).execute()
+        bookings = await run_command(
+            GetBookingsByEventVerifiedCommand(repository, event_id)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -105,10 +165,11 @@ async def get_bookings_by_event_verified(event_id: str):
     status_code=status.HTTP_200_OK,
     response_model=List[EventBookingsByHourStatSchema],
 )
-async def get_bookings_by_hour(event_id: str):
+async def get_bookings_by_hour(
+    event_id: str, repository: BookingRepository = Depends(get_booking_repository)
+):
     try:
-        repository = PersistentBookingRepository()
-        bookings = GetBookingsByHourCommand(repository, event_id).execute()
+        bookings = await run_command(GetBookingsByHourCommand(repository, event_id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -117,3 +178,30 @@ async def get_bookings_by_hour(event_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
         )
     return bookings
+
+
+@router.get(
+    '/bookings/event/{event_id}/manifest',
+    status_code=status.HTTP_200_OK,
+    response_model=BookingManifestSchema,
+)
+async def get_bookings_manifest(
+    event_id: str,
+    since: Optional[str] = None,
+    repository: BookingRepository = Depends(get_booking_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+):
+    # For scanners checking tickets offline: without since, every booking of
+    # the event; with the sync_token of the last manifest, what changed since
+    try:
+        manifest = await run_command(
+            GetBookingsManifestCommand(repository, event_repository, event_id, since)
+        )
+    except TicketAppError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+    return manifest
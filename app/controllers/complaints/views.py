@@ -1,6 +1,12 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.complaints import PersistentComplaintRepository
-from app.repositories.event import PersistentEventRepository
+from app.repositories.complaints import ComplaintRepository
+from app.repositories.event import EventRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.dependencies import (
+    get_complaint_repository,
+    get_event_repository,
+    get_rollup_repository,
+)
 from fastapi import status, APIRouter, Depends
 from app.config.logger import setup_logger
 from app.schemas.complaints import (
@@ -19,6 +25,7 @@ from app.commands.complaints import (
     GetComplaintsRankingByEventCommand,
 )
 from app.utils.error import TicketAppError
+from app.utils.executor import run_command
 from typing import List
 from app.parsers.filter_parser import FilterComplaintsParser
 
@@ -30,13 +37,18 @@ router = APIRouter()
 @router.post(
     '/complaints', status_code=status.HTTP_201_CREATED, response_model=ComplaintSchema
 )
-async def create_complaint(complaint_body: ComplaintCreateSchema):
+async def create_complaint(
+    complaint_body: ComplaintCreateSchema,
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentComplaintRepository()
-        event_repository = PersistentEventRepository()
-        complaint = CreateComplaintCommand(
-            repository, event_repository, complaint_body
-        ).execute()
+        complaint = await run_command(
+            CreateComplaintCommand(
+                repository, event_repository, complaint_body, rollup_repository
+            )
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -53,10 +65,11 @@ async def create_complaint(complaint_body: ComplaintCreateSchema):
     response_model=ComplaintSchema,
     tags=["Complaints"],
 )
-async def get_complaint(id: str):
+async def get_complaint(
+    id: str, repository: ComplaintRepository = Depends(get_complaint_repository)
+):
     try:
-        repository = PersistentComplaintRepository()
-        complaint = GetComplaintCommand(repository, id).execute()
+        complaint = await run_command(GetComplaintCommand(repository, id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -74,11 +87,16 @@ async def get_complaint(id: str):
     response_model=List[ComplaintSchema],
     tags=["Complaints"],
 )
-async def get_complaint_by_organizer(id: str, params: FilterComplaint = Depends()):
+async def get_complaint_by_organizer(
+    id: str,
+    params: FilterComplaint = Depends(),
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+):
     try:
         filter = FilterComplaintsParser().parse(params)
-        repository = PersistentComplaintRepository()
-        complaints = GetComplaintsByOrganizerCommand(repository, id, filter).execute()
+        complaints = await run_command(
+            GetComplaintsByOrganizerCommand(repository, id, filter)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -96,11 +114,16 @@ async def get_complaint_by_organizer(id: str, params: FilterComplaint = Depends(
     response_model=List[ComplaintSchema],
     tags=["Complaints"],
 )
-async def get_complaint_by_event(id: str, params: FilterComplaint = Depends()):
+async def get_complaint_by_event(
+    id: str,
+    params: FilterComplaint = Depends(),
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+):
     try:
         filter = FilterComplaintsParser().parse(params)
-        repository = PersistentComplaintRepository()
-        complaints = GetComplaintsByEventCommand(repository, id, filter).execute()
+        complaints = await run_command(
+            GetComplaintsByEventCommand(repository, id, filter)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -118,11 +141,15 @@ async def get_complaint_by_event(id: str, params: FilterComplaint = Depends()):
     response_model=List[ComplaintOrganizerRankingSchema],
     tags=["Complaints"],
 )
-async def get_complaint_ranking_by_organizer(params: FilterComplaint = Depends()):
+async def get_complaint_ranking_by_organizer(
+    params: FilterComplaint = Depends(),
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+):
     try:
         filter = FilterComplaintsParser().parse(params)
-        repository = PersistentComplaintRepository()
-        ranking = GetComplaintsRankingByOrganizerCommand(repository, filter).execute()
+        ranking = await run_command(
+            GetComplaintsRankingByOrganizerCommand(repository, filter)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -140,11 +167,15 @@ async def get_complaint_ranking_by_organizer(params: FilterComplaint = Depends()
     response_model=List[ComplaintEventRankingSchema],
     tags=["Complaints"],
 )
-async def get_complaint_ranking_by_event(params: FilterComplaint = Depends()):
+async def get_complaint_ranking_by_event(
+    params: FilterComplaint = Depends(),
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+):
     try:
         filter = FilterComplaintsParser().parse(params)
-        repository = PersistentComplaintRepository()
-        ranking = GetComplaintsRankingByEventCommand(repository, filter).execute()
+        ranking = await run_command(
+            GetComplaintsRankingByEventCommand(repository, filter)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
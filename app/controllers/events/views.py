@@ -1,19 +1,35 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.event import PersistentEventRepository
-from app.repositories.organizers import PersistentOrganizerRepository
+from app.repositories.event import EventRepository
+from app.repositories.organizers import OrganizerRepository
+from app.repositories.suggestions import SuggestionRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.dependencies import (
+    get_rollup_repository,
+    get_event_repository,
+    get_organizer_repository,
+    get_suggestion_repository,
+)
 from app.commands.events.events import SearchEventsCommand
 from app.parsers.search_parser import SearchEventsParser
-from typing import List
-from fastapi import Depends, status, APIRouter
+from typing import List, Union
+from fastapi import Depends, Response, status, APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.config.constants import BULK_EVENTS_LIMIT
 from app.config.logger import setup_logger
 from app.schemas.event import (
     EventCreateSchema,
     EventSchema,
+    EventResultSchema,
+    EventSummaryResultSchema,
     SearchEvent,
     EventUpdateSchema,
+    BulkEventResultSchema,
 )
+from app.models.event import EventView
 from app.commands.events import (
     CreateEventCommand,
+    CreateEventsCommand,
     GetEventCommand,
     PublishEventCommand,
     CancelEventCommand,
@@ -22,8 +38,11 @@ from app.commands.events import (
     UnSuspendEventCommand,
     AddCollaboratorEventCommand,
     RemoveCollaboratorEventCommand,
+    SuggestEventsCommand,
 )
+from app.schemas.suggestion import SuggestionSchema, SuggestParams
 from app.utils.error import TicketAppError
+from app.utils.executor import run_command
 
 
 logger = setup_logger(name=__name__)
@@ -36,10 +55,15 @@ router = APIRouter()
     response_model=EventSchema,
     tags=["Events"],
 )
-async def create_event(event_body: EventCreateSchema):
+async def create_event(
+    event_body: EventCreateSchema,
+    repository: EventRepository = Depends(get_event_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        event = CreateEventCommand(repository, event_body).execute()
+        event = await run_command(
+            CreateEventCommand(repository, event_body, rollup_repository)
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -50,16 +74,67 @@ async def create_event(event_body: EventCreateSchema):
         )
 
 
+@router.post(
+    '/events/bulk',
+    status_code=status.HTTP_200_OK,
+    response_model=List[BulkEventResultSchema],
+    tags=["Events"],
+)
+async def create_events(
+    events_body: List[dict],
+    ordered: bool = False,
+    repository: EventRepository = Depends(get_event_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
+    # Each item is validated on its own, so one invalid event does not reject
+    # the batch. There is one result per item, in request order.
+    try:
+        results = await run_command(
+            CreateEventsCommand(
+                repository, events_body, rollup_repository, ordered, BULK_EVENTS_LIMIT
+            )
+        )
+    except TicketAppError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+    return results
+
+
+@router.get(
+    '/events/suggest',
+    status_code=status.HTTP_200_OK,
+    response_model=List[SuggestionSchema],
+    tags=["Events"],
+)
+async def suggest_events(
+    params: SuggestParams = Depends(),
+    repository: SuggestionRepository = Depends(get_suggestion_repository),
+):
+    # Served from memory, so it runs inline instead of in the command pool
+    try:
+        return SuggestEventsCommand(repository, params.q, params.limit).execute()
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+
+
 @router.get(
     '/events/{id}',
     status_code=status.HTTP_200_OK,
     response_model=EventSchema,
     tags=["Events"],
 )
-async def get_event(id: str):
+async def get_event(
+    id: str, repository: EventRepository = Depends(get_event_repository)
+):
     try:
-        repository = PersistentEventRepository()
-        event = GetEventCommand(repository, id).execute()
+        event = await run_command(GetEventCommand(repository, id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -74,14 +149,18 @@ async def get_event(id: str):
 @router.get(
     '/events',
     status_code=status.HTTP_200_OK,
-    response_model=List[EventSchema],
+    response_model=Union[List[EventResultSchema], List[EventSummaryResultSchema]],
+    response_model_exclude_none=True,
     tags=["Events"],
 )
-async def search_events(params: SearchEvent = Depends()):
+async def search_events(
+    response: Response,
+    params: SearchEvent = Depends(),
+    repository: EventRepository = Depends(get_event_repository),
+):
     try:
         search = SearchEventsParser().parse(params)
-        repository = PersistentEventRepository()
-        events = SearchEventsCommand(repository, search).execute()
+        page = await run_command(SearchEventsCommand(repository, search, params.view))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -90,7 +169,15 @@ async def search_events(params: SearchEvent = Depends()):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
         )
 
-    return events
+    headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+    if params.view == EventView.summary:
+        # Returned directly so summaries are not first validated against the
+        # full schema of the response union
+        return JSONResponse(
+            jsonable_encoder(page.events, exclude_none=True), headers=headers
+        )
+    response.headers.update(headers)
+    return page.events
 
 
 @router.put(
@@ -99,10 +186,18 @@ async def search_events(params: SearchEvent = Depends()):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def publish_event(id: str):
+async def publish_event(
+    id: str,
+    repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        event = PublishEventCommand(repository, id).execute()
+        event = await run_command(
+            PublishEventCommand(
+                repository, id, suggestion_repository, rollup_repository
+            )
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -119,10 +214,16 @@ async def publish_event(id: str):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def cancel_event(id: str):
+async def cancel_event(
+    id: str,
+    repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        event = CancelEventCommand(repository, id).execute()
+        event = await run_command(
+            CancelEventCommand(repository, id, suggestion_repository, rollup_repository)
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -139,10 +240,16 @@ async def cancel_event(id: str):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def update_event(id: str, update_body: EventUpdateSchema):
+async def update_event(
+    id: str,
+    update_body: EventUpdateSchema,
+    repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        user = UpdateEventCommand(repository, update_body, id).execute()
+        user = await run_command(
+            UpdateEventCommand(repository, update_body, id, suggestion_repository)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -159,10 +266,18 @@ async def update_event(id: str, update_body: EventUpdateSchema):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def suspend_event(id: str):
+async def suspend_event(
+    id: str,
+    repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        event = SuspendEventCommand(repository, id).execute()
+        event = await run_command(
+            SuspendEventCommand(
+                repository, id, suggestion_repository, rollup_repository
+            )
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -179,10 +294,18 @@ async def suspend_event(id: str):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def unsuspend_event(id: str):
+async def unsuspend_event(
+    id: str,
+    repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        event = UnSuspendEventCommand(repository, id).execute()
+        event = await run_command(
+            UnSuspendEventCommand(
+                repository, id, suggestion_repository, rollup_repository
+            )
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -199,13 +322,18 @@ async def unsuspend_event(id: str):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def add_collaborator_event(id: str, collaborator_email: str):
+async def add_collaborator_event(
+    id: str,
+    collaborator_email: str,
+    repository: EventRepository = Depends(get_event_repository),
+    organizer_repository: OrganizerRepository = Depends(get_organizer_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        organizer_repository = PersistentOrganizerRepository()
-        event = AddCollaboratorEventCommand(
-            repository, organizer_repository, id, collaborator_email
-        ).execute()
+        event = await run_command(
+            AddCollaboratorEventCommand(
+                repository, organizer_repository, id, collaborator_email
+            )
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -222,13 +350,18 @@ async def add_collaborator_event(id: str, collaborator_email: str):
     response_model=EventSchema,
     tags=["Events"],
 )
-async def remove_collaborator_event(id: str, collaborator_id: str):
+async def remove_collaborator_event(
+    id: str,
+    collaborator_id: str,
+    repository: EventRepository = Depends(get_event_repository),
+    organizer_repository: OrganizerRepository = Depends(get_organizer_repository),
+):
     try:
-        repository = PersistentEventRepository()
-        organizer_repository = PersistentOrganizerRepository()
-        event = RemoveCollaboratorEventCommand(
-            repository, organizer_repository, id, collaborator_id
-        ).execute()
+        event = await run_command(
+            RemoveCollaboratorEventCommand(
+                repository, organizer_repository, id, collaborator_id
+            )
+        )
         return event
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,73 @@
+from typing import Iterator, Optional
+from fastapi import Depends, status, APIRouter
+from fastapi.responses import StreamingResponse
+from app.config.constants import EXPORT_BATCH_SIZE
+from app.config.logger import setup_logger
+from app.repositories.bookings import BookingRepository
+from app.repositories.complaints import ComplaintRepository
+from app.repositories.event import EventRepository
+from app.repositories.dependencies import (
+    get_booking_repository,
+    get_complaint_repository,
+    get_event_repository,
+)
+from app.schemas.export import ExportFormat, ExportParams
+from app.commands.export import (
+    ExportEventsCommand,
+    ExportBookingsCommand,
+    ExportComplaintsCommand,
+)
+from app.utils.export import MEDIA_TYPES
+
+logger = setup_logger(name=__name__)
+router = APIRouter()
+
+
+def stream(name: str, format: ExportFormat, chunks: Iterator[str]):
+    # The commands only build generators, which StreamingResponse reads in a
+    # worker thread as it writes the body. The status is already sent by then,
+    # so a failure while reading the cursor can only cut the response short.
+    def logged():
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.error(e)
+            raise
+
+    return StreamingResponse(
+        logged(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{name}.{format.value}"'
+        },
+    )
+
+
+@router.get('/export/events', status_code=status.HTTP_200_OK, tags=["Export"])
+async def export_events(
+    params: ExportParams = Depends(),
+    repository: EventRepository = Depends(get_event_repository),
+):
+    command = ExportEventsCommand(repository, params.format, EXPORT_BATCH_SIZE)
+    return stream('events', params.format, command.execute())
+
+
+@router.get('/export/bookings', status_code=status.HTTP_200_OK, tags=["Export"])
+async def export_bookings(
+    event_id: Optional[str] = None,
+    params: ExportParams = Depends(),
+    repository: BookingRepository = Depends(get_booking_repository),
+):
+    command = ExportBookingsCommand(
+        repository, event_id, params.format, EXPORT_BATCH_SIZE
+    )
+    return stream('bookings', params.format, command.execute())
+
+
+@router.get('/export/complaints', status_code=status.HTTP_200_OK, tags=["Export"])
+async def export_complaints(
+    params: ExportParams = Depends(),
+    repository: ComplaintRepository = Depends(get_complaint_repository),
+):
+    command = ExportComplaintsCommand(repository, params.format, EXPORT_BATCH_SIZE)
+    return stream('complaints', params.format, command.execute())
@@ -1,19 +1,28 @@
 from fastapi.exceptions import HTTPException
+from app.repositories.event import EventRepository
+from app.repositories.users import UserRepository
+from app.repositories.dependencies import (
+    get_event_repository,
+    get_user_repository,
+)
 from app.commands.favourites.favourites import (
     AddFavouriteCommand,
     DeleteFavouriteCommand,
     GetFavouritesCommand,
 )
-from app.repositories.event import PersistentEventRepository
-from typing import List
-from fastapi import status, APIRouter
+from typing import List, Union
+from fastapi import status, APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from app.config.logger import setup_logger
-from app.repositories.users import PersistentUserRepository
 from app.schemas.event import (
     EventSchema,
+    EventSummarySchema,
 )
+from app.models.event import EventView
 from app.schemas.favourite import FavouriteSchema
 from app.utils.error import TicketAppError
+from app.utils.executor import run_command
 
 
 logger = setup_logger(name=__name__)
@@ -24,15 +33,20 @@ router = APIRouter()
     '/users/{user_id}/favourites',
     status_code=status.HTTP_201_CREATED,
     response_model=FavouriteSchema,
-    tags=["Users"]
+    tags=["Users"],
 )
-async def add_favourite(user_id: str, favourite_body: FavouriteSchema):
+async def add_favourite(
+    user_id: str,
+    favourite_body: FavouriteSchema,
+    user_repository: UserRepository = Depends(get_user_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+):
     try:
-        user_repository = PersistentUserRepository()
-        event_repository = PersistentEventRepository()
-        AddFavouriteCommand(
-            user_repository, event_repository, user_id, favourite_body
-        ).execute()
+        await run_command(
+            AddFavouriteCommand(
+                user_repository, event_repository, user_id, favourite_body
+            )
+        )
 
         return favourite_body
     except TicketAppError as e:
@@ -47,12 +61,15 @@ async def add_favourite(user_id: str, favourite_body: FavouriteSchema):
 @router.delete(
     '/users/{user_id}/favourites/{event_id}',
     status_code=status.HTTP_200_OK,
-    tags=["Users"]
+    tags=["Users"],
 )
-async def delete_favourite(user_id: str, event_id: str):
+async def delete_favourite(
+    user_id: str,
+    event_id: str,
+    user_repository: UserRepository = Depends(get_user_repository),
+):
     try:
-        user_repository = PersistentUserRepository()
-        DeleteFavouriteCommand(user_repository, user_id, event_id).execute()
+        await run_command(DeleteFavouriteCommand(user_repository, user_id, event_id))
         return True
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -66,16 +83,19 @@ async def delete_favourite(user_id: str, event_id: str):
 @router.get(
     '/users/{user_id}/favourites',
     status_code=status.HTTP_200_OK,
-    response_model=List[EventSchema],
-    tags=["Users"]
+    response_model=Union[List[EventSchema], List[EventSummarySchema]],
+    tags=["Users"],
 )
-async def get_favourites(user_id: str):
+async def get_favourites(
+    user_id: str,
+    view: EventView = EventView.full,
+    user_repository: UserRepository = Depends(get_user_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+):
     try:
-        user_repository = PersistentUserRepository()
-        event_repository = PersistentEventRepository()
-        favourites = GetFavouritesCommand(
-            user_repository, event_repository, user_id
-        ).execute()
+        favourites = await run_command(
+            GetFavouritesCommand(user_repository, event_repository, user_id, view)
+        )
 
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -85,4 +105,6 @@ async def get_favourites(user_id: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
         )
 
+    if view == EventView.summary:
+        return JSONResponse(jsonable_encoder(favourites))
     return favourites
@@ -1,7 +1,15 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.organizers import PersistentOrganizerRepository
-from app.repositories.event import PersistentEventRepository
-from fastapi import status, APIRouter
+from app.repositories.event import EventRepository
+from app.repositories.organizers import OrganizerRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.dependencies import (
+    get_rollup_repository,
+    get_event_repository,
+    get_organizer_repository,
+    get_suggestion_repository,
+)
+from app.repositories.suggestions import SuggestionRepository
+from fastapi import status, APIRouter, Depends
 from app.config.logger import setup_logger
 from app.schemas.organizers import (
     OrganizerCreateSchema,
@@ -16,6 +24,7 @@ from app.commands.organizers import (
     UnSuspendOrganizerCommand,
 )
 from app.utils.error import TicketAppError
+from app.utils.executor import run_command
 from typing import List
 
 
@@ -29,10 +38,14 @@ router = APIRouter()
     response_model=OrganizerSchema,
     tags=["Organizers"],
 )
-async def create_organizer(organizer_body: OrganizerCreateSchema):
+async def create_organizer(
+    organizer_body: OrganizerCreateSchema,
+    repository: OrganizerRepository = Depends(get_organizer_repository),
+):
     try:
-        repository = PersistentOrganizerRepository()
-        organizer = CreateOrganizerCommand(repository, organizer_body).execute()
+        organizer = await run_command(
+            CreateOrganizerCommand(repository, organizer_body)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -49,10 +62,11 @@ async def create_organizer(organizer_body: OrganizerCreateSchema):
     response_model=OrganizerSchema,
     tags=["Organizers"],
 )
-async def get_organizer(id: str):
+async def get_organizer(
+    id: str, repository: OrganizerRepository = Depends(get_organizer_repository)
+):
     try:
-        repository = PersistentOrganizerRepository()
-        organizer = GetOrganizerCommand(repository, id).execute()
+        organizer = await run_command(GetOrganizerCommand(repository, id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -70,10 +84,13 @@ async def get_organizer(id: str):
     response_model=OrganizerSchema,
     tags=["Organizers"],
 )
-async def update_organizer(id: str, update_body: OrganizerUpdateSchema):
+async def update_organizer(
+    id: str,
+    update_body: OrganizerUpdateSchema,
+    repository: OrganizerRepository = Depends(get_organizer_repository),
+):
     try:
-        repository = PersistentOrganizerRepository()
-        user = UpdateOrganizerCommand(repository, update_body, id).execute()
+        user = await run_command(UpdateOrganizerCommand(repository, update_body, id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -90,11 +107,23 @@ async def update_organizer(id: str, update_body: OrganizerUpdateSchema):
     response_model=OrganizerSchema,
     tags=["Organizers"],
 )
-async def suspend_organizer(id: str):
+async def suspend_organizer(
+    id: str,
+    repository: OrganizerRepository = Depends(get_organizer_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentOrganizerRepository()
-        event_repository = PersistentEventRepository()
-        organizer = SuspendOrganizerCommand(repository, id, event_repository).execute()
+        organizer = await run_command(
+            SuspendOrganizerCommand(
+                repository,
+                id,
+                event_repository,
+                suggestion_repository,
+                rollup_repository,
+            )
+        )
         return organizer
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -111,13 +140,23 @@ async def suspend_organizer(id: str):
     response_model=OrganizerSchema,
     tags=["Organizers"],
 )
-async def unsuspend_organizer(id: str):
+async def unsuspend_organizer(
+    id: str,
+    repository: OrganizerRepository = Depends(get_organizer_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+    suggestion_repository: SuggestionRepository = Depends(get_suggestion_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        repository = PersistentOrganizerRepository()
-        event_repository = PersistentEventRepository()
-        organizer = UnSuspendOrganizerCommand(
-            repository, id, event_repository
-        ).execute()
+        organizer = await run_command(
+            UnSuspendOrganizerCommand(
+                repository,
+                id,
+                event_repository,
+                suggestion_repository,
+                rollup_repository,
+            )
+        )
         return organizer
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
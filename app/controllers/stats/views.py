@@ -1,13 +1,32 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.event import PersistentEventRepository
-from app.repositories.organizers import PersistentOrganizerRepository
-from app.repositories.bookings import PersistentBookingRepository
-from app.repositories.complaints import PersistentComplaintRepository
-from fastapi import status, APIRouter, Depends
+from app.repositories.bookings import BookingRepository
+from app.repositories.complaints import ComplaintRepository
+from app.repositories.event import EventRepository
+from app.repositories.organizers import OrganizerRepository
+from app.repositories.rollups import StatsRollupRepository
+from app.repositories.dependencies import (
+    get_booking_repository,
+    get_complaint_repository,
+    get_event_repository,
+    get_organizer_repository,
+    get_rollup_repository,
+)
+from fastapi import status, APIRouter, Depends, Response
 from app.config.logger import setup_logger
-from app.schemas.stats import AppStatsSchema, StatParams
+from app.controllers.utils.admin import require_admin_token
+from app.schemas.stats import (
+    AppStatsSchema,
+    StatParams,
+    StatsRollupCheckSchema,
+    StatsRollupRebuildSchema,
+)
 from app.utils.error import TicketAppError
-from app.commands.stats import GetStatsCommand
+from app.utils.executor import run_command, server_timing
+from app.commands.stats import (
+    GetStatsCommand,
+    CheckStatsRollupsCommand,
+    RebuildStatsRollupsCommand,
+)
 from typing import List
 
 
@@ -16,19 +35,49 @@ router = APIRouter()
 
 
 @router.get('/stats', status_code=status.HTTP_200_OK, response_model=AppStatsSchema)
-async def get_stats(params: StatParams = Depends()):
+async def get_stats(
+    response: Response,
+    params: StatParams = Depends(),
+    organizer_repository: OrganizerRepository = Depends(get_organizer_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
     try:
-        event_repository = PersistentEventRepository()
-        organizer_repository = PersistentOrganizerRepository()
-        booking_repository = PersistentBookingRepository()
-        complaint_repository = PersistentComplaintRepository()
-        stat = GetStatsCommand(
+        command = GetStatsCommand(organizer_repository, rollup_repository, params)
+        stat = await run_command(command)
+    except TicketAppError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+    response.headers['Server-Timing'] = server_timing(command.timings)
+    return stat
+
+
+@router.get(
+    '/stats/rollups/check',
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin_token)],
+    response_model=StatsRollupCheckSchema,
+)
+async def check_stats_rollups(
+    response: Response,
+    params: StatParams = Depends(),
+    event_repository: EventRepository = Depends(get_event_repository),
+    booking_repository: BookingRepository = Depends(get_booking_repository),
+    complaint_repository: ComplaintRepository = Depends(get_complaint_repository),
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
+    try:
+        command = CheckStatsRollupsCommand(
             event_repository,
-            organizer_repository,
             booking_repository,
             complaint_repository,
+            rollup_repository,
             params,
-        ).execute()
+        )
+        check = await run_command(command)
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -36,4 +85,24 @@ async def get_stats(params: StatParams = Depends()):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
         )
-    return stat
+    response.headers['Server-Timing'] = server_timing(command.timings)
+    return check
+
+
+@router.post(
+    '/stats/rollups/rebuild',
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin_token)],
+    response_model=StatsRollupRebuildSchema,
+)
+async def rebuild_stats_rollups(
+    rollup_repository: StatsRollupRepository = Depends(get_rollup_repository),
+):
+    try:
+        rebuild = await run_command(RebuildStatsRollupsCommand(rollup_repository))
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Error"
+        )
+    return rebuild
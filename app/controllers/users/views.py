@@ -1,15 +1,21 @@
 from fastapi.exceptions import HTTPException
-from app.repositories.users import PersistentUserRepository
-from fastapi import status, APIRouter
+from app.repositories.bookings import BookingRepository
+from app.repositories.event import EventRepository
+from app.repositories.users import UserRepository
+from app.repositories.dependencies import (
+    get_booking_repository,
+    get_event_repository,
+    get_user_repository,
+)
+from fastapi import status, APIRouter, Depends
 from app.config.logger import setup_logger
 from app.schemas.users import UserCreateSchema, UserSchema
 from app.commands.users import CreateUserCommand, GetUserCommand
 from app.utils.error import TicketAppError
+from app.utils.executor import run_command
 from typing import List
 from app.schemas.bookings import BookingSchema
 from app.commands.bookings import GetBookingsByReserverCommand
-from app.repositories.bookings import PersistentBookingRepository
-from app.repositories.event import PersistentEventRepository
 
 
 logger = setup_logger(name=__name__)
@@ -22,10 +28,12 @@ router = APIRouter()
     response_model=UserSchema,
     tags=["Users"],
 )
-async def create_user(user_body: UserCreateSchema):
+async def create_user(
+    user_body: UserCreateSchema,
+    repository: UserRepository = Depends(get_user_repository),
+):
     try:
-        repository = PersistentUserRepository()
-        user = CreateUserCommand(repository, user_body).execute()
+        user = await run_command(CreateUserCommand(repository, user_body))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -42,10 +50,9 @@ async def create_user(user_body: UserCreateSchema):
     response_model=UserSchema,
     tags=["Users"],
 )
-async def get_user(id: str):
+async def get_user(id: str, repository: UserRepository = Depends(get_user_repository)):
     try:
-        repository = PersistentUserRepository()
-        user = GetUserCommand(repository, id).execute()
+        user = await run_command(GetUserCommand(repository, id))
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -62,13 +69,15 @@ async def get_user(id: str):
     status_code=status.HTTP_200_OK,
     response_model=List[BookingSchema],
 )
-async def get_user_bookings_reserved(id: str):
+async def get_user_bookings_reserved(
+    id: str,
+    repository: BookingRepository = Depends(get_booking_repository),
+    event_repository: EventRepository = Depends(get_event_repository),
+):
     try:
-        repository = PersistentBookingRepository()
-        event_repository = PersistentEventRepository()
-        bookings = GetBookingsByReserverCommand(
-            repository, event_repository, id
-        ).execute()
+        bookings = await run_command(
+            GetBookingsByReserverCommand(repository, event_repository, id)
+        )
     except TicketAppError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
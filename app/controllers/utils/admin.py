@@ -0,0 +1,10 @@
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from app.config.constants import ADMIN_TOKEN
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    # Maintenance endpoints are open unless ADMIN_TOKEN is set
+    if ADMIN_TOKEN and not secrets.compare_digest(x_admin_token or '', ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -0,0 +1,30 @@
+from fastapi import status, APIRouter
+from app.config.logger import setup_logger
+from app.repositories.dependencies import (
+    event_cache,
+    event_repository,
+    geo_cache,
+    organizer_name_cache,
+)
+from app.utils.jobs import schedulers
+
+
+logger = setup_logger(name=__name__)
+router = APIRouter()
+
+
+@router.get('/metrics', status_code=status.HTTP_200_OK, tags=["Utils"])
+async def metrics():
+    logger.info("Metrics endpoint")
+    metrics = {scheduler.name: vars(scheduler.metrics) for scheduler in schedulers}
+    metrics['event_cache'] = vars(event_cache.metrics)
+    metrics['geo_cache'] = {
+        **vars(geo_cache.metrics),
+        'hit_rate': geo_cache.metrics.hit_rate(),
+    }
+    metrics['geo_search'] = vars(event_repository.geo_metrics)
+    metrics['organizer_name_cache'] = {
+        **vars(organizer_name_cache.metrics),
+        'hit_rate': organizer_name_cache.metrics.hit_rate(),
+    }
+    return metrics
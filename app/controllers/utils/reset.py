@@ -1,14 +1,30 @@
-from fastapi import status, APIRouter
+from fastapi import status, APIRouter, Depends
 from app.config.logger import setup_logger
+from app.controllers.utils.admin import require_admin_token
 from app.repositories.config import clear_db
+from app.repositories.indexes import create_indexes
+from app.repositories.dependencies import (
+    event_repository,
+    organizer_repository,
+    suggestion_repository,
+)
 
 
 logger = setup_logger(name=__name__)
 router = APIRouter()
 
 
-@router.post('/reset', status_code=status.HTTP_200_OK, tags=["Utils"])
+@router.post(
+    '/reset',
+    status_code=status.HTTP_200_OK,
+    tags=["Utils"],
+    dependencies=[Depends(require_admin_token)],
+)
 async def reset():
     logger.info("Clearing Database")
     clear_db()
+    create_indexes()
+    suggestion_repository.replace_all([], [])
+    event_repository.clear()
+    organizer_repository.clear()
     return "success"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from datetime import date, time
 from enum import Enum
+from typing import Optional
 import uuid
 
 
@@ -73,6 +74,49 @@ class State(Enum):
     Suspendido = "Suspendido"
 
 
+class EventView(Enum):
+    full = "full"
+    summary = "summary"
+
+
+class EventSort(Enum):
+    distance = "distance"
+    vacants = "vacants"
+    date = "date"
+
+
+class EventSummary:
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        location: Location,
+        type: Type,
+        preview_image: str,
+        date: date,
+        start_time: time,
+        end_time: time,
+        organizer: str,
+        vacants: int,
+        vacants_left: int,
+        state: State,
+        distance_meters: Optional[float] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.type = type
+        self.preview_image = preview_image
+        self.date = date
+        self.start_time = start_time
+        self.end_time = end_time
+        self.organizer = organizer
+        self.vacants = vacants
+        self.vacants_left = vacants_left
+        self.state = state
+        self.distance_meters = distance_meters
+
+
 class Event:
     def __init__(
         self,
@@ -98,6 +142,7 @@ class Event:
         created_at: date,
         suspended_at: str,
         published_at: str,
+        distance_meters: Optional[float] = None,
     ):
         self.name = name
         self.description = description
@@ -121,6 +166,7 @@ class Event:
         self.created_at = created_at
         self.suspended_at = suspended_at
         self.published_at = published_at
+        self.distance_meters = distance_meters
 
     @classmethod
     def new(
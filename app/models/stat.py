@@ -1,3 +1,6 @@
+from app.models.event import State
+
+
 class EventBookingsByHourStat:
     def __init__(
         self,
@@ -61,6 +64,36 @@ class EventPublishedByTimeStat:
         self.events = events
 
 
+class ExpiredEventsStat:
+    def __init__(self, created_at: str, state: State, events: int):
+        self.created_at = created_at
+        self.state = state
+        self.events = events
+
+
+class OrganizerEventsStat:
+    def __init__(self, created_at: str, suspended_at: str, count: int):
+        self.created_at = created_at
+        self.suspended_at = suspended_at
+        self.count = count
+
+
+class EventStats:
+    def __init__(
+        self,
+        event_states: EventStatesStat,
+        top_organizers: list[OrganizerStat],
+        suspended_by_time: list[SuspendedEventStat],
+        events_by_time: list[EventByTimeStat],
+        events_published_by_time: list[EventPublishedByTimeStat],
+    ):
+        self.event_states = event_states
+        self.top_organizers = top_organizers
+        self.suspended_by_time = suspended_by_time
+        self.events_by_time = events_by_time
+        self.events_published_by_time = events_published_by_time
+
+
 class AppStats:
     def __init__(
         self,
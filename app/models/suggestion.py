@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class SuggestionType(Enum):
+    Event = "event"
+    Organizer = "organizer"
+
+
+class Suggestion:
+    def __init__(self, id: str, text: str, type: SuggestionType):
+        self.id = id
+        self.text = text
+        self.type = type
@@ -10,3 +10,15 @@ class LocationIncompleteError(ParserError):
     def __init__(self):
         msg = "location_incomplete_in_search"
         super().__init__(msg)
+
+
+class InvalidCursorError(ParserError):
+    def __init__(self):
+        msg = "invalid_cursor"
+        super().__init__(msg)
+
+
+class DistanceSortWithoutLocationError(ParserError):
+    def __init__(self):
+        msg = "distance_sort_without_location"
+        super().__init__(msg)
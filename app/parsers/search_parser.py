@@ -1,6 +1,12 @@
-from app.parsers.errors import LocationIncompleteError
+from app.models.event import EventSort
+from app.parsers.errors import (
+    LocationIncompleteError,
+    InvalidCursorError,
+    DistanceSortWithoutLocationError,
+)
 from app.repositories.event import Search, SearchLocation
 from app.schemas.event import SearchEvent
+from app.utils.cursor import decode_cursor
 
 
 class SearchEventsParser:
@@ -14,7 +20,10 @@ class SearchEventsParser:
         if lat and lng:
             location = SearchLocation(lat=lat, lng=lng, dist=search.dist)
 
-        return Search(
+        if search.sort == EventSort.distance and location is None:
+            raise DistanceSortWithoutLocationError
+
+        parsed = Search(
             location=location,
             organizer=search.organizer,
             type=search.type,
@@ -22,4 +31,17 @@ class SearchEventsParser:
             name=search.name,
             only_published=search.only_published,
             not_finished=search.not_finished,
+            sort=search.sort,
         )
+        if search.cursor:
+            parsed.cursor = self.parse_cursor(search.cursor, parsed.sort_fields())
+        return parsed
+
+    def parse_cursor(self, cursor: str, sort_fields: list[str]) -> list:
+        try:
+            values = decode_cursor(cursor)
+        except ValueError:
+            raise InvalidCursorError
+        if not isinstance(values, list) or len(values) != len(sort_fields):
+            raise InvalidCursorError
+        return values
@@ -1,10 +1,20 @@
+import uuid
+from datetime import datetime
+from typing import Iterator, List, Optional
 from app.repositories.config import db
+from app.repositories.bulk import bulk_write_in_batches
+from app.repositories.dates import DATE_FORMATS, bucket, day_start, to_local, to_utc
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from abc import ABC, abstractmethod
 from app.models.booking import Booking
 from app.schemas.stats import EventBookingsByHourStat
-from app.repositories.errors import BookingNotFoundError
-from app.utils.now import getNow
+from app.repositories.errors import BookingNotFoundError, DuplicatedBookingError
 from app.models.stat import VerifiedBookingStat
+from app.utils.now import getNow
+
+NOT_VERIFIED = "Not_verified"
+VERIFIED_TIME_FORMAT = '%Y-%m-%d %H:%M'
 
 
 class BookingRepository(ABC):
@@ -25,11 +35,29 @@ class BookingRepository(ABC):
         pass
 
     @abstractmethod
-    def verify_booking(self, booking_id: str) -> Booking:
+    def get_bookings(self, booking_ids: List[str]) -> list[Booking]:
+        pass
+
+    @abstractmethod
+    def check_in(
+        self, booking_id: str, event_id: str, verified_time: str
+    ) -> Optional[Booking]:
+        pass
+
+    @abstractmethod
+    def check_in_many(self, bookings: List[Booking]) -> list[Booking]:
+        pass
+
+    @abstractmethod
+    def get_bookings_by_event(
+        self, event_id: str, since: Optional[datetime] = None
+    ) -> list[Booking]:
         pass
 
     @abstractmethod
-    def get_bookings_by_event(self, event_id: str) -> list[Booking]:
+    def iterate_bookings(
+        self, event_id: Optional[str], batch_size: int
+    ) -> Iterator[Booking]:
         pass
 
     @abstractmethod
@@ -46,6 +74,10 @@ class BookingRepository(ABC):
     ) -> list[VerifiedBookingStat]:
         pass
 
+    @abstractmethod
+    def migrate_dates(self, batch_size: int) -> int:
+        pass
+
 
 class PersistentBookingRepository(BookingRepository):
     def __init__(self):
@@ -54,7 +86,10 @@ class PersistentBookingRepository(BookingRepository):
 
     def add_booking(self, booking: Booking) -> Booking:
         data = self.__serialize_booking(booking)
-        self.bookings.insert_one(data)
+        try:
+            self.bookings.insert_one(data)
+        except DuplicateKeyError:
+            raise DuplicatedBookingError
         return booking
 
     def booking_exists(self, event_id: str, reserver_id: str) -> bool:
@@ -67,10 +102,24 @@ class PersistentBookingRepository(BookingRepository):
         bookings = self.bookings.find({'reserver_id': reserver_id})
         return [self.__deserialize_booking(booking) for booking in bookings]
 
-    def get_bookings_by_event(self, event_id: str) -> list[Booking]:
-        bookings = self.bookings.find({'event_id': event_id})
+    def get_bookings_by_event(
+        self, event_id: str, since: Optional[datetime] = None
+    ) -> list[Booking]:
+        query = {'event_id': event_id}
+        if since is not None:
+            # Bookings written before updated_at existed only show up in
+            # full reads, until they are verified
+            query['updated_at'] = {'$gte': to_utc(since)}
+        bookings = self.bookings.find(query)
         return [self.__deserialize_booking(booking) for booking in bookings]
 
+    def iterate_bookings(
+        self, event_id: Optional[str], batch_size: int
+    ) -> Iterator[Booking]:
+        query = {} if event_id is None else {'event_id': event_id}
+        bookings = self.bookings.find(query).batch_size(batch_size)
+        return map(self.__deserialize_booking, bookings)
+
     def get_bookings_by_event_verified(self, event_id: str) -> list[Booking]:
         bookings = self.bookings.find({'event_id': event_id, 'verified': True})
         return [self.__deserialize_booking(booking) for booking in bookings]
@@ -79,8 +128,7 @@ class PersistentBookingRepository(BookingRepository):
         pipeline = [
             {'$match': {'event_id': event_id}},
             {'$match': {'verified': True}},
-            {'$project': {'verified_time': {'$substr': ['$verified_time', 0, 13]}}},
-            {'$group': {'_id': '$verified_time', 'count': {'$sum': 1}}},
+            {'$group': {'_id': bucket('$verified_time', 'hour'), 'count': {'$sum': 1}}},
         ]
         stats = self.bookings.aggregate(pipeline)
         return [self.__deserialize_stat(stat) for stat in stats]
@@ -91,44 +139,124 @@ class PersistentBookingRepository(BookingRepository):
             raise BookingNotFoundError
         return self.__deserialize_booking(booking)
 
-    def verify_booking(self, booking_id: str) -> Booking:
-        booking = self.get_booking(booking_id)
-        booking.verified = True
-        now = getNow()
-        booking.verified_time = now.strftime('%Y-%m-%d %H:%M')
-        data = self.__serialize_booking(booking)
-        self.bookings.update_one({'_id': booking_id}, {'$set': data})
-        return booking
+    def get_bookings(self, booking_ids: List[str]) -> list[Booking]:
+        bookings = self.bookings.find({'_id': {'$in': booking_ids}})
+        return [self.__deserialize_booking(booking) for booking in bookings]
+
+    def check_in(
+        self, booking_id: str, event_id: str, verified_time: str
+    ) -> Optional[Booking]:
+        # Only an unverified booking of the event is verified, so a ticket
+        # scanned at two doors at once lets in a single person
+        booking = self.bookings.find_one_and_update(
+            {'_id': booking_id, 'event_id': event_id, 'verified': False},
+            {
+                '$set': {
+                    'verified': True,
+                    'verified_time': self.__serialize_time(verified_time),
+                    'updated_at': to_utc(getNow()),
+                }
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if booking is None:
+            return None
+        return self.__deserialize_booking(booking)
+
+    def check_in_many(self, bookings: List[Booking]) -> list[Booking]:
+        # Same guard as check_in, for the verified_time each booking holds
+        if not bookings:
+            return []
+        updated_at = to_utc(getNow())
+        # Tells the bookings this batch verified from the ones verified
+        # elsewhere meanwhile, which may hold the same verified_time
+        check_in_id = uuid.uuid4().hex
+        result = self.bookings.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        '_id': booking.id,
+                        'event_id': booking.event_id,
+                        'verified': False,
+                    },
+                    {
+                        '$set': {
+                            'verified': True,
+                            'verified_time': self.__serialize_time(
+                                booking.verified_time
+                            ),
+                            'updated_at': updated_at,
+                            'check_in_id': check_in_id,
+                        }
+                    },
+                )
+                for booking in bookings
+            ],
+            ordered=False,
+        )
+        if result.modified_count == len(bookings):
+            return bookings
+        verified_ids = {
+            booking['_id']
+            for booking in self.bookings.find(
+                {
+                    '_id': {'$in': [booking.id for booking in bookings]},
+                    'check_in_id': check_in_id,
+                },
+                {'_id': 1},
+            )
+        }
+        return [booking for booking in bookings if booking.id in verified_ids]
 
     def get_verified_bookings_stat(
         self, start_date: str, end_date: str, group_by: str
     ) -> list[VerifiedBookingStat]:
-        match group_by:
-            case "day":
-                substr = 10
-            case "month":
-                substr = 7
-            case "year":
-                substr = 4
-            case _:
-                substr = 10
+        unit = group_by if group_by in DATE_FORMATS else 'day'
         pipeline = [
             {'$match': {'verified': True}},
-            {'$match': {'verified_time': {'$gte': start_date, '$lte': end_date}}},
-            {'$project': {'verified_time': {'$substr': ['$verified_time', 0, substr]}}},
-            {'$group': {'_id': '$verified_time', 'count': {'$sum': 1}}},
+            # The end date itself is left out, as when verified_time was
+            # compared as a string against it
+            {
+                '$match': {
+                    'verified_time': {
+                        '$gte': day_start(start_date),
+                        '$lt': day_start(end_date),
+                    }
+                }
+            },
+            {'$group': {'_id': bucket('$verified_time', unit), 'count': {'$sum': 1}}},
             {'$sort': {'_id': 1}},
         ]
         stats = self.bookings.aggregate(pipeline)
         return [VerifiedBookingStat(stat["_id"], stat["count"]) for stat in stats]
 
+    def migrate_dates(self, batch_size: int) -> int:
+        # Bookings written before dates were stored as BSON dates
+        bookings = self.bookings.find(
+            {'verified_time': {'$type': 'string'}}, {'verified_time': 1}
+        )
+        updates = (
+            UpdateOne(
+                {'_id': booking['_id']},
+                {
+                    '$set': {
+                        'verified_time': self.__serialize_time(booking['verified_time'])
+                    }
+                },
+            )
+            for booking in bookings
+        )
+        return bulk_write_in_batches(self.bookings, updates, batch_size)
+
     def __serialize_booking(self, booking: Booking) -> dict:
         serialized = {
             '_id': booking.id,
             "event_id": booking.event_id,
             "reserver_id": booking.reserver_id,
             "verified": booking.verified,
-            "verified_time": booking.verified_time,
+            "verified_time": self.__serialize_time(booking.verified_time),
+            # When it was created or verified last, for scanner manifest deltas
+            "updated_at": to_utc(getNow()),
         }
 
         return serialized
@@ -139,9 +267,19 @@ class PersistentBookingRepository(BookingRepository):
             event_id=data['event_id'],
             reserver_id=data['reserver_id'],
             verified=data['verified'],
-            verified_time=data['verified_time'],
+            verified_time=self.__deserialize_time(data['verified_time']),
         )
 
+    def __serialize_time(self, time: str) -> Optional[datetime]:
+        if time == NOT_VERIFIED:
+            return None
+        return to_utc(datetime.strptime(time, VERIFIED_TIME_FORMAT))
+
+    def __deserialize_time(self, time: Optional[datetime]) -> str:
+        if time is None:
+            return NOT_VERIFIED
+        return to_local(time).strftime(VERIFIED_TIME_FORMAT)
+
     def __deserialize_stat(self, data: dict) -> EventBookingsByHourStat:
         return EventBookingsByHourStat(
             time=data['_id'],
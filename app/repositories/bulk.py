@@ -0,0 +1,15 @@
+from itertools import islice
+from typing import Iterable
+from pymongo.collection import Collection
+
+
+def bulk_write_in_batches(
+    collection: Collection, operations: Iterable, batch_size: int
+) -> int:
+    # Sends the operations batch_size at a time, so a large backfill never
+    # holds every pending write in memory
+    operations = iter(operations)
+    modified = 0
+    while batch := list(islice(operations, batch_size)):
+        modified += collection.bulk_write(batch, ordered=False).modified_count
+    return modified
@@ -0,0 +1,83 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+
+
+class CacheMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class LocalCache(CacheBackend):
+    # In-process LRU: entries expire after ttl seconds and the least recently
+    # used one is evicted once max_size is reached.
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.metrics = CacheMetrics()
+        self.lock = Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.metrics.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                self.metrics.expirations += 1
+                self.metrics.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.metrics.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.metrics.evictions += 1
+
+    def delete(self, key: str):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.metrics.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.metrics.invalidations += len(self.entries)
+            self.entries.clear()
@@ -0,0 +1,325 @@
+import copy
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.models.event import (
+    Collaborator,
+    Event,
+    EventSort,
+    EventSummary,
+    State,
+    Type,
+)
+from app.models.stat import (
+    EventStatesStat,
+    OrganizerStat,
+    SuspendedEventStat,
+    EventByTimeStat,
+    EventPublishedByTimeStat,
+    EventStats,
+    ExpiredEventsStat,
+    OrganizerEventsStat,
+)
+from app.repositories.cache import CacheBackend
+from app.repositories.event import (
+    EventPosition,
+    EventRepository,
+    Search,
+    SearchLocation,
+)
+from app.utils.geo import distance, tile, tile_center, tile_radius
+
+# Cached for tiles with too many events around to serve them by id
+DENSE_TILE = 'dense'
+
+
+class GeoSearchMetrics:
+    def __init__(self):
+        self.searches = 0
+        self.fallbacks = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+
+
+class CachedEventRepository(EventRepository):
+    # Read-through cache for get_event. Every write drops the cached copy of
+    # the events it touches; bulk writes drop the whole cache.
+    #
+    # The cache is per process: a write through another replica, such as a
+    # booking moving vacants_left, is seen here only once the copy expires,
+    # up to EVENT_CACHE_TTL seconds later. Writes never rely on the cached
+    # copy, they are checked against the database.
+    #
+    # Location searches share the positions of the events around each tile of
+    # a tile_size degrees grid: any point of the tile is served from the
+    # events within dist of the tile, filtered by exact distance in memory.
+    def __init__(
+        self,
+        repository: EventRepository,
+        cache: CacheBackend,
+        geo_cache: CacheBackend,
+        tile_size: float,
+        max_events: int,
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.geo_cache = geo_cache
+        self.tile_size = tile_size
+        self.max_events = max_events
+        self.geo_metrics = GeoSearchMetrics()
+        # Bumped on every invalidation, so a read that raced with a write
+        # does not store the value it fetched before the write.
+        self.generation = 0
+        self.lock = Lock()
+
+    def add_event(self, event: Event) -> Event:
+        try:
+            return self.repository.add_event(event)
+        finally:
+            self.__invalidate(event.id, positions=True)
+
+    def add_events(
+        self, events: List[Event], ordered: bool
+    ) -> Tuple[List[Event], List[str], List[str]]:
+        try:
+            return self.repository.add_events(events, ordered)
+        finally:
+            with self.lock:
+                self.generation += 1
+                self.geo_cache.clear()
+
+    def get_event(self, id: str) -> Event:
+        event = self.cache.get(self.__key(id))
+        if event is not None:
+            return copy.deepcopy(event)
+        generation = self.generation
+        event = self.repository.get_event(id)
+        with self.lock:
+            if generation == self.generation:
+                self.cache.set(self.__key(id), copy.deepcopy(event))
+        return event
+
+    def event_exists(self, id: str) -> bool:
+        return self.repository.event_exists(id)
+
+    def search_events(self, search: Search) -> List[Event]:
+        return self.__search(search, self.repository.search_events)
+
+    def iterate_events(self, batch_size: int) -> Iterator[Event]:
+        return self.repository.iterate_events(batch_size)
+
+    def search_event_summaries(self, search: Search) -> List[EventSummary]:
+        return self.__search(search, self.repository.search_event_summaries)
+
+    def search_positions(
+        self, location: SearchLocation, type: Optional[Type]
+    ) -> List[EventPosition]:
+        return self.repository.search_positions(location, type)
+
+    def get_events_by_id(self, ids: List[str]) -> List[Event]:
+        return self.repository.get_events_by_id(ids)
+
+    def get_events_by_id_with_date_filter(self, ids: List[str]) -> List[Event]:
+        return self.repository.get_events_by_id_with_date_filter(ids)
+
+    def get_event_summaries_by_id_with_date_filter(
+        self, ids: List[str]
+    ) -> List[EventSummary]:
+        return self.repository.get_event_summaries_by_id_with_date_filter(ids)
+
+    def update_vacants_left_event(self, id: str, vacants_left: int) -> Event:
+        return self.__write(id, self.repository.update_vacants_left_event, vacants_left)
+
+    def reserve_vacant(self, id: str) -> Optional[Event]:
+        return self.__write(id, self.repository.reserve_vacant)
+
+    def release_vacant(self, id: str):
+        return self.__write(id, self.repository.release_vacant)
+
+    def update_state_event(self, id: str, state: State) -> Event:
+        return self.__write(id, self.repository.update_state_event, state)
+
+    def update_published_at(self, id: str, published_at: str) -> Event:
+        return self.__write(id, self.repository.update_published_at, published_at)
+
+    def transition_event(
+        self,
+        id: str,
+        previous: List[State],
+        state: State,
+        published_at: Optional[str] = None,
+        suspended_at: Optional[str] = None,
+    ) -> Optional[Tuple[Event, Event]]:
+        return self.__write(
+            id,
+            self.repository.transition_event,
+            previous,
+            state,
+            published_at,
+            suspended_at,
+        )
+
+    def update_verified_vacants(self, id: str, verified_vacants: int) -> Event:
+        return self.__write(
+            id, self.repository.update_verified_vacants, verified_vacants
+        )
+
+    def add_verified_vacants(self, id: str, count: int) -> Event:
+        return self.__write(id, self.repository.add_verified_vacants, count)
+
+    def update_event(self, event: Event) -> Optional[Event]:
+        try:
+            return self.repository.update_event(event)
+        finally:
+            # The location or type may have changed
+            self.__invalidate(event.id, positions=True)
+
+    def update_vacants(self, id: str, vacants: int) -> Optional[Event]:
+        return self.__write(id, self.repository.update_vacants, vacants)
+
+    def add_collaborator(self, id: str, collaborator: Collaborator) -> Event:
+        return self.__write(id, self.repository.add_collaborator, collaborator)
+
+    def remove_collaborator(self, id: str, collaborator_id: str) -> Event:
+        return self.__write(id, self.repository.remove_collaborator, collaborator_id)
+
+    def update_suspended_at(self, id: str, suspended_at: str) -> Event:
+        return self.__write(id, self.repository.update_suspended_at, suspended_at)
+
+    def get_expired_events_stat(self, now: datetime) -> list[ExpiredEventsStat]:
+        return self.repository.get_expired_events_stat(now)
+
+    def update_state_all_events(self, now: datetime) -> int:
+        try:
+            return self.repository.update_state_all_events(now)
+        finally:
+            self.clear()
+
+    def update_organizer_events_state(
+        self, organizer_id: str, old: State, new: State, suspended_at: Optional[str]
+    ) -> list[OrganizerEventsStat]:
+        try:
+            return self.repository.update_organizer_events_state(
+                organizer_id, old, new, suspended_at
+            )
+        finally:
+            self.clear()
+
+    def add_missing_transitions(self, batch_size: int) -> int:
+        return self.repository.add_missing_transitions(batch_size)
+
+    def add_missing_search_tokens(self, batch_size: int) -> int:
+        return self.repository.add_missing_search_tokens(batch_size)
+
+    def migrate_dates(self, batch_size: int) -> int:
+        try:
+            return self.repository.migrate_dates(batch_size)
+        finally:
+            self.clear()
+
+    def get_event_states_stat(self, start_date: str, end_date: str) -> EventStatesStat:
+        return self.repository.get_event_states_stat(start_date, end_date)
+
+    def get_suspended_by_time(self, start: str, end: str) -> list[SuspendedEventStat]:
+        return self.repository.get_suspended_by_time(start, end)
+
+    def get_top_organizers_stat(
+        self, start_date: str, end_date: str
+    ) -> list[OrganizerStat]:
+        return self.repository.get_top_organizers_stat(start_date, end_date)
+
+    def get_events_by_time(
+        self, start_date: str, end_date: str
+    ) -> list[EventByTimeStat]:
+        return self.repository.get_events_by_time(start_date, end_date)
+
+    def get_events_published_by_time(
+        self, start_date: str, end_date: str
+    ) -> list[EventPublishedByTimeStat]:
+        return self.repository.get_events_published_by_time(start_date, end_date)
+
+    def get_event_stats(self, start_date: str, end_date: str) -> EventStats:
+        return self.repository.get_event_stats(start_date, end_date)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+            self.geo_cache.clear()
+
+    def __write(self, id: str, method, *args):
+        # Invalidated even when the write fails, as it may have been applied
+        try:
+            return method(id, *args)
+        finally:
+            self.__invalidate(id)
+
+    def __invalidate(self, id: str, positions: bool = False):
+        with self.lock:
+            self.generation += 1
+            self.cache.delete(self.__key(id))
+            if positions:
+                self.geo_cache.clear()
+
+    def __search(self, search: Search, method: Callable) -> list:
+        # Ordering by distance is left to the database, which sorts and
+        # limits within the radius
+        if (
+            search.location is None
+            or search.ids is not None
+            or search.sort == EventSort.distance
+        ):
+            return method(search)
+        start = time.perf_counter()
+        try:
+            distances = self.__distances_within(search.location, search.type)
+            if distances is None:
+                self.geo_metrics.fallbacks += 1
+                return method(search)
+            if not distances:
+                return []
+            # Same filters, sort and cursor, now over an _id lookup
+            by_ids = copy.copy(search)
+            by_ids.location = None
+            by_ids.ids = list(distances)
+            events = method(by_ids)
+            for event in events:
+                event.distance_meters = distances[event.id]
+            return events
+        finally:
+            duration = time.perf_counter() - start
+            self.geo_metrics.searches += 1
+            self.geo_metrics.last_duration = duration
+            self.geo_metrics.total_duration += duration
+
+    def __distances_within(
+        self, location: SearchLocation, type: Optional[Type]
+    ) -> Optional[Dict[str, float]]:
+        cell = tile(location.lat, location.lng, self.tile_size)
+        key = f'{cell[0]}:{cell[1]}:{location.dist}:{type and type.value}'
+        positions = self.geo_cache.get(key)
+        if positions is None:
+            generation = self.generation
+            lat, lng = tile_center(cell, self.tile_size)
+            radius = location.dist + tile_radius(cell, self.tile_size)
+            positions = self.repository.search_positions(
+                SearchLocation(lat=lat, lng=lng, dist=radius), type
+            )
+            if len(positions) > self.max_events:
+                # A plain geo query is cheaper than looking that many up by id
+                positions = DENSE_TILE
+            with self.lock:
+                if generation == self.generation:
+                    self.geo_cache.set(key, positions)
+        if positions == DENSE_TILE:
+            return None
+        distances = {}
+        for position in positions:
+            meters = distance(location.lat, location.lng, position.lat, position.lng)
+            if meters <= location.dist:
+                distances[position.id] = meters
+        return distances
+
+    def __key(self, id: str) -> str:
+        return f"event:{id}"
@@ -0,0 +1,88 @@
+from threading import Lock
+from typing import Dict, List
+from app.models.organizer import Organizer
+from app.repositories.cache import CacheBackend
+from app.repositories.organizers import OrganizerRepository
+
+
+class CachedOrganizerRepository(OrganizerRepository):
+    # Caches organizer display names, which are read far more often than they
+    # change. Every write drops the cached name of the organizer it touches.
+    def __init__(self, repository: OrganizerRepository, cache: CacheBackend):
+        self.repository = repository
+        self.cache = cache
+        # Bumped on every invalidation, so a read that raced with a write
+        # does not store the names it fetched before the write.
+        self.generation = 0
+        self.lock = Lock()
+
+    def add_organizer(self, organizer: Organizer) -> Organizer:
+        try:
+            return self.repository.add_organizer(organizer)
+        finally:
+            self.__invalidate(organizer.id)
+
+    def get_organizer(self, id: str) -> Organizer:
+        return self.repository.get_organizer(id)
+
+    def get_organizers_by_id(self, ids: List[str]) -> List[Organizer]:
+        return self.repository.get_organizers_by_id(ids)
+
+    def get_organizer_names(self, ids: List[str]) -> Dict[str, str]:
+        names = {}
+        missing = []
+        for id in ids:
+            name = self.cache.get(self.__key(id))
+            if name is None:
+                missing.append(id)
+            else:
+                names[id] = name
+        if not missing:
+            return names
+        generation = self.generation
+        fetched = self.repository.get_organizer_names(missing)
+        with self.lock:
+            if generation == self.generation:
+                for id, name in fetched.items():
+                    self.cache.set(self.__key(id), name)
+        return {**names, **fetched}
+
+    def organizer_exists(self, id: str) -> bool:
+        return self.repository.organizer_exists(id)
+
+    def organizer_exists_by_email(self, email: str) -> bool:
+        return self.repository.organizer_exists_by_email(email)
+
+    def get_organizer_by_email(self, email: str) -> Organizer:
+        return self.repository.get_organizer_by_email(email)
+
+    def update_organizer(self, organizer: Organizer) -> Organizer:
+        try:
+            return self.repository.update_organizer(organizer)
+        finally:
+            self.__invalidate(organizer.id)
+
+    def suspend_organizer(self, id: str) -> Organizer:
+        try:
+            return self.repository.suspend_organizer(id)
+        finally:
+            self.__invalidate(id)
+
+    def unsuspend_organizer(self, id: str) -> Organizer:
+        try:
+            return self.repository.unsuspend_organizer(id)
+        finally:
+            self.__invalidate(id)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+
+    def __invalidate(self, id: str):
+        with self.lock:
+            self.generation += 1
+            self.cache.delete(self.__key(id))
+
+    def __key(self, id: str) -> str:
+        return f"organizer_name:{id}"
@@ -1,4 +1,7 @@
 from app.repositories.config import db
+from app.repositories.bulk import bulk_write_in_batches
+from app.repositories.dates import bucket, day_range, day_start, to_local
+from pymongo import UpdateOne
 from abc import ABC, abstractmethod
 from app.models.complaint import (
     Complaint,
@@ -8,8 +11,8 @@ from app.models.complaint import (
 )
 from app.repositories.errors import ComplaintNotFoundError
 from bson.son import SON
-from datetime import date
-from typing import Optional
+from datetime import date, timedelta
+from typing import Iterator, Optional
 from app.models.stat import ComplaintsByTimeStat
 
 
@@ -38,6 +41,10 @@ class ComplaintRepository(ABC):
     def get_complaints_by_event(self, event_id: str, filter: Filter) -> list[Complaint]:
         pass
 
+    @abstractmethod
+    def iterate_complaints(self, batch_size: int) -> Iterator[Complaint]:
+        pass
+
     @abstractmethod
     def get_complaint(self, complaint_id: str) -> Complaint:
         pass
@@ -64,6 +71,10 @@ class ComplaintRepository(ABC):
     ) -> list[ComplaintsByTimeStat]:
         pass
 
+    @abstractmethod
+    def migrate_dates(self, batch_size: int) -> int:
+        pass
+
 
 class PersistentComplaintRepository(ComplaintRepository):
     def __init__(self):
@@ -95,6 +106,10 @@ class PersistentComplaintRepository(ComplaintRepository):
         complaints = self.complaints.aggregate(pipeline)
         return [self.__deserialize_complaint(complaint) for complaint in complaints]
 
+    def iterate_complaints(self, batch_size: int) -> Iterator[Complaint]:
+        complaints = self.complaints.find().batch_size(batch_size)
+        return map(self.__deserialize_complaint, complaints)
+
     def get_complaint(self, complaint_id: str) -> Complaint:
         complaint = self.complaints.find_one({'_id': complaint_id})
         if complaint is None:
@@ -129,20 +144,32 @@ class PersistentComplaintRepository(ComplaintRepository):
         self, start: str, end: str
     ) -> list[ComplaintsByTimeStat]:
         pipeline = [
-            {'$match': {'date': {'$gte': start, '$lte': end}}},
-            {'$project': {'date': {'$substr': ['$date', 0, 7]}}},
-            {'$group': {'_id': '$date', 'count': {'$sum': 1}}},
+            {'$match': {'date': day_range(start, end)}},
+            {'$group': {'_id': bucket('$date', 'month'), 'count': {'$sum': 1}}},
             {'$sort': {'_id': 1}},
         ]
         stats = self.complaints.aggregate(pipeline)
         return [ComplaintsByTimeStat(stat['_id'], stat['count']) for stat in stats]
 
+    def migrate_dates(self, batch_size: int) -> int:
+        # Complaints written before dates were stored as BSON dates
+        complaints = self.complaints.find({'date': {'$type': 'string'}}, {'date': 1})
+        updates = (
+            UpdateOne(
+                {'_id': complaint['_id']},
+                {'$set': {'date': day_start(complaint['date'])}},
+            )
+            for complaint in complaints
+        )
+        return bulk_write_in_batches(self.complaints, updates, batch_size)
+
     def __get_pipeline(self, filter: Filter):
         pipeline = []
         if filter.start:
-            pipeline.append({'$match': {'date': {'$gte': filter.start.isoformat()}}})
+            pipeline.append({'$match': {'date': {'$gte': day_start(filter.start)}}})
         if filter.end:
-            pipeline.append({'$match': {'date': {'$lte': filter.end.isoformat()}}})
+            end = day_start(filter.end + timedelta(days=1))
+            pipeline.append({'$match': {'date': {'$lt': end}}})
         return pipeline
 
     def __serialize_complaint(self, complaint: Complaint) -> dict:
@@ -153,7 +180,7 @@ class PersistentComplaintRepository(ComplaintRepository):
             "type": complaint.type.value,
             "description": complaint.description,
             "organizer_id": complaint.organizer_id,
-            "date": str(complaint.date),
+            "date": day_start(complaint.date),
         }
 
         return serialized
@@ -166,5 +193,5 @@ class PersistentComplaintRepository(ComplaintRepository):
             type=ComplaintType(data['type']),
             description=data['description'],
             organizer_id=data['organizer_id'],
-            date=date.fromisoformat(data['date']),
+            date=to_local(data['date']).date(),
         )
@@ -1,7 +1,19 @@
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
-from app.config.constants import DB_URL, DB_NAME, ENV_NAME
+from app.config.constants import (
+    DB_URL,
+    DB_NAME,
+    ENV_NAME,
+    DB_MAX_POOL_SIZE,
+    DB_MIN_POOL_SIZE,
+    DB_MAX_IDLE_TIME_MS,
+    DB_CONNECT_TIMEOUT_MS,
+    DB_SOCKET_TIMEOUT_MS,
+    DB_SERVER_SELECTION_TIMEOUT_MS,
+    DB_MONITORING,
+)
 from app.config.logger import setup_logger
+from app.repositories.monitoring import CommandCounter
 from pymongo_inmemory import MongoClient as MemoryMongoClient
 from pathlib import Path
 import shutil
@@ -9,15 +21,29 @@ import shutil
 logger = setup_logger(__name__)
 
 
+def client_options() -> dict:
+    options = {
+        'maxPoolSize': DB_MAX_POOL_SIZE,
+        'minPoolSize': DB_MIN_POOL_SIZE,
+        'maxIdleTimeMS': DB_MAX_IDLE_TIME_MS,
+        'connectTimeoutMS': DB_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': DB_SOCKET_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': DB_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if DB_MONITORING:
+        options['event_listeners'] = [CommandCounter()]
+    return options
+
+
 def get_database():
     if ENV_NAME == 'TEST':
-        conn = MemoryMongoClient()
+        conn = MemoryMongoClient(**client_options())
         logger.info("Memory DB initialized")
         return conn[DB_NAME]
     else:
         while True:
             try:
-                conn = MongoClient(DB_URL, serverSelectionTimeoutMS=5000)
+                conn = MongoClient(DB_URL, **client_options())
                 conn.admin.command('ismaster')
                 logger.info("Connection with DB established")
                 return conn[DB_NAME]
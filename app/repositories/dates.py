@@ -0,0 +1,53 @@
+import datetime
+from typing import Union
+from app.config.constants import TIMEZONE
+from app.utils.now import getTimezone
+
+# Label of each unit stats can be grouped by, weeks are named by their monday
+DATE_FORMATS = {
+    'hour': '%Y-%m-%d %H',
+    'day': '%Y-%m-%d',
+    'week': '%Y-%m-%d',
+    'month': '%Y-%m',
+    'year': '%Y',
+}
+
+
+def to_utc(value: datetime.datetime) -> datetime.datetime:
+    # Dates are stored as naive UTC, which is how PyMongo reads them back.
+    # Naive values are wall-clock times in TIMEZONE.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=getTimezone())
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def to_local(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(tzinfo=datetime.timezone.utc).astimezone(getTimezone())
+
+
+def day_start(day: Union[str, datetime.date]) -> datetime.datetime:
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day)
+    return to_utc(datetime.datetime.combine(day, datetime.time()))
+
+
+def day_range(start: Union[str, datetime.date], end: Union[str, datetime.date]) -> dict:
+    # Every instant of the days from start to end, both included
+    return {
+        '$gte': day_start(start),
+        '$lt': day_start(end) + datetime.timedelta(days=1),
+    }
+
+
+def bucket(field: str, unit: str) -> dict:
+    # Label of the unit of TIMEZONE the date in field falls in
+    trunc = {'date': field, 'unit': unit, 'timezone': TIMEZONE}
+    if unit == 'week':
+        trunc['startOfWeek'] = 'monday'
+    return {
+        '$dateToString': {
+            'date': {'$dateTrunc': trunc},
+            'format': DATE_FORMATS[unit],
+            'timezone': TIMEZONE,
+        }
+    }
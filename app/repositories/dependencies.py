@@ -0,0 +1,82 @@
+from app.config.constants import (
+    EVENT_STATS_PIPELINE,
+    EVENT_CACHE_SIZE,
+    EVENT_CACHE_TTL,
+    GEO_CACHE_SIZE,
+    GEO_CACHE_TTL,
+    GEO_TILE_SIZE,
+    GEO_TILE_MAX_EVENTS,
+    ORGANIZER_NAME_CACHE_SIZE,
+    ORGANIZER_NAME_CACHE_TTL,
+)
+from app.repositories.event import EventRepository, PersistentEventRepository
+from app.repositories.cache import LocalCache
+from app.repositories.cached_event import CachedEventRepository
+from app.repositories.cached_organizer import CachedOrganizerRepository
+from app.repositories.bookings import BookingRepository, PersistentBookingRepository
+from app.repositories.users import UserRepository, PersistentUserRepository
+from app.repositories.organizers import (
+    OrganizerRepository,
+    PersistentOrganizerRepository,
+)
+from app.repositories.complaints import (
+    ComplaintRepository,
+    PersistentComplaintRepository,
+)
+from app.repositories.leases import PersistentLeaseRepository
+from app.repositories.rollups import (
+    StatsRollupRepository,
+    PersistentStatsRollupRepository,
+)
+from app.repositories.suggestions import (
+    SuggestionRepository,
+    InMemorySuggestionRepository,
+)
+
+event_cache = LocalCache(EVENT_CACHE_SIZE, EVENT_CACHE_TTL)
+geo_cache = LocalCache(GEO_CACHE_SIZE, GEO_CACHE_TTL)
+event_repository = CachedEventRepository(
+    PersistentEventRepository(EVENT_STATS_PIPELINE),
+    event_cache,
+    geo_cache,
+    GEO_TILE_SIZE,
+    GEO_TILE_MAX_EVENTS,
+)
+booking_repository = PersistentBookingRepository()
+user_repository = PersistentUserRepository()
+organizer_name_cache = LocalCache(ORGANIZER_NAME_CACHE_SIZE, ORGANIZER_NAME_CACHE_TTL)
+organizer_repository = CachedOrganizerRepository(
+    PersistentOrganizerRepository(), organizer_name_cache
+)
+complaint_repository = PersistentComplaintRepository()
+lease_repository = PersistentLeaseRepository()
+suggestion_repository = InMemorySuggestionRepository()
+rollup_repository = PersistentStatsRollupRepository()
+
+
+async def get_event_repository() -> EventRepository:
+    return event_repository
+
+
+async def get_booking_repository() -> BookingRepository:
+    return booking_repository
+
+
+async def get_user_repository() -> UserRepository:
+    return user_repository
+
+
+async def get_organizer_repository() -> OrganizerRepository:
+    return organizer_repository
+
+
+async def get_complaint_repository() -> ComplaintRepository:
+    return complaint_repository
+
+
+async def get_suggestion_repository() -> SuggestionRepository:
+    return suggestion_repository
+
+
+async def get_rollup_repository() -> StatsRollupRepository:
+    return rollup_repository
@@ -34,3 +34,9 @@ class ComplaintNotFoundError(RepositoryError):
     def __init__(self):
         msg = "complaint_not_found"
         super().__init__(msg)
+
+
+class DuplicatedBookingError(RepositoryError):
+    def __init__(self):
+        msg = "booking_already_exists"
+        super().__init__(msg)
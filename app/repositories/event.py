@@ -1,22 +1,80 @@
-from typing import List, Optional
+import re
+import uuid
+from typing import Iterator, List, Optional, Tuple
 from app.config.logger import setup_logger
 from app.repositories.config import db
-from pymongo import GEOSPHERE
-from bson.son import SON
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from abc import ABC, abstractmethod
-from app.models.event import Type, Event, Location, Agenda, Faq, State, Collaborator
+from app.models.event import (
+    Type,
+    Event,
+    EventSort,
+    EventSummary,
+    Location,
+    Agenda,
+    Faq,
+    State,
+    Collaborator,
+)
 from app.repositories.errors import EventNotFoundError
-from datetime import date, time, timedelta
+from datetime import date, datetime, time, timedelta
 from app.utils.now import getNow
+from app.utils.text import relevance, tokenize
+from app.utils.geo import EARTH_RADIUS_METERS
+from app.repositories.bulk import bulk_write_in_batches
+from app.repositories.dates import bucket, day_range, day_start, to_local
 from app.models.stat import (
     EventStatesStat,
     OrganizerStat,
     SuspendedEventStat,
     EventByTimeStat,
     EventPublishedByTimeStat,
+    EventStats,
+    ExpiredEventsStat,
+    OrganizerEventsStat,
 )
 
-EARTH_RADIUS_METERS = 6_371_000
+FACET = "facet"
+NOT_PUBLISHED = "Not_published"
+NOT_SUSPENDED = "Not_suspended"
+DUPLICATE_KEY = 11000
+
+# Fields needed to render an event in a list
+SUMMARY_PROJECTION = {
+    'name': 1,
+    'location': 1,
+    'type': 1,
+    'preview_image': 1,
+    'date': 1,
+    'start_time': 1,
+    'end_time': 1,
+    'organizer': 1,
+    'vacants': 1,
+    'vacants_left': 1,
+    'state': 1,
+}
+
+# What update_event writes. Counters and state have updates of their own, so
+# an update built from an outdated copy of the event can't undo them.
+UPDATED_FIELDS = [
+    'name',
+    'description',
+    'location',
+    'type',
+    'images',
+    'preview_image',
+    'date',
+    'start_time',
+    'end_time',
+    'scan_time',
+    'agenda',
+    'FAQ',
+    'search_tokens',
+    'name_tokens',
+    'next_transition_at',
+]
+UPDATABLE_STATES = [State.Borrador.value, State.Publicado.value]
 
 
 class SearchLocation:
@@ -26,6 +84,13 @@ class SearchLocation:
         self.dist = dist
 
 
+class EventPosition:
+    def __init__(self, id: str, lat: float, lng: float):
+        self.id = id
+        self.lat = lat
+        self.lng = lng
+
+
 class Search:
     def __init__(
         self,
@@ -36,6 +101,9 @@ class Search:
         name: str,
         only_published: bool,
         not_finished: bool,
+        cursor: Optional[list] = None,
+        ids: Optional[List[str]] = None,
+        sort: Optional[EventSort] = None,
     ):
         self.organizer = organizer
         self.type = type
@@ -44,6 +112,43 @@ class Search:
         self.name = name
         self.only_published = only_published
         self.not_finished = not_finished
+        self.cursor = cursor
+        self.ids = ids
+        self.sort = sort
+
+    def name_terms(self) -> List[str]:
+        return tokenize(self.name) if self.name else []
+
+    def ranks_by_name(self) -> bool:
+        # Without an explicit sort, the best name matches come first
+        return self.sort is None and bool(self.name_terms())
+
+    def sort_fields(self) -> List[str]:
+        # _id breaks ties so every event has a unique position to resume from
+        sort = self.sort
+        if sort is None:
+            sort = EventSort.date if self.organizer else EventSort.vacants
+        if sort == EventSort.distance:
+            fields = ['distance_meters', '_id']
+        elif sort == EventSort.date:
+            fields = ['date', 'start_time', '_id']
+        else:
+            fields = ['vacants', '_id']
+        if self.ranks_by_name():
+            return ['name_rank'] + fields
+        return fields
+
+    def sort_values(self, event: Event) -> list:
+        values = {
+            'vacants': event.vacants,
+            'date': str(event.date),
+            'start_time': str(event.start_time),
+            'distance_meters': event.distance_meters,
+            '_id': event.id,
+        }
+        if self.ranks_by_name():
+            values['name_rank'] = -relevance(event.name, self.name_terms())
+        return [values[field] for field in self.sort_fields()]
 
 
 class EventRepository(ABC):
@@ -51,6 +156,12 @@ class EventRepository(ABC):
     def add_event(self, event: Event) -> Event:
         pass
 
+    @abstractmethod
+    def add_events(
+        self, events: List[Event], ordered: bool
+    ) -> Tuple[List[Event], List[str], List[str]]:
+        pass
+
     @abstractmethod
     def get_event(self, id: str) -> Event:
         pass
@@ -59,10 +170,24 @@ class EventRepository(ABC):
     def event_exists(self, id: str) -> bool:
         pass
 
+    @abstractmethod
+    def iterate_events(self, batch_size: int) -> Iterator[Event]:
+        pass
+
     @abstractmethod
     def search_events(self, search: Search) -> List[Event]:
         pass
 
+    @abstractmethod
+    def search_event_summaries(self, search: Search) -> List[EventSummary]:
+        pass
+
+    @abstractmethod
+    def search_positions(
+        self, location: SearchLocation, type: Optional[Type]
+    ) -> List[EventPosition]:
+        pass
+
     @abstractmethod
     def get_events_by_id(self, ids: List[str]) -> List[Event]:
         pass
@@ -71,10 +196,24 @@ class EventRepository(ABC):
     def get_events_by_id_with_date_filter(self, ids: List[str]) -> List[Event]:
         pass
 
+    @abstractmethod
+    def get_event_summaries_by_id_with_date_filter(
+        self, ids: List[str]
+    ) -> List[EventSummary]:
+        pass
+
     @abstractmethod
     def update_vacants_left_event(self, id: str, vacants_left: int) -> Event:
         pass
 
+    @abstractmethod
+    def reserve_vacant(self, id: str) -> Optional[Event]:
+        pass
+
+    @abstractmethod
+    def release_vacant(self, id: str):
+        pass
+
     @abstractmethod
     def update_state_event(self, id: str, state: State) -> Event:
         pass
@@ -83,12 +222,39 @@ class EventRepository(ABC):
     def update_published_at(self, id: str, published_at: str) -> Event:
         pass
 
+    @abstractmethod
+    def transition_event(
+        self,
+        id: str,
+        previous: List[State],
+        state: State,
+        published_at: Optional[str] = None,
+        suspended_at: Optional[str] = None,
+    ) -> Optional[Tuple[Event, Event]]:
+        pass
+
     @abstractmethod
     def update_verified_vacants(self, id: str, verified_vacants: int) -> Event:
         pass
 
     @abstractmethod
-    def update_event(self, id: str, event: Event) -> Event:
+    def add_verified_vacants(self, id: str, count: int) -> Event:
+        pass
+
+    @abstractmethod
+    def update_event(self, event: Event) -> Optional[Event]:
+        pass
+
+    @abstractmethod
+    def update_vacants(self, id: str, vacants: int) -> Optional[Event]:
+        pass
+
+    @abstractmethod
+    def add_collaborator(self, id: str, collaborator: Collaborator) -> Event:
+        pass
+
+    @abstractmethod
+    def remove_collaborator(self, id: str, collaborator_id: str) -> Event:
         pass
 
     @abstractmethod
@@ -100,7 +266,29 @@ class EventRepository(ABC):
         pass
 
     @abstractmethod
-    def update_state_all_events(self):
+    def get_expired_events_stat(self, now: datetime) -> list[ExpiredEventsStat]:
+        pass
+
+    @abstractmethod
+    def update_state_all_events(self, now: datetime) -> int:
+        pass
+
+    @abstractmethod
+    def add_missing_transitions(self, batch_size: int) -> int:
+        pass
+
+    @abstractmethod
+    def add_missing_search_tokens(self, batch_size: int) -> int:
+        pass
+
+    @abstractmethod
+    def migrate_dates(self, batch_size: int) -> int:
+        pass
+
+    @abstractmethod
+    def update_organizer_events_state(
+        self, organizer_id: str, old: State, new: State, suspended_at: Optional[str]
+    ) -> list[OrganizerEventsStat]:
         pass
 
     @abstractmethod
@@ -125,18 +313,51 @@ class EventRepository(ABC):
     ) -> list[EventPublishedByTimeStat]:
         pass
 
+    @abstractmethod
+    def get_event_stats(self, start_date: str, end_date: str) -> EventStats:
+        pass
+
 
 class PersistentEventRepository(EventRepository):
-    def __init__(self):
+    def __init__(self, stats_pipeline: str = FACET):
         COLLECTION_NAME = "Events"
         self.events = db[COLLECTION_NAME]
-        self.events.create_index([("location", GEOSPHERE)])
+        self.stats_pipeline = stats_pipeline
 
     def add_event(self, event: Event) -> Event:
         data = self.__serialize_event(event)
         self.events.insert_one(data)
         return event
 
+    def add_events(
+        self, events: List[Event], ordered: bool
+    ) -> Tuple[List[Event], List[str], List[str]]:
+        # Unordered inserts keep going past a failed document, ordered ones
+        # stop at the first failure. Returns the events inserted, the ids of
+        # the ones that already existed and of the ones that failed otherwise;
+        # any other event was not attempted.
+        if not events:
+            return [], [], []
+        try:
+            self.events.insert_many(
+                [self.__serialize_event(event) for event in events], ordered=ordered
+            )
+            return events, [], []
+        except BulkWriteError as e:
+            errors = {
+                error['index']: error['code'] for error in e.details['writeErrors']
+            }
+            duplicated = [
+                events[i].id for i, code in errors.items() if code == DUPLICATE_KEY
+            ]
+            failed = [
+                events[i].id for i, code in errors.items() if code != DUPLICATE_KEY
+            ]
+            if ordered:
+                return events[: min(errors)], duplicated, failed
+            inserted = [event for i, event in enumerate(events) if i not in errors]
+            return inserted, duplicated, failed
+
     def get_event(self, id: str) -> Event:
         event = self.events.find_one({'_id': id})
         if event is None:
@@ -147,83 +368,191 @@ class PersistentEventRepository(EventRepository):
         event = self.events.find_one({'_id': id})
         return event is not None
 
+    def iterate_events(self, batch_size: int) -> Iterator[Event]:
+        events = self.events.find().batch_size(batch_size)
+        return map(self.__deserialize_event, events)
+
     def search_events(self, search: Search) -> List[Event]:
-        serialized_search = self.__serialize_search(search)
-        events = self.events.find(serialized_search).limit(search.limit)
+        events = self.__find_search(search)
         return list(map(self.__deserialize_event, events))
 
+    def search_event_summaries(self, search: Search) -> List[EventSummary]:
+        events = self.__find_search(search, SUMMARY_PROJECTION)
+        return list(map(self.__deserialize_event_summary, events))
+
+    def search_positions(
+        self, location: SearchLocation, type: Optional[Type]
+    ) -> List[EventPosition]:
+        srch = {'location': self.__serialize_location(location)}
+        if type:
+            srch['type'] = type.value
+        events = self.events.find(srch, {'location.coordinates': 1})
+        return [
+            EventPosition(
+                id=event['_id'],
+                lat=event['location']['coordinates'][1],
+                lng=event['location']['coordinates'][0],
+            )
+            for event in events
+        ]
+
     def get_events_by_id(self, ids: List[str]) -> List[Event]:
         events = self.events.find({'_id': {'$in': ids}})
         return list(map(self.__deserialize_event, events))
 
     def get_events_by_id_with_date_filter(self, ids: List[str]) -> List[Event]:
-        now = getNow()
-        four_days_ago = now - timedelta(days=4)
-        pipeline = {
-            '_id': {'$in': ids},
-            '$or': [
-                {'date': {'$gt': four_days_ago.date().isoformat()}},
-                {
-                    '$and': [
-                        {'date': {'$eq': four_days_ago.date().isoformat()}},
-                        {'end_time': {'$gt': four_days_ago.time().isoformat()}},
-                    ]
-                },
-            ],
-        }
-        events = self.events.find(pipeline)
+        events = self.__find_by_id_with_date_filter(ids)
         return list(map(self.__deserialize_event, events))
 
+    def get_event_summaries_by_id_with_date_filter(
+        self, ids: List[str]
+    ) -> List[EventSummary]:
+        events = self.__find_by_id_with_date_filter(ids, SUMMARY_PROJECTION)
+        return list(map(self.__deserialize_event_summary, events))
+
     def update_vacants_left_event(self, id: str, vacants_left: int) -> Event:
-        event = self.get_event(id)
-        event.vacants_left = vacants_left
-        data = self.__serialize_event(event)
-        self.events.update_one({'_id': id}, {'$set': data})
-        return event
+        return self.__update_fields(id, {'vacants_left': vacants_left})
+
+    def reserve_vacant(self, id: str) -> Optional[Event]:
+        # Decrements vacants_left only if the event can still be booked, so
+        # concurrent reservations can never take the counter below zero.
+        now = getNow()
+        event = self.events.find_one_and_update(
+            {
+                '_id': id,
+                'state': State.Publicado.value,
+                'vacants_left': {'$gt': 0},
+                '$or': [
+                    {'date': {'$gt': now.date().isoformat()}},
+                    {
+                        '$and': [
+                            {'date': {'$eq': now.date().isoformat()}},
+                            {'end_time': {'$gte': now.time().isoformat()}},
+                        ]
+                    },
+                ],
+            },
+            {'$inc': {'vacants_left': -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if event is None:
+            return None
+        return self.__deserialize_event(event)
+
+    def release_vacant(self, id: str):
+        self.events.update_one({'_id': id}, {'$inc': {'vacants_left': 1}})
 
     def update_state_event(self, id: str, state: State) -> Event:
-        event = self.get_event(id)
-        event.state = state
-        data = self.__serialize_event(event)
-        self.events.update_one({'_id': id}, {'$set': data})
-        return event
+        return self.__update_fields(id, {'state': state.value})
+
+    def transition_event(
+        self,
+        id: str,
+        previous: List[State],
+        state: State,
+        published_at: Optional[str] = None,
+        suspended_at: Optional[str] = None,
+    ) -> Optional[Tuple[Event, Event]]:
+        # Moves the event to state only from one of the previous states in the
+        # database, returning it as it was and as it is, or None otherwise
+        fields = {'state': state.value}
+        if published_at is not None:
+            fields['published_at'] = self.__serialize_day(published_at, NOT_PUBLISHED)
+        if suspended_at is not None:
+            fields['suspended_at'] = self.__serialize_day(suspended_at, NOT_SUSPENDED)
+        event = self.events.find_one_and_update(
+            {'_id': id, 'state': {'$in': [value.value for value in previous]}},
+            {'$set': fields},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if event is None:
+            if not self.event_exists(id):
+                raise EventNotFoundError
+            return None
+        return self.__deserialize_event(event), self.__deserialize_event(
+            {**event, **fields}
+        )
 
     def update_verified_vacants(self, id: str, verified_vacants: int) -> Event:
-        event = self.get_event(id)
-        event.verified_vacants = verified_vacants
-        data = self.__serialize_event(event)
-        self.events.update_one({'_id': id}, {'$set': data})
-        return event
+        return self.__update_fields(id, {'verified_vacants': verified_vacants})
+
+    def add_verified_vacants(self, id: str, count: int) -> Event:
+        event = self.events.find_one_and_update(
+            {'_id': id},
+            {'$inc': {'verified_vacants': count}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if event is None:
+            raise EventNotFoundError
+        return self.__deserialize_event(event)
 
-    def update_event(self, event: Event) -> Event:
+    def update_event(self, event: Event) -> Optional[Event]:
         data = self.__serialize_event(event)
-        self.events.update_one({'_id': event.id}, {'$set': data})
-        return event
+        updated = self.events.find_one_and_update(
+            {'_id': event.id, 'state': {'$in': UPDATABLE_STATES}},
+            {'$set': {field: data[field] for field in UPDATED_FIELDS if field in data}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated is None:
+            return None
+        return self.__deserialize_event(updated)
+
+    def update_vacants(self, id: str, vacants: int) -> Optional[Event]:
+        # Moves vacants_left by as much as vacants, against the counters in
+        # the database, unless fewer vacants than those already booked
+        event = self.events.find_one_and_update(
+            {
+                '_id': id,
+                'state': {'$in': UPDATABLE_STATES},
+                '$expr': {
+                    '$lte': [{'$subtract': ['$vacants', '$vacants_left']}, vacants]
+                },
+            },
+            [
+                {
+                    '$set': {
+                        'vacants_left': {
+                            '$add': [
+                                '$vacants_left',
+                                {'$subtract': [vacants, '$vacants']},
+                            ]
+                        },
+                        'vacants': vacants,
+                    }
+                }
+            ],
+            return_document=ReturnDocument.AFTER,
+        )
+        if event is None:
+            return None
+        return self.__deserialize_event(event)
+
+    def add_collaborator(self, id: str, collaborator: Collaborator) -> Event:
+        return self.__update(
+            id,
+            {
+                '$addToSet': {
+                    'collaborators': self.__serialize_collaborators([collaborator])[0]
+                }
+            },
+        )
+
+    def remove_collaborator(self, id: str, collaborator_id: str) -> Event:
+        return self.__update(id, {'$pull': {'collaborators': {'id': collaborator_id}}})
 
     def update_suspended_at(self, id: str, suspended_at: str) -> Event:
-        event = self.get_event(id)
-        event.suspended_at = suspended_at
-        data = self.__serialize_event(event)
-        self.events.update_one({'_id': id}, {'$set': data})
-        return event
+        return self.__update_fields(
+            id, {'suspended_at': self.__serialize_day(suspended_at, NOT_SUSPENDED)}
+        )
 
     def update_published_at(self, id: str, published_at: str) -> Event:
-        event = self.get_event(id)
-        event.published_at = published_at
-        data = self.__serialize_event(event)
-        self.events.update_one({'_id': id}, {'$set': data})
-        return event
+        return self.__update_fields(
+            id, {'published_at': self.__serialize_day(published_at, NOT_PUBLISHED)}
+        )
 
     def get_event_states_stat(self, start_date: str, end_date: str) -> EventStatesStat:
         pipeline = [
-            {
-                '$match': {
-                    'created_at': {
-                        '$gte': start_date,
-                        '$lte': end_date,
-                    }
-                }
-            },
+            {'$match': {'created_at': day_range(start_date, end_date)}},
             {
                 '$group': {
                     '_id': '$state',
@@ -247,40 +576,158 @@ class PersistentEventRepository(EventRepository):
             Suspendido=result.get(State.Suspendido.value, 0),
         )
 
-    def update_state_all_events(self):
-        now = getNow()
-        filter_pipeline = {
-            '$or': [
-                {'date': {'$lt': now.date().isoformat()}},
+    def get_expired_events_stat(self, now: datetime) -> list[ExpiredEventsStat]:
+        pipeline = [
+            {'$match': self.__expired(now)},
+            {
+                '$group': {
+                    '_id': {
+                        'created_at': bucket('$created_at', 'day'),
+                        'state': '$state',
+                    },
+                    'count': {'$sum': 1},
+                }
+            },
+        ]
+        result = self.events.aggregate(pipeline)
+        return [
+            ExpiredEventsStat(
+                created_at=doc['_id']['created_at'],
+                state=State(doc['_id']['state']),
+                events=doc['count'],
+            )
+            for doc in result
+        ]
+
+    def update_state_all_events(self, now: datetime) -> int:
+        # Only events whose end went by since the last run still carry a
+        # next_transition_at, so each run touches just the newly expired ones.
+        result = self.events.update_many(
+            self.__expired(now),
+            {
+                '$set': {'state': State.Finalizado.value},
+                '$unset': {'next_transition_at': ''},
+            },
+        )
+        return result.modified_count
+
+    def update_organizer_events_state(
+        self, organizer_id: str, old: State, new: State, suspended_at: Optional[str]
+    ) -> list[OrganizerEventsStat]:
+        # Only the events still in the old state change, so a concurrent
+        # transition of one of them is not overwritten. Those changed are
+        # tagged with the transition, to count them by the days of the
+        # rollups they move between
+        transition_id = uuid.uuid4().hex
+        fields = {'state': new.value, 'transition_id': transition_id}
+        if suspended_at is not None:
+            fields['previous_suspended_at'] = '$suspended_at'
+            fields['suspended_at'] = self.__serialize_day(suspended_at, NOT_SUSPENDED)
+        self.events.update_many(
+            {'organizer': organizer_id, 'state': old.value}, [{'$set': fields}]
+        )
+        pipeline = [
+            {'$match': {'organizer': organizer_id, 'transition_id': transition_id}},
+            {
+                '$group': {
+                    '_id': {
+                        'created_at': bucket('$created_at', 'day'),
+                        'suspended_at': bucket('$previous_suspended_at', 'day'),
+                    },
+                    'count': {'$sum': 1},
+                }
+            },
+        ]
+        return [
+            OrganizerEventsStat(
+                created_at=doc['_id']['created_at'],
+                suspended_at=doc['_id']['suspended_at'] or NOT_SUSPENDED,
+                count=doc['count'],
+            )
+            for doc in self.events.aggregate(pipeline)
+        ]
+
+    def add_missing_transitions(self, batch_size: int) -> int:
+        events = self.events.find(
+            {
+                'next_transition_at': {'$exists': False},
+                'state': {'$ne': State.Finalizado.value},
+            },
+            {'date': 1, 'end_time': 1},
+        )
+        updates = (
+            UpdateOne(
+                {'_id': event['_id']},
                 {
-                    '$and': [
-                        {'date': {'$eq': now.date().isoformat()}},
-                        {'end_time': {'$lt': now.time().isoformat()}},
-                    ]
+                    '$set': {
+                        'next_transition_at': self.__transition_at(
+                            event['date'], event['end_time']
+                        )
+                    }
                 },
-            ]
-        }
-
-        update_pipeline = {
-            '$set': {
-                'state': State.Finalizado.value,
-            }
+            )
+            for event in events
+        )
+        return bulk_write_in_batches(self.events, updates, batch_size)
+
+    def migrate_dates(self, batch_size: int) -> int:
+        # Events written before dates were stored as BSON dates hold them as
+        # ISO strings, with placeholders for the ones not set yet
+        fields = {
+            'created_at': None,
+            'published_at': NOT_PUBLISHED,
+            'suspended_at': NOT_SUSPENDED,
         }
+        events = self.events.find(
+            {'$or': [{field: {'$type': 'string'}} for field in fields]},
+            dict.fromkeys(fields, 1),
+        )
+        updates = (
+            UpdateOne(
+                {'_id': event['_id']},
+                {
+                    '$set': {
+                        field: self.__serialize_day(event[field], unset)
+                        for field, unset in fields.items()
+                        if isinstance(event[field], str)
+                    }
+                },
+            )
+            for event in events
+        )
+        return bulk_write_in_batches(self.events, updates, batch_size)
 
-        self.events.update_many(filter=filter_pipeline, update=update_pipeline)
+    def add_missing_search_tokens(self, batch_size: int) -> int:
+        events = self.events.find(
+            {
+                '$or': [
+                    {'search_tokens': {'$exists': False}},
+                    {'name_tokens': {'$exists': False}},
+                ]
+            },
+            {'name': 1, 'description': 1},
+        )
+        updates = (
+            UpdateOne(
+                {'_id': event['_id']},
+                {
+                    '$set': {
+                        'search_tokens': self.__search_tokens(
+                            event['name'], event['description']
+                        ),
+                        'name_tokens': sorted(set(tokenize(event['name']))),
+                    }
+                },
+            )
+            for event in events
+        )
+        return bulk_write_in_batches(self.events, updates, batch_size)
 
     def get_top_organizers_stat(
         self, start_date: str, end_date: str
     ) -> list[OrganizerStat]:
         pipeline = [
-            {
-                '$match': {
-                    'created_at': {
-                        '$gte': start_date,
-                        '$lte': end_date,
-                    }
-                }
-            },
+            {'$match': {'created_at': day_range(start_date, end_date)}},
             {
                 '$group': {
                     '_id': '$organizer',
@@ -294,7 +741,7 @@ class PersistentEventRepository(EventRepository):
                 }
             },
             {'$match': {'count': {'$gt': 0}}},
-            {'$sort': {'count': -1}},
+            {'$sort': {'count': -1, '_id': 1}},
             {'$limit': 10},
         ]
         result = self.events.aggregate(pipeline)
@@ -311,15 +758,8 @@ class PersistentEventRepository(EventRepository):
         self, start_date: str, end_date: str
     ) -> list[EventByTimeStat]:
         pipeline = [
-            {
-                '$match': {
-                    'created_at': {
-                        '$gte': start_date,
-                        '$lte': end_date,
-                    }
-                }
-            },
-            {'$project': {'created_at': {'$substr': ['$created_at', 0, 7]}}},
+            {'$match': {'created_at': day_range(start_date, end_date)}},
+            {'$project': {'created_at': bucket('$created_at', 'month')}},
             {
                 '$group': {
                     '_id': '$created_at',
@@ -347,22 +787,8 @@ class PersistentEventRepository(EventRepository):
         self, start_date: str, end_date: str
     ) -> list[EventPublishedByTimeStat]:
         pipeline = [
-            {
-                '$match': {
-                    'published_at': {
-                        '$ne': "Not_published",
-                    }
-                }
-            },
-            {
-                '$match': {
-                    'published_at': {
-                        '$gte': start_date,
-                        '$lte': end_date,
-                    }
-                }
-            },
-            {'$project': {'published_at': {'$substr': ['$published_at', 0, 7]}}},
+            {'$match': {'published_at': day_range(start_date, end_date)}},
+            {'$project': {'published_at': bucket('$published_at', 'month')}},
             {
                 '$group': {
                     '_id': '$published_at',
@@ -388,22 +814,8 @@ class PersistentEventRepository(EventRepository):
 
     def get_suspended_by_time(self, start: str, end: str) -> list[SuspendedEventStat]:
         pipeline = [
-            {
-                '$match': {
-                    'suspended_at': {
-                        '$ne': "Not_suspended",
-                    }
-                }
-            },
-            {
-                '$match': {
-                    'suspended_at': {
-                        '$gte': start,
-                        '$lte': end,
-                    }
-                }
-            },
-            {'$project': {'suspended_at': {'$substr': ['$suspended_at', 0, 7]}}},
+            {'$match': {'suspended_at': day_range(start, end)}},
+            {'$project': {'suspended_at': bucket('$suspended_at', 'month')}},
             {
                 '$group': {
                     '_id': '$suspended_at',
@@ -427,36 +839,252 @@ class PersistentEventRepository(EventRepository):
             for doc in result
         ]
 
-    def __serialize_search(self, search: Search) -> dict:
-        srch = {
-            'type': search.type and search.type.value,
-        }
+    def get_event_stats(self, start_date: str, end_date: str) -> EventStats:
+        if self.stats_pipeline != FACET:
+            return EventStats(
+                event_states=self.get_event_states_stat(start_date, end_date),
+                top_organizers=self.get_top_organizers_stat(start_date, end_date),
+                suspended_by_time=self.get_suspended_by_time(start_date, end_date),
+                events_by_time=self.get_events_by_time(start_date, end_date),
+                events_published_by_time=self.get_events_published_by_time(
+                    start_date, end_date
+                ),
+            )
+        # The same stats in a single pass: one $or match, where each branch
+        # uses the index of its date, feeds every stat of the $facet
+        created = {'created_at': day_range(start_date, end_date)}
+        published = {'published_at': day_range(start_date, end_date)}
+        suspended = {'suspended_at': day_range(start_date, end_date)}
+
+        def by_month(field: str) -> list:
+            return [
+                {'$group': {'_id': bucket(field, 'month'), 'count': {'$sum': 1}}},
+                {'$sort': {'_id': 1}},
+            ]
 
-        if search.organizer:
-            now = getNow()
-            four_days_ago = now - timedelta(days=4)
-            srch["$and"] = [
+        pipeline = [
+            {'$match': {'$or': [created, published, suspended]}},
+            {
+                '$project': {
+                    'state': 1,
+                    'organizer': 1,
+                    'verified_vacants': 1,
+                    'created_at': 1,
+                    'published_at': 1,
+                    'suspended_at': 1,
+                }
+            },
+            {
+                '$facet': {
+                    'states': [
+                        {'$match': created},
+                        {'$group': {'_id': '$state', 'count': {'$sum': 1}}},
+                    ],
+                    'organizers': [
+                        {'$match': created},
+                        {
+                            '$group': {
+                                '_id': '$organizer',
+                                'count': {'$sum': '$verified_vacants'},
+                            }
+                        },
+                        {'$match': {'count': {'$gt': 0}}},
+                        {'$sort': {'count': -1, '_id': 1}},
+                        {'$limit': 10},
+                    ],
+                    'created': [{'$match': created}, *by_month('$created_at')],
+                    'published': [
+                        {'$match': published},
+                        *by_month('$published_at'),
+                    ],
+                    'suspended': [
+                        {'$match': suspended},
+                        *by_month('$suspended_at'),
+                    ],
+                }
+            },
+        ]
+        result = next(self.events.aggregate(pipeline))
+        states = {doc['_id']: doc['count'] for doc in result['states']}
+        return EventStats(
+            event_states=EventStatesStat(
+                Borrador=states.get(State.Borrador.value, 0),
+                Publicado=states.get(State.Publicado.value, 0),
+                Cancelado=states.get(State.Cancelado.value, 0),
+                Finalizado=states.get(State.Finalizado.value, 0),
+                Suspendido=states.get(State.Suspendido.value, 0),
+            ),
+            top_organizers=[
+                OrganizerStat(
+                    name=doc['_id'], verified_bookings=doc['count'], id=doc['_id']
+                )
+                for doc in result['organizers']
+            ],
+            suspended_by_time=[
+                SuspendedEventStat(date=doc['_id'], suspended=doc['count'])
+                for doc in result['suspended']
+            ],
+            events_by_time=[
+                EventByTimeStat(date=doc['_id'], events=doc['count'])
+                for doc in result['created']
+            ],
+            events_published_by_time=[
+                EventByTimeStat(date=doc['_id'], events=doc['count'])
+                for doc in result['published']
+            ],
+        )
+
+    def __find_search(self, search: Search, projection: Optional[dict] = None):
+        if search.location:
+            return self.__aggregate_near(search, projection)
+        if search.ranks_by_name():
+            return self.__aggregate_by_name(search, projection)
+        serialized_search = self.__serialize_search(search)
+        if search.cursor:
+            serialized_search.setdefault('$and', []).append(
+                self.__serialize_cursor(search.sort_fields(), search.cursor)
+            )
+        sort = [(field, ASCENDING) for field in search.sort_fields()]
+        return (
+            self.events.find(serialized_search, projection)
+            .sort(sort)
+            .limit(search.limit)
+        )
+
+    def __aggregate_near(self, search: Search, projection: Optional[dict] = None):
+        # $geoNear filters by radius and adds the distance; sorting and the
+        # cursor come after it, as they may depend on that distance
+        location = search.location
+        pipeline = [
+            {
+                '$geoNear': {
+                    'near': {
+                        'type': 'Point',
+                        'coordinates': [location.lng, location.lat],
+                    },
+                    'distanceField': 'distance_meters',
+                    'maxDistance': location.dist,
+                    'spherical': True,
+                    'query': self.__serialize_search(search),
+                }
+            }
+        ]
+        if search.ranks_by_name():
+            pipeline.append(self.__name_rank(search))
+        if search.cursor:
+            pipeline.append(
+                {'$match': self.__serialize_cursor(search.sort_fields(), search.cursor)}
+            )
+        pipeline.append({'$sort': {field: ASCENDING for field in search.sort_fields()}})
+        pipeline.append({'$limit': search.limit})
+        if projection:
+            pipeline.append({'$project': {**projection, 'distance_meters': 1}})
+        return self.events.aggregate(pipeline)
+
+    def __aggregate_by_name(self, search: Search, projection: Optional[dict] = None):
+        # The rank is computed for every match before sorting and limiting, so
+        # pages come in rank order and the cursor resumes from a rank
+        pipeline = [
+            {'$match': self.__serialize_search(search)},
+            self.__name_rank(search),
+        ]
+        if search.cursor:
+            pipeline.append(
+                {'$match': self.__serialize_cursor(search.sort_fields(), search.cursor)}
+            )
+        pipeline.append({'$sort': {field: ASCENDING for field in search.sort_fields()}})
+        pipeline.append({'$limit': search.limit})
+        if projection:
+            pipeline.append({'$project': projection})
+        return self.events.aggregate(pipeline)
+
+    def __name_rank(self, search: Search) -> dict:
+        # Negated relevance of the name, so it sorts ascending like every
+        # other field: a term that is a whole word of the name counts 2, one
+        # that starts a word counts 1
+        tokens = {'$ifNull': ['$name_tokens', []]}
+        scores = []
+        for term in search.name_terms():
+            regex = {'$regexMatch': {'input': '$$this', 'regex': f'^{re.escape(term)}'}}
+            prefixes = {'$size': {'$filter': {'input': tokens, 'cond': regex}}}
+            scores.append(
                 {
-                    "$or": [
-                        {'organizer': search.organizer},
-                        {'collaborators': {'$elemMatch': {'id': search.organizer}}},
+                    '$cond': [
+                        {'$in': [term, tokens]},
+                        2,
+                        {'$cond': [{'$gt': [prefixes, 0]}, 1, 0]},
                     ]
-                },
+                }
+            )
+        return {'$addFields': {'name_rank': {'$subtract': [0, {'$add': scores}]}}}
+
+    def __find_by_id_with_date_filter(
+        self, ids: List[str], projection: Optional[dict] = None
+    ):
+        now = getNow()
+        four_days_ago = now - timedelta(days=4)
+        pipeline = {
+            '_id': {'$in': ids},
+            '$or': [
+                {'date': {'$gt': four_days_ago.date().isoformat()}},
                 {
-                    '$or': [
-                        {'date': {'$gt': four_days_ago.date().isoformat()}},
-                        {
-                            '$and': [
-                                {'date': {'$eq': four_days_ago.date().isoformat()}},
-                                {'end_time': {'$gt': four_days_ago.time().isoformat()}},
-                            ]
-                        },
+                    '$and': [
+                        {'date': {'$eq': four_days_ago.date().isoformat()}},
+                        {'end_time': {'$gt': four_days_ago.time().isoformat()}},
                     ]
                 },
-            ]
+            ],
+        }
+        return self.events.find(pipeline, projection)
+
+    def __update_fields(self, id: str, fields: dict) -> Event:
+        return self.__update(id, {'$set': fields})
+
+    def __update(self, id: str, update: dict) -> Event:
+        event = self.events.find_one_and_update(
+            {'_id': id}, update, return_document=ReturnDocument.AFTER
+        )
+        if event is None:
+            raise EventNotFoundError
+        return self.__deserialize_event(event)
+
+    def __serialize_organizer(self, organizer: str) -> list:
+        now = getNow()
+        four_days_ago = now - timedelta(days=4)
+        return [
+            {
+                "$or": [
+                    {'organizer': organizer},
+                    {'collaborators': {'$elemMatch': {'id': organizer}}},
+                ]
+            },
+            {
+                '$or': [
+                    {'date': {'$gt': four_days_ago.date().isoformat()}},
+                    {
+                        '$and': [
+                            {'date': {'$eq': four_days_ago.date().isoformat()}},
+                            {'end_time': {'$gt': four_days_ago.time().isoformat()}},
+                        ]
+                    },
+                ]
+            },
+        ]
 
-        if search.name:
-            srch['name'] = {'$regex': search.name, '$options': 'i'}
+    def __serialize_search(self, search: Search) -> dict:
+        srch = {
+            'type': search.type and search.type.value,
+        }
+
+        if search.organizer:
+            srch["$and"] = self.__serialize_organizer(search.organizer)
+
+        terms = tokenize(search.name) if search.name else []
+        if terms:
+            # Anchored, case sensitive regexes over folded tokens use the index
+            srch.setdefault('$and', []).extend(
+                {'search_tokens': re.compile(f'^{re.escape(term)}')} for term in terms
+            )
 
         if search.only_published:
             srch['state'] = State.Publicado.value
@@ -477,19 +1105,30 @@ class PersistentEventRepository(EventRepository):
                 },
             ]
 
-        if search.location:
-            lng = search.location.lng
-            lat = search.location.lat
-            dist = search.location.dist
-            srch['location'] = SON(
-                [
-                    ("$nearSphere", [lng, lat]),
-                    ("$maxDistance", dist / EARTH_RADIUS_METERS),
-                ]
-            )
+        if search.ids is not None:
+            srch['_id'] = {'$in': search.ids}
 
         return {k: v for k, v in srch.items() if v is not None}
 
+    def __serialize_location(self, location: SearchLocation) -> dict:
+        return {
+            '$geoWithin': {
+                '$centerSphere': [
+                    [location.lng, location.lat],
+                    location.dist / EARTH_RADIUS_METERS,
+                ]
+            }
+        }
+
+    def __serialize_cursor(self, fields: List[str], values: list) -> dict:
+        # Events strictly after the cursor in (fields) order
+        conditions = []
+        for i, field in enumerate(fields):
+            condition = {fields[j]: values[j] for j in range(i)}
+            condition[field] = {'$gt': values[i]}
+            conditions.append(condition)
+        return {'$or': conditions}
+
     def __serialize_agenda(self, agenda):
         serialized_agenda = [
             {
@@ -552,13 +1191,38 @@ class PersistentEventRepository(EventRepository):
             'state': event.state.value,
             'verified_vacants': event.verified_vacants,
             'collaborators': serialized_collaborators,
-            'created_at': str(event.created_at),
-            'suspended_at': event.suspended_at,
-            'published_at': event.published_at,
+            'created_at': day_start(event.created_at),
+            'suspended_at': self.__serialize_day(event.suspended_at, NOT_SUSPENDED),
+            'published_at': self.__serialize_day(event.published_at, NOT_PUBLISHED),
         }
+        serialized['search_tokens'] = self.__search_tokens(
+            event.name, event.description
+        )
+        serialized['name_tokens'] = sorted(set(tokenize(event.name)))
+        if event.state != State.Finalizado:
+            serialized['next_transition_at'] = self.__transition_at(
+                event.date, event.end_time
+            )
 
         return serialized
 
+    def __serialize_day(self, day: str, unset: Optional[str]) -> Optional[datetime]:
+        return None if day == unset else day_start(day)
+
+    def __deserialize_day(self, day: Optional[datetime], unset: str) -> str:
+        return unset if day is None else str(to_local(day).date())
+
+    def __search_tokens(self, name: str, description: str) -> List[str]:
+        return sorted(set(tokenize(name) + tokenize(description)))
+
+    def __expired(self, now: datetime) -> dict:
+        return {
+            'next_transition_at': {'$lt': self.__transition_at(now.date(), now.time())}
+        }
+
+    def __transition_at(self, date, end_time) -> str:
+        return f"{date}T{end_time}"
+
     def __deserialize_agenda(self, agenda):
         deserialized_agenda = [
             Agenda(
@@ -592,6 +1256,27 @@ class PersistentEventRepository(EventRepository):
         ]
         return deserialized_collaborators
 
+    def __deserialize_event_summary(self, data: dict) -> EventSummary:
+        return EventSummary(
+            id=data['_id'],
+            name=data['name'],
+            location=Location(
+                description=data['location']['description'],
+                lat=data['location']['coordinates'][1],
+                lng=data['location']['coordinates'][0],
+            ),
+            type=Type(data['type']),
+            preview_image=data['preview_image'],
+            date=date.fromisoformat(data['date']),
+            start_time=time.fromisoformat(data['start_time']),
+            end_time=time.fromisoformat(data['end_time']),
+            organizer=data['organizer'],
+            vacants=data['vacants'],
+            vacants_left=data['vacants_left'],
+            state=State(data['state']),
+            distance_meters=data.get('distance_meters'),
+        )
+
     def __deserialize_event(self, data: dict) -> Event:
         deserialized_agenda = self.__deserialize_agenda(data['agenda'])
         deserialized_faq = self.__deserialize_faq(data['FAQ'])
@@ -623,7 +1308,8 @@ class PersistentEventRepository(EventRepository):
             state=State(data['state']),
             verified_vacants=data['verified_vacants'],
             collaborators=deserialized_collaborators,
-            created_at=date.fromisoformat(data['created_at']),
-            suspended_at=data['suspended_at'],
-            published_at=data['published_at'],
+            created_at=to_local(data['created_at']).date(),
+            suspended_at=self.__deserialize_day(data['suspended_at'], NOT_SUSPENDED),
+            published_at=self.__deserialize_day(data['published_at'], NOT_PUBLISHED),
+            distance_meters=data.get('distance_meters'),
         )
@@ -0,0 +1,76 @@
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
+from app.repositories.config import db
+from app.config.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_INDEX = "_id_"
+
+INDEXES = {
+    'Events': [
+        IndexModel([('location', GEOSPHERE)]),
+        IndexModel([('organizer', ASCENDING)]),
+        IndexModel([('collaborators.id', ASCENDING)]),
+        IndexModel([('state', ASCENDING)]),
+        IndexModel([('created_at', ASCENDING)]),
+        IndexModel([('published_at', ASCENDING)]),
+        IndexModel([('suspended_at', ASCENDING)]),
+        IndexModel([('date', ASCENDING), ('end_time', ASCENDING)]),
+        IndexModel([('vacants', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('search_tokens', ASCENDING)]),
+        IndexModel(
+            [('date', ASCENDING), ('start_time', ASCENDING), ('_id', ASCENDING)]
+        ),
+        IndexModel([('next_transition_at', ASCENDING)], sparse=True),
+    ],
+    'Bookings': [
+        IndexModel([('event_id', ASCENDING), ('reserver_id', ASCENDING)], unique=True),
+        IndexModel([('reserver_id', ASCENDING)]),
+        IndexModel([('event_id', ASCENDING), ('verified', ASCENDING)]),
+        IndexModel([('event_id', ASCENDING), ('updated_at', ASCENDING)]),
+        IndexModel([('verified_time', ASCENDING)]),
+    ],
+    'Complaints': [
+        IndexModel([('event_id', ASCENDING), ('complainer_id', ASCENDING)]),
+        IndexModel([('organizer_id', ASCENDING)]),
+        IndexModel([('date', ASCENDING)]),
+    ],
+    'Organizers': [
+        IndexModel([('email', ASCENDING)]),
+    ],
+    'Users': [
+        IndexModel([('email', ASCENDING)]),
+    ],
+}
+
+
+class IndexReport:
+    def __init__(self, collection: str, missing: list[str], extra: list[str]):
+        self.collection = collection
+        self.missing = missing
+        self.extra = extra
+
+
+def create_indexes():
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            db[collection].create_indexes([index])
+    logger.info("Indexes created")
+
+
+def check_indexes() -> list[IndexReport]:
+    reports = []
+    for collection, indexes in INDEXES.items():
+        expected = {index.document['name'] for index in indexes}
+        existing = set(db[collection].index_information()) - {DEFAULT_INDEX}
+        report = IndexReport(
+            collection=collection,
+            missing=sorted(expected - existing),
+            extra=sorted(existing - expected),
+        )
+        if report.missing:
+            logger.warning(f"Missing indexes in {collection}: {report.missing}")
+        if report.extra:
+            logger.warning(f"Extra indexes in {collection}: {report.extra}")
+        reports.append(report)
+    return reports
@@ -0,0 +1,46 @@
+from app.repositories.config import db
+from pymongo.errors import DuplicateKeyError
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+
+class LeaseRepository(ABC):
+    @abstractmethod
+    def acquire(self, name: str, owner: str, duration: int) -> bool:
+        pass
+
+    @abstractmethod
+    def release(self, name: str, owner: str):
+        pass
+
+
+class PersistentLeaseRepository(LeaseRepository):
+    def __init__(self):
+        COLLECTION_NAME = "Leases"
+        self.leases = db[COLLECTION_NAME]
+
+    def acquire(self, name: str, owner: str, duration: int) -> bool:
+        # Takes the lease if it is free, expired or already ours. When another
+        # owner holds it the filter does not match and the upsert collides
+        # with the existing _id.
+        now = datetime.utcnow()
+        try:
+            self.leases.find_one_and_update(
+                {
+                    '_id': name,
+                    '$or': [{'owner': owner}, {'expires_at': {'$lt': now}}],
+                },
+                {
+                    '$set': {
+                        'owner': owner,
+                        'expires_at': now + timedelta(seconds=duration),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def release(self, name: str, owner: str):
+        self.leases.delete_one({'_id': name, 'owner': owner})
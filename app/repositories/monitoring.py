@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+import bson
+from pymongo import monitoring
+
+
+class DBOperations:
+    def __init__(self):
+        self.calls = 0
+        self.bytes_sent = 0
+        self.commands = {}
+        self.lock = Lock()
+
+    def add(self, command_name: str, size: int = 0):
+        with self.lock:
+            self.calls += 1
+            self.bytes_sent += size
+            self.commands[command_name] = self.commands.get(command_name, 0) + 1
+
+
+# Operations issued by the whole process, regardless of the tracked scope.
+# Their size is only measured within a tracked scope.
+total_operations = DBOperations()
+
+_current_operations: ContextVar[Optional[DBOperations]] = ContextVar(
+    'db_operations', default=None
+)
+
+
+class CommandCounter(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent):
+        total_operations.add(event.command_name)
+        operations = _current_operations.get()
+        if operations is not None:
+            operations.add(event.command_name, len(bson.encode(event.command)))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        pass
+
+
+@contextmanager
+def track_db_operations():
+    operations = DBOperations()
+    token = _current_operations.set(operations)
+    try:
+        yield operations
+    finally:
+        _current_operations.reset(token)
@@ -1,3 +1,4 @@
+from typing import Dict, List
 from app.repositories.config import db
 from abc import ABC, abstractmethod
 from app.models.organizer import Organizer
@@ -13,6 +14,14 @@ class OrganizerRepository(ABC):
     def get_organizer(self, id: str) -> Organizer:
         pass
 
+    @abstractmethod
+    def get_organizers_by_id(self, ids: List[str]) -> List[Organizer]:
+        pass
+
+    @abstractmethod
+    def get_organizer_names(self, ids: List[str]) -> Dict[str, str]:
+        pass
+
     @abstractmethod
     def organizer_exists(self, id: str) -> bool:
         pass
@@ -54,6 +63,19 @@ class PersistentOrganizerRepository(OrganizerRepository):
             raise OrganizerNotFoundError
         return self.__deserialize_organizer(organizer)
 
+    def get_organizers_by_id(self, ids: List[str]) -> List[Organizer]:
+        organizers = self.organizers.find({'_id': {'$in': ids}})
+        return list(map(self.__deserialize_organizer, organizers))
+
+    def get_organizer_names(self, ids: List[str]) -> Dict[str, str]:
+        organizers = self.organizers.find(
+            {'_id': {'$in': ids}}, {'first_name': 1, 'last_name': 1}
+        )
+        return {
+            organizer['_id']: f"{organizer['first_name']} {organizer['last_name']}"
+            for organizer in organizers
+        }
+
     def get_organizer_by_email(self, email: str) -> Organizer:
         organizer = self.organizers.find_one({'email': email})
         if organizer is None:
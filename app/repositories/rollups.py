@@ -0,0 +1,286 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import unquote
+from pymongo import ASCENDING, ReplaceOne
+from app.models.event import State
+from app.models.stat import (
+    AppStats,
+    ComplaintsByTimeStat,
+    EventByTimeStat,
+    EventPublishedByTimeStat,
+    EventStatesStat,
+    OrganizerStat,
+    SuspendedEventStat,
+    VerifiedBookingStat,
+)
+from app.repositories.config import db
+from app.repositories.dates import bucket
+
+GROUP_BY_LENGTH = {'day': 10, 'month': 7, 'year': 4}
+TOP_ORGANIZERS = 10
+
+
+def _field_name(key: str) -> str:
+    # Organizer ids are user supplied: escaped so that a '.' or a '$' in them
+    # is not read as a path or an operator when used as a field name
+    return key.replace('%', '%25').replace('.', '%2E').replace('$', '%24')
+
+
+class StatsRollupRepository(ABC):
+    @abstractmethod
+    def add_event(self, created_at: str, count: int = 1):
+        pass
+
+    @abstractmethod
+    def change_state(self, created_at: str, old: State, new: State, count: int = 1):
+        pass
+
+    @abstractmethod
+    def publish_event(self, published_at: str):
+        pass
+
+    @abstractmethod
+    def suspend_event(self, suspended_at: str, previous: str, count: int = 1):
+        pass
+
+    @abstractmethod
+    def verify_booking(
+        self, verified_time: str, organizer: str, created_at: str, count: int = 1
+    ):
+        pass
+
+    @abstractmethod
+    def add_complaint(self, date: str):
+        pass
+
+    @abstractmethod
+    def get_stats(self, start_date: str, end_date: str, group_by: str) -> AppStats:
+        pass
+
+    @abstractmethod
+    def rebuild(self) -> int:
+        pass
+
+    @abstractmethod
+    def is_empty(self) -> bool:
+        pass
+
+
+class PersistentStatsRollupRepository(StatsRollupRepository):
+    # One document per day holding every counter /api/stats needs, so a
+    # range of stats reads just the documents of the days in it:
+    #   events_created, states, organizers   by the event's created_at
+    #   events_published, events_suspended  by published_at and suspended_at
+    #   verified_bookings (by hour)          by the booking's verified_time
+    #   complaints                           by the complaint's date
+    def __init__(self):
+        COLLECTION_NAME = "StatsRollups"
+        self.rollups = db[COLLECTION_NAME]
+        self.events = db["Events"]
+        self.bookings = db["Bookings"]
+        self.complaints = db["Complaints"]
+
+    def add_event(self, created_at: str, count: int = 1):
+        self.__increment(
+            created_at,
+            {'events_created': count, f'states.{State.Borrador.value}': count},
+        )
+
+    def change_state(self, created_at: str, old: State, new: State, count: int = 1):
+        if old == new:
+            return
+        self.__increment(
+            created_at,
+            {f'states.{old.value}': -count, f'states.{new.value}': count},
+        )
+
+    def publish_event(self, published_at: str):
+        self.__increment(published_at, {'events_published': 1})
+
+    def suspend_event(self, suspended_at: str, previous: str, count: int = 1):
+        # An event counts once, on the day of its last suspension
+        if previous == suspended_at:
+            return
+        if previous != "Not_suspended":
+            self.__increment(previous, {'events_suspended': -count})
+        self.__increment(suspended_at, {'events_suspended': count})
+
+    def verify_booking(
+        self, verified_time: str, organizer: str, created_at: str, count: int = 1
+    ):
+        day, hour = verified_time[:10], verified_time[11:13]
+        self.__increment(day, {f'verified_bookings.{hour}': count})
+        self.__increment(created_at, {f'organizers.{_field_name(organizer)}': count})
+
+    def add_complaint(self, date: str):
+        self.__increment(date, {'complaints': 1})
+
+    def get_stats(self, start_date: str, end_date: str, group_by: str) -> AppStats:
+        states = Counter()
+        organizers = Counter()
+        verified = Counter()
+        complaints = Counter()
+        suspended = Counter()
+        created = Counter()
+        published = Counter()
+        days = self.rollups.find({'_id': {'$gte': start_date, '$lte': end_date}})
+        for rollup in days.sort('_id', ASCENDING):
+            day, month = rollup['_id'], rollup['_id'][:7]
+            states.update(rollup.get('states', {}))
+            organizers.update(
+                {
+                    unquote(organizer): count
+                    for organizer, count in rollup.get('organizers', {}).items()
+                }
+            )
+            # verified_time holds an hour, so it sorts after a bare end date
+            if day != end_date:
+                for hour, count in rollup.get('verified_bookings', {}).items():
+                    verified[self.__period(day, hour, group_by)] += count
+            complaints[month] += rollup.get('complaints', 0)
+            suspended[month] += rollup.get('events_suspended', 0)
+            created[month] += rollup.get('events_created', 0)
+            published[month] += rollup.get('events_published', 0)
+
+        top_organizers = sorted(
+            ((id, count) for id, count in organizers.items() if count > 0),
+            key=lambda organizer: organizer[1],
+            reverse=True,
+        )[:TOP_ORGANIZERS]
+        return AppStats(
+            event_states=EventStatesStat(
+                Borrador=states[State.Borrador.value],
+                Publicado=states[State.Publicado.value],
+                Finalizado=states[State.Finalizado.value],
+                Cancelado=states[State.Cancelado.value],
+                Suspendido=states[State.Suspendido.value],
+            ),
+            top_organizers=[
+                OrganizerStat(name=id, verified_bookings=count, id=id)
+                for id, count in top_organizers
+            ],
+            verified_bookings=[
+                VerifiedBookingStat(date, count)
+                for date, count in self.__non_zero(verified)
+            ],
+            complaints_by_time=[
+                ComplaintsByTimeStat(date, count)
+                for date, count in self.__non_zero(complaints)
+            ],
+            suspended_by_time=[
+                SuspendedEventStat(date=date, suspended=count)
+                for date, count in self.__non_zero(suspended)
+            ],
+            events_by_time=[
+                EventByTimeStat(date=date, events=count)
+                for date, count in self.__non_zero(created)
+            ],
+            events_published_by_time=[
+                EventPublishedByTimeStat(date=date, events=count)
+                for date, count in self.__non_zero(published)
+            ],
+        )
+
+    def rebuild(self) -> int:
+        # Recomputes every day from the raw collections. Writes that land
+        # while it runs may be lost, so it is meant for backfills and repairs.
+        days = {}
+
+        def rollup(day: str) -> dict:
+            return days.setdefault(day, {'_id': day})
+
+        def add(day: str, path: list, count: int):
+            document = rollup(day)
+            for key in path[:-1]:
+                document = document.setdefault(key, {})
+            document[path[-1]] = document.get(path[-1], 0) + count
+
+        events = self.events.aggregate(
+            [
+                {
+                    '$group': {
+                        '_id': {
+                            'day': bucket('$created_at', 'day'),
+                            'state': '$state',
+                            'organizer': '$organizer',
+                        },
+                        'count': {'$sum': 1},
+                        'verified': {'$sum': '$verified_vacants'},
+                    }
+                }
+            ]
+        )
+        for group in events:
+            day = group['_id']['day']
+            add(day, ['events_created'], group['count'])
+            add(day, ['states', group['_id']['state']], group['count'])
+            organizer = _field_name(group['_id']['organizer'])
+            add(day, ['organizers', organizer], group['verified'])
+
+        for field, counter in [
+            ('published_at', 'events_published'),
+            ('suspended_at', 'events_suspended'),
+        ]:
+            groups = self.events.aggregate(
+                [
+                    {'$match': {field: {'$ne': None}}},
+                    {
+                        '$group': {
+                            '_id': bucket(f'${field}', 'day'),
+                            'count': {'$sum': 1},
+                        }
+                    },
+                ]
+            )
+            for group in groups:
+                add(group['_id'], [counter], group['count'])
+
+        bookings = self.bookings.aggregate(
+            [
+                {'$match': {'verified': True}},
+                {
+                    '$group': {
+                        '_id': bucket('$verified_time', 'hour'),
+                        'count': {'$sum': 1},
+                    }
+                },
+            ]
+        )
+        for group in bookings:
+            hour = group['_id']
+            add(hour[:10], ['verified_bookings', hour[11:13]], group['count'])
+
+        complaints = self.complaints.aggregate(
+            [{'$group': {'_id': bucket('$date', 'day'), 'count': {'$sum': 1}}}]
+        )
+        for group in complaints:
+            add(group['_id'], ['complaints'], group['count'])
+
+        if days:
+            self.rollups.bulk_write(
+                [
+                    ReplaceOne({'_id': day}, document, upsert=True)
+                    for day, document in days.items()
+                ],
+                ordered=False,
+            )
+        self.rollups.delete_many({'_id': {'$nin': list(days)}})
+        return len(days)
+
+    def is_empty(self) -> bool:
+        return self.rollups.find_one({}, {'_id': 1}) is None
+
+    def __increment(self, day: str, counters: dict):
+        self.rollups.update_one({'_id': day}, {'$inc': counters}, upsert=True)
+
+    def __period(self, day: str, hour: str, group_by: str) -> str:
+        if group_by == 'hour':
+            return f'{day} {hour}'
+        if group_by == 'week':
+            start = date.fromisoformat(day)
+            return str(start - timedelta(days=start.weekday()))
+        return day[: GROUP_BY_LENGTH.get(group_by, GROUP_BY_LENGTH['day'])]
+
+    def __non_zero(self, counter: Counter) -> list:
+        return sorted((key, count) for key, count in counter.items() if count)
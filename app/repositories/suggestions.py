@@ -0,0 +1,164 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from threading import Lock
+from typing import List, Optional, Union
+from app.models.event import Event, EventSummary
+from app.models.organizer import Organizer
+from app.models.suggestion import Suggestion, SuggestionType
+from app.utils.text import tokenize
+
+
+class SuggestionRepository(ABC):
+    @abstractmethod
+    def add_event(self, event: Union[Event, EventSummary]):
+        pass
+
+    @abstractmethod
+    def remove_event(self, id: str):
+        pass
+
+    @abstractmethod
+    def add_organizer(self, organizer: Organizer):
+        pass
+
+    @abstractmethod
+    def remove_organizer(self, id: str):
+        pass
+
+    @abstractmethod
+    def replace_all(
+        self, events: List[Union[Event, EventSummary]], organizers: List[Organizer]
+    ):
+        pass
+
+    @abstractmethod
+    def suggest(self, query: str, limit: int, now: str) -> List[Suggestion]:
+        pass
+
+
+def _entry_id(type: SuggestionType, id: str) -> str:
+    return f"{type.value}:{id}"
+
+
+class _Entry:
+    def __init__(
+        self,
+        suggestion: Suggestion,
+        keys: List[str],
+        ends_at: Optional[str],
+        organizer: str,
+    ):
+        self.id = _entry_id(suggestion.type, suggestion.id)
+        self.suggestion = suggestion
+        self.keys = keys
+        self.ends_at = ends_at
+        self.organizer = organizer
+
+
+class InMemorySuggestionRepository(SuggestionRepository):
+    # Sorted array of (key, entry id), where every word of a name starts a
+    # key, so a prefix lookup is a binary search followed by a short scan.
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+        self.lock = Lock()
+
+    def add_event(self, event: Union[Event, EventSummary]):
+        entry = self.__event_entry(event)
+        with self.lock:
+            self.__remove(entry.id)
+            self.__add(entry)
+
+    def remove_event(self, id: str):
+        with self.lock:
+            self.__remove(_entry_id(SuggestionType.Event, id))
+
+    def add_organizer(self, organizer: Organizer):
+        entry = self.__organizer_entry(organizer)
+        with self.lock:
+            self.__remove(entry.id)
+            self.__add(entry)
+
+    def remove_organizer(self, id: str):
+        # Along with the events of the organizer, in a single pass over the keys
+        with self.lock:
+            removed = {
+                entry.id for entry in self.entries.values() if entry.organizer == id
+            }
+            if not removed:
+                return
+            self.keys = [key for key in self.keys if key[1] not in removed]
+            for entry_id in removed:
+                del self.entries[entry_id]
+
+    def replace_all(
+        self, events: List[Union[Event, EventSummary]], organizers: List[Organizer]
+    ):
+        entries = [self.__event_entry(event) for event in events]
+        entries += [self.__organizer_entry(organizer) for organizer in organizers]
+        keys = sorted((key, entry.id) for entry in entries for key in entry.keys)
+        with self.lock:
+            self.keys = keys
+            self.entries = {entry.id: entry for entry in entries}
+
+    def suggest(self, query: str, limit: int, now: str) -> List[Suggestion]:
+        prefix = ' '.join(tokenize(query))
+        if not prefix:
+            return []
+        suggestions = []
+        seen = set()
+        with self.lock:
+            i = bisect_left(self.keys, (prefix,))
+            while i < len(self.keys) and len(suggestions) < limit:
+                key, entry_id = self.keys[i]
+                i += 1
+                if not key.startswith(prefix):
+                    break
+                entry = self.entries[entry_id]
+                if entry_id in seen or (entry.ends_at and entry.ends_at < now):
+                    continue
+                seen.add(entry_id)
+                suggestions.append(entry.suggestion)
+        return suggestions
+
+    def __add(self, entry: _Entry):
+        self.entries[entry.id] = entry
+        for key in entry.keys:
+            insort(self.keys, (key, entry.id))
+
+    def __remove(self, entry_id: str):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry.keys:
+            i = bisect_left(self.keys, (key, entry_id))
+            del self.keys[i]
+
+    def __event_entry(self, event: Union[Event, EventSummary]) -> _Entry:
+        return _Entry(
+            Suggestion(
+                id=event.id,
+                text=event.name,
+                type=SuggestionType.Event,
+            ),
+            self.__keys(event.name),
+            f"{event.date}T{event.end_time}",
+            event.organizer,
+        )
+
+    def __organizer_entry(self, organizer: Organizer) -> _Entry:
+        name = f"{organizer.first_name} {organizer.last_name}"
+        return _Entry(
+            Suggestion(
+                id=organizer.id,
+                text=name,
+                type=SuggestionType.Organizer,
+            ),
+            self.__keys(name),
+            None,
+            organizer.id,
+        )
+
+    def __keys(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return sorted({' '.join(tokens[i:]) for i in range(len(tokens))})
@@ -1,5 +1,7 @@
 from __future__ import annotations
+from datetime import datetime
 from pydantic import BaseModel, Field
+from typing import List, Optional
 from app.models.booking import Booking
 
 
@@ -16,6 +18,34 @@ class verifyBookingSchema(BaseModel):
     event_id: str = Field(..., min_length=1)
 
 
+class BookingScanSchema(BaseModel):
+    booking_id: str = Field(..., min_length=1)
+    event_id: str = Field(..., min_length=1)
+    # When the ticket was scanned, for scans queued offline; now otherwise
+    scanned_at: Optional[datetime]
+
+
+class BookingScansSchema(BaseModel):
+    scans: List[BookingScanSchema] = Field(..., min_items=1, max_items=1000)
+
+
+class BookingScanResultSchema(BaseModel):
+    index: int
+    status: int
+    id: str
+    detail: Optional[str]
+
+
+class BookingManifestSchema(BaseModel):
+    # What a scanner needs to check tickets offline. With full set, bookings
+    # replaces what the scanner holds; otherwise both lists are added to it.
+    event_id: str
+    full: bool
+    bookings: List[str]
+    verified: List[str]
+    sync_token: str
+
+
 class BookingSchema(BookingSchemaBase):
     id: str = Field(..., min_length=1)
     verified: bool
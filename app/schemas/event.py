@@ -1,8 +1,8 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
 from datetime import date, time
-from typing import List, Optional, Tuple
-from app.models.event import Event, Type, State
+from typing import List, Optional, Tuple, Union
+from app.models.event import Event, EventSort, EventSummary, EventView, Type, State
 
 
 class SearchEvent(BaseModel):
@@ -11,10 +11,13 @@ class SearchEvent(BaseModel):
     dist: int = Field(default=5_000)
     organizer: Optional[str]
     type: Optional[Type]
-    limit: int = Field(default=5000)
+    limit: int = Field(default=50, ge=1, le=100)
+    cursor: Optional[str]
     name: Optional[str]
     only_published: Optional[bool]
     not_finished: Optional[bool]
+    view: EventView = Field(default=EventView.full)
+    sort: Optional[EventSort]
 
 
 class LocationSchema(BaseModel):
@@ -122,7 +125,7 @@ class EventSchema(EventSchemaBase):
             for element in event.collaborators
         ]
 
-        return EventSchema(
+        return cls(
             name=event.name,
             description=event.description,
             location=location,
@@ -146,3 +149,72 @@ class EventSchema(EventSchemaBase):
             suspended_at=event.suspended_at,
             published_at=event.published_at,
         )
+
+
+class EventSummarySchema(BaseModel):
+    id: str
+    name: str
+    location: LocationSchema
+    type: Type
+    preview_image: str
+    date: date
+    start_time: time
+    end_time: time
+    organizer: str
+    vacants: int
+    vacants_left: int
+    state: State
+
+    @classmethod
+    def from_model(cls, event: EventSummary) -> EventSummarySchema:
+        return cls(
+            id=event.id,
+            name=event.name,
+            location=LocationSchema(
+                description=event.location.description,
+                lat=event.location.lat,
+                lng=event.location.lng,
+            ),
+            type=Type(event.type),
+            preview_image=event.preview_image,
+            date=event.date,
+            start_time=event.start_time,
+            end_time=event.end_time,
+            organizer=event.organizer,
+            vacants=event.vacants,
+            vacants_left=event.vacants_left,
+            state=State(event.state),
+        )
+
+
+class EventResultSchema(EventSchema):
+    # Only known for location searches
+    distance_meters: Optional[float]
+
+    @classmethod
+    def from_model(cls, event: Event) -> EventResultSchema:
+        schema = super().from_model(event)
+        schema.distance_meters = event.distance_meters
+        return schema
+
+
+class EventSummaryResultSchema(EventSummarySchema):
+    distance_meters: Optional[float]
+
+    @classmethod
+    def from_model(cls, event: EventSummary) -> EventSummaryResultSchema:
+        schema = super().from_model(event)
+        schema.distance_meters = event.distance_meters
+        return schema
+
+
+class EventPageSchema(BaseModel):
+    events: list
+    next_cursor: Optional[str]
+
+
+class BulkEventResultSchema(BaseModel):
+    index: int
+    status: int
+    id: Optional[str]
+    detail: Optional[Union[str, list]]
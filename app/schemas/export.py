@@ -0,0 +1,11 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportParams(BaseModel):
+    format: ExportFormat = Field(default=ExportFormat.ndjson)
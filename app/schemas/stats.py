@@ -164,3 +164,12 @@ class StatParams(BaseModel):
     start_date: str = Field(..., min_length=10, max_length=10)
     end_date: str = Field(..., min_length=10, max_length=10)
     group_by: str = Field(default="day")
+
+
+class StatsRollupCheckSchema(BaseModel):
+    consistent: bool
+    mismatches: list[str]
+
+
+class StatsRollupRebuildSchema(BaseModel):
+    days: int
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from pydantic import BaseModel, Field
+from app.models.suggestion import Suggestion, SuggestionType
+
+
+class SuggestionSchema(BaseModel):
+    id: str
+    text: str
+    type: SuggestionType
+
+    @classmethod
+    def from_model(cls, suggestion: Suggestion) -> SuggestionSchema:
+        return SuggestionSchema(
+            id=suggestion.id,
+            text=suggestion.text,
+            type=suggestion.type,
+        )
+
+
+class SuggestParams(BaseModel):
+    q: str = Field(..., min_length=1)
+    limit: int = Field(default=10, ge=1, le=50)
@@ -2,7 +2,27 @@ from app.config.constants import (
     PORT,
     DB_URL,
     DB_NAME,
-    ENV_NAME
+    ENV_NAME,
+    ADMIN_TOKEN,
+    TIMEZONE,
+    COMMAND_EXECUTOR,
+    COMMAND_EXECUTOR_WORKERS,
+    QUERY_EXECUTOR_WORKERS,
+    FINALIZE_EVENTS_INTERVAL,
+    REBUILD_SUGGESTIONS_INTERVAL,
+    MIGRATION_BATCH_SIZE,
+    EVENT_STATS_PIPELINE,
+    BULK_EVENTS_LIMIT,
+    EXPORT_BATCH_SIZE,
+    EVENT_CACHE_SIZE,
+    EVENT_CACHE_TTL,
+    GEO_CACHE_SIZE,
+    GEO_CACHE_TTL,
+    GEO_TILE_SIZE,
+    GEO_TILE_MAX_EVENTS,
+    ORGANIZER_NAME_CACHE_SIZE,
+    ORGANIZER_NAME_CACHE_TTL,
+    DB_MONITORING,
 )
 from app.config.logger import setup_logger
 
@@ -16,3 +36,23 @@ def log_config():
     logger.info(f"  - DB_URL: {DB_URL}")
     logger.info(f"  - DB_NAME: {DB_NAME}")
     logger.info(f"  - ENV_NAME: {ENV_NAME}")
+    logger.info(f"  - ADMIN_TOKEN: {'set' if ADMIN_TOKEN else 'not set'}")
+    logger.info(f"  - TIMEZONE: {TIMEZONE}")
+    logger.info(f"  - COMMAND_EXECUTOR: {COMMAND_EXECUTOR}")
+    logger.info(f"  - COMMAND_EXECUTOR_WORKERS: {COMMAND_EXECUTOR_WORKERS}")
+    logger.info(f"  - QUERY_EXECUTOR_WORKERS: {QUERY_EXECUTOR_WORKERS}")
+    logger.info(f"  - FINALIZE_EVENTS_INTERVAL: {FINALIZE_EVENTS_INTERVAL}")
+    logger.info(f"  - REBUILD_SUGGESTIONS_INTERVAL: {REBUILD_SUGGESTIONS_INTERVAL}")
+    logger.info(f"  - MIGRATION_BATCH_SIZE: {MIGRATION_BATCH_SIZE}")
+    logger.info(f"  - EVENT_STATS_PIPELINE: {EVENT_STATS_PIPELINE}")
+    logger.info(f"  - BULK_EVENTS_LIMIT: {BULK_EVENTS_LIMIT}")
+    logger.info(f"  - EXPORT_BATCH_SIZE: {EXPORT_BATCH_SIZE}")
+    logger.info(f"  - EVENT_CACHE_SIZE: {EVENT_CACHE_SIZE}")
+    logger.info(f"  - EVENT_CACHE_TTL: {EVENT_CACHE_TTL}")
+    logger.info(f"  - GEO_CACHE_SIZE: {GEO_CACHE_SIZE}")
+    logger.info(f"  - GEO_CACHE_TTL: {GEO_CACHE_TTL}")
+    logger.info(f"  - GEO_TILE_SIZE: {GEO_TILE_SIZE}")
+    logger.info(f"  - GEO_TILE_MAX_EVENTS: {GEO_TILE_MAX_EVENTS}")
+    logger.info(f"  - ORGANIZER_NAME_CACHE_SIZE: {ORGANIZER_NAME_CACHE_SIZE}")
+    logger.info(f"  - ORGANIZER_NAME_CACHE_TTL: {ORGANIZER_NAME_CACHE_TTL}")
+    logger.info(f"  - DB_MONITORING: {DB_MONITORING}")
@@ -0,0 +1,55 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+from app.config.constants import (
+    COMMAND_EXECUTOR,
+    COMMAND_EXECUTOR_WORKERS,
+    QUERY_EXECUTOR_WORKERS,
+)
+
+THREAD_POOL = "thread_pool"
+
+executor = ThreadPoolExecutor(
+    max_workers=COMMAND_EXECUTOR_WORKERS, thread_name_prefix="command"
+)
+# Commands already run on the command pool, so their queries get a pool of
+# their own: waiting on the same pool could deadlock once it is full.
+query_executor = ThreadPoolExecutor(
+    max_workers=QUERY_EXECUTOR_WORKERS, thread_name_prefix="query"
+)
+
+
+async def run_command(command):
+    # Commands talk to Mongo through the blocking PyMongo driver, so by default
+    # they run in a bounded thread pool to keep the event loop responsive.
+    if COMMAND_EXECUTOR != THREAD_POOL:
+        return command.execute()
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, context.run, command.execute)
+
+
+def run_queries(queries: Dict[str, Callable]) -> Tuple[dict, Dict[str, float]]:
+    # Runs independent queries at the same time, returning their results and
+    # how long each one took in seconds
+    def timed(query: Callable):
+        start = time.perf_counter()
+        result = query()
+        return result, time.perf_counter() - start
+
+    futures = {
+        name: query_executor.submit(contextvars.copy_context().run, timed, query)
+        for name, query in queries.items()
+    }
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(
+        f"{name};dur={duration * 1000:.1f}" for name, duration in timings.items()
+    )
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, Type
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from app.schemas.export import ExportFormat
+
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+def export(
+    rows: Iterable[BaseModel], schema: Type[BaseModel], format: ExportFormat
+) -> Iterator[str]:
+    # Rows are written to a small buffer and sent every CHUNK_SIZE, so the
+    # memory used does not depend on how many rows there are
+    buffer = io.StringIO()
+    if format == ExportFormat.csv:
+        writer = csv.DictWriter(buffer, fieldnames=list(schema.__fields__))
+        writer.writeheader()
+    for row in rows:
+        if format == ExportFormat.csv:
+            writer.writerow(
+                {
+                    # Nested values, like an event's agenda, go in a cell as JSON
+                    key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                    for key, value in jsonable_encoder(row).items()
+                }
+            )
+        else:
+            buffer.write(row.json() + '\n')
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,32 @@
+import math
+
+EARTH_RADIUS_METERS = 6_371_000
+
+
+def distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    # Great-circle (haversine) distance in meters, as used by $centerSphere
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def tile(lat: float, lng: float, size: float) -> tuple[int, int]:
+    # Cell of a fixed grid of size x size degrees containing the point
+    return math.floor(lat / size), math.floor(lng / size)
+
+
+def tile_center(cell: tuple[int, int], size: float) -> tuple[float, float]:
+    return (cell[0] + 0.5) * size, (cell[1] + 0.5) * size
+
+
+def tile_radius(cell: tuple[int, int], size: float) -> float:
+    # Distance from the centre to the farthest corner, so a circle of this
+    # radius around the centre covers every point of the cell
+    lat, lng = tile_center(cell, size)
+    corners = [(cell[0] + i) * size for i in (0, 1)]
+    return max(distance(lat, lng, corner, lng + size / 2) for corner in corners)
@@ -0,0 +1,28 @@
+from app.config.constants import FINALIZE_EVENTS_INTERVAL, REBUILD_SUGGESTIONS_INTERVAL
+from app.commands.events import FinalizeEventsCommand, RebuildSuggestionsCommand
+from app.repositories.dependencies import (
+    event_repository,
+    organizer_repository,
+    lease_repository,
+    suggestion_repository,
+    rollup_repository,
+)
+from app.utils.scheduler import Scheduler
+
+finalize_events_scheduler = Scheduler(
+    'finalize_events',
+    FINALIZE_EVENTS_INTERVAL,
+    lambda: FinalizeEventsCommand(event_repository, rollup_repository),
+    lease_repository,
+)
+
+# Each replica keeps its own suggestions in memory, so there is no lease
+rebuild_suggestions_scheduler = Scheduler(
+    'rebuild_suggestions',
+    REBUILD_SUGGESTIONS_INTERVAL,
+    lambda: RebuildSuggestionsCommand(
+        event_repository, organizer_repository, suggestion_repository
+    ),
+)
+
+schedulers = [finalize_events_scheduler, rebuild_suggestions_scheduler]
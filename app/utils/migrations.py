@@ -0,0 +1,43 @@
+from app.config.constants import MIGRATION_BATCH_SIZE
+from app.config.logger import setup_logger
+from app.repositories.dependencies import (
+    booking_repository,
+    complaint_repository,
+    event_repository,
+    rollup_repository,
+)
+
+logger = setup_logger(__name__)
+
+
+def migrate_dates(batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    # Rewrites the dates still stored as strings into BSON dates. Documents
+    # already migrated are skipped, so it is safe to run more than once.
+    migrated = 0
+    for name, repository in [
+        ('Events', event_repository),
+        ('Bookings', booking_repository),
+        ('Complaints', complaint_repository),
+    ]:
+        count = repository.migrate_dates(batch_size)
+        logger.info(f"{name}: {count} documents migrated to BSON dates")
+        migrated += count
+    return migrated
+
+
+def migrate(batch_size: int = MIGRATION_BATCH_SIZE):
+    # One-off backfills and rewrites, run with make migrate before deploying
+    # a version that needs them. They go through whole collections, so they
+    # are kept out of the server startup, which every replica runs.
+    transitions = event_repository.add_missing_transitions(batch_size)
+    logger.info(f"Events: {transitions} transitions added")
+    tokens = event_repository.add_missing_search_tokens(batch_size)
+    logger.info(f"Events: {tokens} search tokens added")
+    migrate_dates(batch_size)
+    if rollup_repository.is_empty():
+        days = rollup_repository.rebuild()
+        logger.info(f"Stats rollups rebuilt for {days} days")
+
+
+if __name__ == '__main__':
+    migrate()
@@ -1,6 +1,11 @@
 import datetime
+from app.config.constants import TIMEZONE
+
+
+def getTimezone():
+    # TIMEZONE is a fixed UTC offset, such as -03:00
+    return datetime.datetime.strptime(TIMEZONE, '%z').tzinfo
 
 
 def getNow():
-    tz = datetime.timezone(datetime.timedelta(hours=-3))
-    return datetime.datetime.now(tz=tz)
+    return datetime.datetime.now(tz=getTimezone())
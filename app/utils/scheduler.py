@@ -0,0 +1,90 @@
+import asyncio
+import time
+from contextlib import suppress
+from typing import Callable, Optional
+from uuid import uuid4
+from app.config.logger import setup_logger
+from app.repositories.leases import LeaseRepository
+from app.utils.executor import run_command
+
+logger = setup_logger(__name__)
+
+
+class JobMetrics:
+    def __init__(self):
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.last_tick_duration = 0.0
+        self.last_processed = 0
+        self.total_processed = 0
+        self.is_leader = False
+
+
+class AcquireLeaseCommand:
+    def __init__(self, lease_repository: LeaseRepository, name: str, duration: int):
+        self.lease_repository = lease_repository
+        self.name = name
+        self.duration = duration
+        self.owner = str(uuid4())
+
+    def execute(self) -> bool:
+        return self.lease_repository.acquire(self.name, self.owner, self.duration)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        name: str,
+        interval: int,
+        command_factory: Callable,
+        lease_repository: Optional[LeaseRepository] = None,
+    ):
+        self.name = name
+        self.interval = interval
+        self.command_factory = command_factory
+        # Without a lease repository every replica runs the job. The lease
+        # outlives a few ticks so a slow tick does not hand the job over to
+        # another replica, but a dead leader is replaced quickly.
+        self.lease = None
+        if lease_repository is not None:
+            self.lease = AcquireLeaseCommand(lease_repository, name, interval * 3)
+        self.metrics = JobMetrics()
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.task
+        self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(e)
+            await asyncio.sleep(self.interval)
+
+    async def tick(self):
+        if self.lease is not None:
+            self.metrics.is_leader = await run_command(self.lease)
+        else:
+            self.metrics.is_leader = True
+        if not self.metrics.is_leader:
+            self.metrics.skipped_ticks += 1
+            return
+        start = time.perf_counter()
+        processed = await run_command(self.command_factory())
+        self.metrics.ticks += 1
+        self.metrics.last_tick_duration = time.perf_counter() - start
+        self.metrics.last_processed = processed
+        self.metrics.total_processed += processed
+        logger.info(
+            f"{self.name}: {processed} processed in "
+            f"{self.metrics.last_tick_duration:.3f}s"
+        )
@@ -0,0 +1,26 @@
+import re
+import unicodedata
+
+WORD = re.compile(r'\w+')
+
+
+def fold(text: str) -> str:
+    # "Música" -> "musica", so searches ignore case and Spanish accents
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD.findall(fold(text))
+
+
+def relevance(text: str, terms: list[str]) -> int:
+    # Whole words count double over prefixes; terms found elsewhere score 0
+    tokens = tokenize(text)
+    score = 0
+    for term in terms:
+        if term in tokens:
+            score += 2
+        elif any(token.startswith(term) for token in tokens):
+            score += 1
+    return score
@@ -0,0 +1,47 @@
+import time
+
+from app.config.constants import BULK_EVENTS_LIMIT
+from app.repositories.config import clear_db
+from benchmarks.utils import EVENT, URI, client
+
+EVENTS = 10_000
+
+
+def single() -> float:
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        client.post(URI, json={**EVENT, 'name': f'event {i}'})
+    return time.perf_counter() - start
+
+
+def bulk(ordered: bool) -> float:
+    events = [{**EVENT, 'name': f'event {i}'} for i in range(EVENTS)]
+    start = time.perf_counter()
+    for batch in range(0, EVENTS, BULK_EVENTS_LIMIT):
+        client.post(
+            f'{URI}/bulk?ordered={str(ordered).lower()}',
+            json=events[batch : batch + BULK_EVENTS_LIMIT],
+        )
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{EVENTS} events, bulk batches of {BULK_EVENTS_LIMIT}")
+    try:
+        for name, ingest in [
+            ('POST /events', single),
+            ('bulk, unordered', lambda: bulk(False)),
+            ('bulk, ordered', lambda: bulk(True)),
+        ]:
+            latency = ingest()
+            print(
+                f"{name:<24} {latency * 1000:>10.1f} ms "
+                f"{EVENTS / latency:>10.0f} events/s"
+            )
+            clear_db()
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
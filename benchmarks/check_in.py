@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.repositories.bookings import PersistentBookingRepository, VERIFIED_TIME_FORMAT
+from app.repositories.config import clear_db, db
+from app.repositories.dates import to_utc
+from app.commands.bookings import VerifyBookingCommand
+from app.repositories.dependencies import (
+    booking_repository,
+    event_repository,
+    rollup_repository,
+)
+from app.repositories.event import PersistentEventRepository
+from app.utils.now import getNow
+from benchmarks.utils import BATCH, EVENT, URI, client
+
+SCANS = 10_000
+SCANNERS = 16
+BATCH_SIZES = [100, 1_000]
+
+
+def seed() -> str:
+    event = client.post(URI, json={**EVENT, 'vacants': SCANS}).json()
+    client.put(f"{URI}/{event['id']}/publish")
+    for start in range(0, SCANS, BATCH):
+        db['Bookings'].insert_many(
+            [
+                {
+                    '_id': f'booking-{i}',
+                    'event_id': event['id'],
+                    'reserver_id': f'reserver-{i}',
+                    'verified': False,
+                    'verified_time': None,
+                }
+                for i in range(start, min(start + BATCH, SCANS))
+            ]
+        )
+    return event['id']
+
+
+def reset(event_id: str):
+    db['Bookings'].update_many({}, {'$set': {'verified': False, 'verified_time': None}})
+    db['Events'].update_one({'_id': event_id}, {'$set': {'verified_vacants': 0}})
+
+
+def previous_verify(id: str, event_id: str):
+    # The round trips of a scan before: the booking was read, read again and
+    # written back whole, then the event was read and updated
+    bookings = PersistentBookingRepository()
+    events = PersistentEventRepository()
+    bookings.get_booking(id)
+    booking = bookings.get_booking(id)
+    verified_time = getNow().strftime(VERIFIED_TIME_FORMAT)
+    db['Bookings'].update_one(
+        {'_id': id},
+        {
+            '$set': {
+                'event_id': booking.event_id,
+                'reserver_id': booking.reserver_id,
+                'verified': True,
+                'verified_time': to_utc(
+                    datetime.strptime(verified_time, VERIFIED_TIME_FORMAT)
+                ),
+            }
+        },
+    )
+    event = events.get_event(event_id)
+    events.update_verified_vacants(event_id, event.verified_vacants + 1)
+    rollup_repository.verify_booking(
+        verified_time, event.organizer, str(event.created_at)
+    )
+
+
+def check_in(id: str, event_id: str):
+    VerifyBookingCommand(
+        booking_repository, event_repository, id, event_id, rollup_repository
+    ).execute()
+
+
+def single(event_id: str):
+    def scan(i: int):
+        client.put(f'api/bookings/booking-{i}/verify', json={'event_id': event_id})
+
+    return scan
+
+
+def throughput(scan, scanners: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=scanners) as executor:
+        list(executor.map(scan, range(SCANS)))
+    return SCANS / (time.perf_counter() - start)
+
+
+def batch(event_id: str, size: int) -> float:
+    start = time.perf_counter()
+    for first in range(0, SCANS, size):
+        scans = [
+            {'booking_id': f'booking-{i}', 'event_id': event_id}
+            for i in range(first, min(first + size, SCANS))
+        ]
+        client.post('api/bookings/verify', json={'scans': scans})
+    return SCANS / (time.perf_counter() - start)
+
+
+def report(name: str, scans_per_second: float):
+    print(f"{name:<32} {scans_per_second:>10.0f} scans/s")
+
+
+def main():
+    event_id = seed()
+    try:
+        # Without HTTP, the previous round trips against the check-in path
+        report(
+            'previous, per scan',
+            throughput(lambda i: previous_verify(f'booking-{i}', event_id), 1),
+        )
+        reset(event_id)
+        report(
+            'check-in, per scan',
+            throughput(lambda i: check_in(f'booking-{i}', event_id), 1),
+        )
+        reset(event_id)
+        report('PUT verify', throughput(single(event_id), 1))
+        reset(event_id)
+        report(
+            f'PUT verify, {SCANNERS} scanners',
+            throughput(single(event_id), SCANNERS),
+        )
+        for size in BATCH_SIZES:
+            reset(event_id)
+            report(f'POST verify, batches of {size}', batch(event_id, size))
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import random
+
+from app.repositories.config import clear_db
+from app.repositories.event import FACET, PersistentEventRepository
+from benchmarks.stats import event_fields, measure, report
+from benchmarks.utils import seed_events
+
+EVENTS = 1_000_000
+RANGES = [
+    ('whole period', '2022-01-01', '2023-12-31'),
+    ('one year', '2023-01-01', '2023-12-31'),
+    ('one month', '2023-06-01', '2023-06-30'),
+]
+
+
+def main():
+    random.seed(0)
+    seed_events(EVENTS, event_fields)
+    try:
+        separate = PersistentEventRepository("separate")
+        facet = PersistentEventRepository(FACET)
+        for name, start, end in RANGES:
+            print(name)
+            report(
+                '  5 pipelines', measure(lambda: separate.get_event_stats(start, end))
+            )
+            report('  $facet', measure(lambda: facet.get_event_stats(start, end)))
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
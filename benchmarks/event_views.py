@@ -0,0 +1,47 @@
+import statistics
+import time
+
+from app.commands.events import SearchEventsCommand
+from app.models.event import EventView
+from app.repositories.config import clear_db
+from app.repositories.dependencies import event_repository
+from app.repositories.event import Search
+from benchmarks.utils import RUNS, URI, report, seed_events
+
+EVENTS = 5_000
+
+
+def command_time(view: EventView) -> float:
+    search = Search(
+        organizer=None,
+        type=None,
+        location=None,
+        limit=EVENTS,
+        name=None,
+        only_published=False,
+        not_finished=False,
+    )
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        SearchEventsCommand(event_repository, search, view).execute()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main():
+    seed_events(EVENTS)
+    try:
+        report('view=full', f'{URI}?limit={EVENTS}')
+        report('view=summary', f'{URI}?limit={EVENTS}&view=summary')
+        for view in EventView:
+            print(
+                f"{view.value:<24} fetch + serialize "
+                f"{command_time(view) * 1000:>10.1f} ms"
+            )
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
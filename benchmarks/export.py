@@ -0,0 +1,65 @@
+import gc
+import resource
+import time
+
+from app.commands.export import ExportBookingsCommand
+from app.repositories.config import clear_db, db
+from app.repositories.dependencies import booking_repository
+from app.schemas.export import ExportFormat
+from benchmarks.utils import BATCH
+
+BOOKINGS = 1_000_000
+EVENTS = 100
+
+
+def seed():
+    for start in range(0, BOOKINGS, BATCH):
+        db['Bookings'].insert_many(
+            [
+                {
+                    '_id': f'booking-{i}',
+                    'event_id': f'event-{i % EVENTS}',
+                    'reserver_id': f'reserver-{i}',
+                    'verified': False,
+                    'verified_time': None,
+                }
+                for i in range(start, min(start + BATCH, BOOKINGS))
+            ]
+        )
+
+
+def rss() -> int:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def export(format: ExportFormat):
+    # Read straight from the command, as the test client would keep the whole
+    # response body in memory
+    gc.collect()
+    command = ExportBookingsCommand(booking_repository, None, format, 1000)
+    before = rss()
+    peak = before
+    lines = 0
+    start = time.perf_counter()
+    for chunk in command.execute():
+        lines += chunk.count('\n')
+        peak = max(peak, rss())
+    duration = time.perf_counter() - start
+    print(
+        f"{format.value:<8} {lines:>9} lines {lines / duration:>10.0f} rows/s "
+        f"{(peak - before) / 1024 / 1024:>8.1f} MiB over the starting RSS"
+    )
+
+
+def main():
+    seed()
+    try:
+        for format in ExportFormat:
+            export(format)
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
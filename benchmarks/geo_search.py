@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from app.config.constants import GEO_TILE_SIZE, GEO_TILE_MAX_EVENTS
+from app.repositories.cache import LocalCache
+from app.repositories.cached_event import CachedEventRepository
+from app.repositories.config import clear_db
+from app.repositories.event import PersistentEventRepository, Search, SearchLocation
+from benchmarks.utils import seed_events
+
+EVENTS = 100_000
+USERS = 5_000
+# Buenos Aires, with events spread over ~50km and users packed downtown
+CENTER = (-34.6037, -58.3816)
+EVENTS_SPREAD = 0.25
+USERS_SPREAD = 0.02
+DIST = 2_000
+
+
+def event_fields(i: int) -> dict:
+    lat = random.gauss(CENTER[0], EVENTS_SPREAD)
+    lng = random.gauss(CENTER[1], EVENTS_SPREAD)
+    return {
+        'location': {
+            'description': 'a location',
+            'type': 'Point',
+            'coordinates': [lng, lat],
+        }
+    }
+
+
+def search(lat: float, lng: float) -> Search:
+    return Search(
+        organizer=None,
+        type=None,
+        location=SearchLocation(lat=lat, lng=lng, dist=DIST),
+        limit=50,
+        name=None,
+        only_published=False,
+        not_finished=False,
+    )
+
+
+def run(name: str, repository, users: list):
+    latencies = []
+    for lat, lng in users:
+        start = time.perf_counter()
+        repository.search_event_summaries(search(lat, lng))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(
+        f"{name:<10} p50 {statistics.median(latencies) * 1000:>8.2f} ms"
+        f"   p99 {latencies[int(len(latencies) * 0.99)] * 1000:>8.2f} ms"
+        f"   total {sum(latencies):>7.2f} s"
+    )
+
+
+def main():
+    random.seed(0)
+    seed_events(EVENTS, event_fields)
+    users = [
+        (random.gauss(CENTER[0], USERS_SPREAD), random.gauss(CENTER[1], USERS_SPREAD))
+        for _ in range(USERS)
+    ]
+    try:
+        persistent = PersistentEventRepository()
+        geo_cache = LocalCache(10_000, 60)
+        cached = CachedEventRepository(
+            persistent,
+            LocalCache(0, 0),
+            geo_cache,
+            GEO_TILE_SIZE,
+            GEO_TILE_MAX_EVENTS,
+        )
+        run('geoWithin', persistent, users)
+        run('tiles', cached, users)
+        print(
+            f"tile cache hit rate {geo_cache.metrics.hit_rate():.1%}, "
+            f"{len(geo_cache.entries)} tiles"
+        )
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from app.repositories.config import db, clear_db
+from app.repositories.dependencies import event_repository
+from app.repositories.event import Search
+from app.utils.text import tokenize
+from benchmarks.utils import RUNS, seed_events
+
+SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = ['musica', 'gastro', 'noche de tango']
+WORDS = [
+    'Noche',
+    'Festival',
+    'Música',
+    'Tango',
+    'Gastronomía',
+    'Cine',
+    'Teatro',
+    'Feria',
+    'Danza',
+    'Rock',
+    'Jazz',
+    'Taller',
+]
+
+
+def event_fields(i: int) -> dict:
+    name = ' '.join(WORDS[(i // len(WORDS) ** k) % len(WORDS)] for k in range(3))
+    return {
+        'name': name,
+        'search_tokens': sorted(set(tokenize(name) + tokenize('aDescription'))),
+        'name_tokens': sorted(set(tokenize(name))),
+    }
+
+
+def median_time(query) -> float:
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        query()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def regex_search(name: str):
+    # Previous implementation of Search.name
+    return list(
+        db['Events'].find({'name': {'$regex': name, '$options': 'i'}}).limit(50)
+    )
+
+
+def token_search(name: str):
+    search = Search(
+        organizer=None,
+        type=None,
+        location=None,
+        limit=50,
+        name=name,
+        only_published=False,
+        not_finished=False,
+    )
+    return event_repository.search_events(search)
+
+
+def main():
+    for size in SIZES:
+        seed_events(size, event_fields)
+        try:
+            for name in QUERIES:
+                regex = median_time(lambda: regex_search(name))
+                tokens = median_time(lambda: token_search(name))
+                print(
+                    f"{size:>9} {name!r:<18} regex {regex * 1000:>9.1f} ms"
+                    f"   tokens {tokens * 1000:>9.1f} ms"
+                )
+        finally:
+            clear_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from app.models.event import State
+from app.repositories.config import clear_db
+from app.repositories.event import PersistentEventRepository, Search
+from benchmarks.utils import RUNS, client, seed_events
+
+EVENTS = 10_000
+ORGANIZER = 'organizer-benchmark'
+URI = f'api/organizers/{ORGANIZER}'
+
+
+def seed():
+    client.post(
+        'api/organizers',
+        json={
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+            'email': 'organizer@mail.com',
+            'id': ORGANIZER,
+        },
+    )
+    seed_events(
+        EVENTS, lambda i: {'organizer': ORGANIZER, 'state': State.Publicado.value}
+    )
+
+
+def per_event_loop(old: State, new: State):
+    # What the commands did before: read every event, then write them one by one
+    events = PersistentEventRepository()
+    search = Search(
+        organizer=ORGANIZER,
+        type=None,
+        location=None,
+        limit=100000,
+        name=None,
+        only_published=False,
+        not_finished=False,
+    )
+    for event in events.search_events(search):
+        if event.state == old:
+            events.update_state_event(event.id, new)
+            if new == State.Suspendido:
+                events.update_suspended_at(event.id, '2030-01-01')
+
+
+def main():
+    seed()
+    try:
+        latencies = {'suspend': [], 'unsuspend': []}
+        operations = {}
+        for _ in range(RUNS):
+            # Each suspension is undone by the next unsuspension
+            for action in latencies:
+                start = time.perf_counter()
+                response = client.put(f'{URI}/{action}')
+                latencies[action].append(time.perf_counter() - start)
+                operations[action] = response.headers['X-DB-Operations']
+        for action, latency in latencies.items():
+            print(
+                f"{action:<24} {statistics.median(latency) * 1000:>10.1f} ms "
+                f"{operations[action]:>6} db operations"
+            )
+
+        loop = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            per_event_loop(State.Publicado, State.Suspendido)
+            per_event_loop(State.Suspendido, State.Publicado)
+            loop.append(time.perf_counter() - start)
+        print(
+            f"{'per event, both ways':<24} {statistics.median(loop) * 1000:>10.1f} ms"
+        )
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
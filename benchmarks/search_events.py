@@ -0,0 +1,18 @@
+from app.repositories.config import clear_db
+from benchmarks.utils import URI, report, seed_events
+
+EVENTS = 100_000
+
+
+def main():
+    seed_events(EVENTS)
+    try:
+        report('largest page', f'{URI}?limit=100')
+        first = report('first page', URI)
+        report('second page', f"{URI}?cursor={first.headers['X-Next-Cursor']}")
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import datetime
+import random
+import statistics
+import time
+
+from app.repositories.bookings import PersistentBookingRepository
+from app.repositories.complaints import PersistentComplaintRepository
+from app.repositories.config import clear_db, db
+from app.repositories.dates import day_start
+from app.repositories.event import PersistentEventRepository
+from app.repositories.rollups import PersistentStatsRollupRepository
+from app.utils.executor import run_queries
+from benchmarks.utils import BATCH, RUNS, seed_events
+
+EVENTS = 200_000
+BOOKINGS = 500_000
+COMPLAINTS = 50_000
+ORGANIZERS = 1_000
+START = datetime.date(2022, 1, 1)
+DAYS = 730
+STATES = ['Borrador', 'Publicado', 'Finalizado', 'Cancelado', 'Suspendido']
+
+
+def day() -> datetime.datetime:
+    return day_start(START + datetime.timedelta(days=random.randrange(DAYS)))
+
+
+def event_fields(i: int) -> dict:
+    return {
+        'created_at': day(),
+        'state': random.choice(STATES),
+        'organizer': f'organizer-{i % ORGANIZERS}',
+        'verified_vacants': random.randrange(10),
+        'published_at': day(),
+        'suspended_at': day() if i % 20 == 0 else None,
+    }
+
+
+def seed(collection: str, amount: int, document):
+    for start in range(0, amount, BATCH):
+        db[collection].insert_many(
+            [document(i) for i in range(start, min(start + BATCH, amount))]
+        )
+
+
+def queries(start: str, end: str) -> dict:
+    events = PersistentEventRepository()
+    bookings = PersistentBookingRepository()
+    complaints = PersistentComplaintRepository()
+    return {
+        'event_states': lambda: events.get_event_states_stat(start, end),
+        'top_organizers': lambda: events.get_top_organizers_stat(start, end),
+        'verified_bookings': lambda: bookings.get_verified_bookings_stat(
+            start, end, 'month'
+        ),
+        'complaints_by_time': lambda: complaints.get_complaints_by_time(start, end),
+        'suspended_by_time': lambda: events.get_suspended_by_time(start, end),
+        'events_by_time': lambda: events.get_events_by_time(start, end),
+        'events_published_by_time': lambda: events.get_events_published_by_time(
+            start, end
+        ),
+    }
+
+
+def measure(function) -> float:
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def report(name: str, latency: float):
+    print(f"{name:<28} {latency * 1000:>10.1f} ms")
+
+
+def main():
+    random.seed(0)
+    seed_events(EVENTS, event_fields)
+    seed(
+        'Bookings',
+        BOOKINGS,
+        lambda i: {
+            '_id': f'booking-{i}',
+            'event_id': f'event-{i % EVENTS}',
+            'reserver_id': f'user-{i}',
+            'verified': i % 2 == 0,
+            'verified_time': day() + datetime.timedelta(hours=random.randrange(24)),
+        },
+    )
+    seed('Complaints', COMPLAINTS, lambda i: {'_id': f'complaint-{i}', 'date': day()})
+    try:
+        rollups = PersistentStatsRollupRepository()
+        rollups.rebuild()
+        start, end = '2022-01-01', '2023-12-31'
+        stats = queries(start, end)
+
+        latencies = {name: measure(query) for name, query in stats.items()}
+        for name, latency in latencies.items():
+            report(name, latency)
+        report('slowest query', max(latencies.values()))
+        report('sequential', measure(lambda: [query() for query in stats.values()]))
+        report('concurrent', measure(lambda: run_queries(stats)))
+        report('rollups', measure(lambda: rollups.get_stats(start, end, 'month')))
+    finally:
+        clear_db()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+from datetime import date, time as dtime
+
+from app.models.event import EventSummary, Location, State, Type
+from app.repositories.suggestions import InMemorySuggestionRepository
+
+EVENTS = 100_000
+LOOKUPS = 10_000
+WORDS = [
+    'Noche',
+    'Festival',
+    'Música',
+    'Tango',
+    'Gastronomía',
+    'Cine',
+    'Teatro',
+    'Feria',
+    'Danza',
+    'Rock',
+    'Jazz',
+    'Taller',
+]
+NOW = '2023-02-02T15:00:00'
+
+
+def event(i: int) -> EventSummary:
+    name = ' '.join(random.choice(WORDS) for _ in range(3)) + f' {i}'
+    return EventSummary(
+        id=str(i),
+        name=name,
+        location=Location(description='location', lat=0, lng=0),
+        type=Type.Danza,
+        preview_image='preview_image',
+        date=date(2030, 1, 1),
+        start_time=dtime(9),
+        end_time=dtime(12),
+        organizer='organizer',
+        vacants=10,
+        vacants_left=10,
+        state=State.Publicado,
+    )
+
+
+def main():
+    random.seed(0)
+    repository = InMemorySuggestionRepository()
+
+    start = time.perf_counter()
+    repository.replace_all([event(i) for i in range(EVENTS)], [])
+    print(f"build {EVENTS} events      {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = [random.choice(WORDS)[: random.randint(1, 5)] for _ in range(LOOKUPS)]
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        repository.suggest(query, 10, NOW)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(
+        f"lookup p50 {statistics.median(latencies) * 1e6:.1f} us"
+        f"   p99 {latencies[int(LOOKUPS * 0.99)] * 1e6:.1f} us"
+    )
+
+    start = time.perf_counter()
+    for i in range(1_000):
+        repository.add_event(event(EVENTS + i))
+    print(f"incremental add, each {(time.perf_counter() - start) * 1e3:.3f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import statistics
+import time
+from fastapi.testclient import TestClient
+
+from app.app import app
+from app.repositories.config import db
+
+BATCH = 10_000
+RUNS = 10
+URI = 'api/events'
+
+client = TestClient(app)
+
+EVENT = {
+    'name': 'aName',
+    'description': 'aDescription',
+    'location': {'description': 'a location', 'lat': 23.4, 'lng': 32.23},
+    'type': 'Danza',
+    'images': ['image1', 'image2', 'image3'],
+    'preview_image': 'preview_image',
+    'date': '2030-03-29',
+    'start_time': '09:00:00',
+    'end_time': '12:00:00',
+    'scan_time': 5,
+    'organizer': 'anOwner',
+    'agenda': [
+        {
+            'time_init': '09:00',
+            'time_end': '12:00',
+            'owner': 'Pepe Cibrian',
+            'title': 'Noche de teatro en Bs As',
+            'description': 'Una noche de teatro unica',
+        }
+    ],
+    'vacants': 3,
+    'FAQ': [
+        {
+            'question': 'se pueden llevar alimentos?',
+            'answer': 'No. No se permiten alimentos ni bebidas en el lugar',
+        }
+    ],
+}
+
+
+def seed_events(amount: int, fields=lambda i: {}):
+    response = client.post(URI, json=EVENT)
+    template = db['Events'].find_one({'_id': response.json()['id']})
+    for start in range(1, amount, BATCH):
+        db['Events'].insert_many(
+            [
+                {**template, '_id': f'event-{i}', 'vacants': i % 500 + 1, **fields(i)}
+                for i in range(start, min(start + BATCH, amount))
+            ]
+        )
+
+
+def measure(url: str):
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - start)
+    return response, statistics.median(latencies)
+
+
+def report(name: str, url: str):
+    response, latency = measure(url)
+    print(
+        f"{name:<24} {len(response.json()):>6} events "
+        f"{len(response.content) / 1024:>10.1f} KiB {latency * 1000:>10.1f} ms"
+    )
+    return response
@@ -0,0 +1,9 @@
+import pytest
+
+from app.repositories.indexes import create_indexes
+
+
+@pytest.fixture(autouse=True, scope='session')
+def indexes():
+    # The app creates them on startup, which the test clients never run
+    create_indexes()
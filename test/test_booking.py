@@ -1,9 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient
 from pprint import pprint
 import pytest
 from test.utils import generate_invalid, mock_date
 
 from app.app import app
+from app.repositories.dependencies import booking_repository
 
 client = TestClient(app)
 
@@ -335,6 +337,60 @@ def test_booking_no_more_vacants(monkeypatch):
     assert response.json() == {'detail': 'no_more_vacants_left'}
 
 
+def test_booking_concurrent_requests_do_not_oversell(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    number_of_vacants = 50
+    number_of_reservers = 2000
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id'], 'vacants': number_of_vacants})
+    client.put(f"{EVENTS_URI}/{event['id']}/publish")
+
+    event_id = event['id']
+
+    def book(reserver_id):
+        booking_body = {"event_id": event_id, "reserver_id": reserver_id}
+        return client.post(URI, json=booking_body)
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        responses = list(executor.map(book, map(str, range(number_of_reservers))))
+
+    created = [r for r in responses if r.status_code == 201]
+    rejected = [r for r in responses if r.status_code == 400]
+    assert len(created) == number_of_vacants
+    assert len(rejected) == number_of_reservers - number_of_vacants
+    assert all(r.json() == {'detail': 'no_more_vacants_left'} for r in rejected)
+
+    response = client.get(f'api/events/{event_id}')
+    assert response.json()['vacants_left'] == 0
+    response = client.get(f'{URI}/event/{event_id}')
+    assert len(response.json()) == number_of_vacants
+
+
+def test_booking_concurrent_duplicated_requests(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    number_of_vacants = 100
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    reserver = create_user({'email': 'reserver@mail.com', 'id': '234'})
+    event = create_event({'owner': organizer['id'], 'vacants': number_of_vacants})
+    client.put(f"{EVENTS_URI}/{event['id']}/publish")
+
+    event_id = event['id']
+    booking_body = {"event_id": event_id, "reserver_id": reserver['id']}
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        responses = list(
+            executor.map(lambda _: client.post(URI, json=booking_body), range(200))
+        )
+
+    assert len([r for r in responses if r.status_code == 201]) == 1
+    rejected = [r for r in responses if r.status_code == 400]
+    assert len(rejected) == 199
+    assert all(r.json() == {'detail': 'booking_already_exists'} for r in rejected)
+
+    response = client.get(f'api/events/{event_id}')
+    assert response.json()['vacants_left'] == number_of_vacants - 1
+
+
 def test_verify_booking(monkeypatch):
     mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
     organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
@@ -410,6 +466,200 @@ def test_verify_booking_twice(monkeypatch):
     assert response.json() == {'detail': 'booking_already_verified'}
 
 
+def test_verify_booking_db_operations(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id']})
+    client.put(f"{EVENTS_URI}/{event['id']}/publish")
+    booking_body = {"event_id": event['id'], "reserver_id": '234'}
+    booking = client.post(URI, json=booking_body).json()
+
+    body = {"event_id": event['id']}
+    response = client.put(URI + f"/{booking['id']}/verify", json=body)
+    # The booking and the event are updated once each, plus the stats rollups
+    assert response.headers['X-DB-Operations'] == '4'
+    response = client.get(f"{EVENTS_URI}/{event['id']}")
+    assert response.json()['verified_vacants'] == 1
+
+
+def test_verify_bookings_in_batch(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event1 = create_event({'organizer': organizer['id']})
+    event2 = create_event({'organizer': organizer['id']})
+    for event in [event1, event2]:
+        client.put(f"{EVENTS_URI}/{event['id']}/publish")
+    bookings = [
+        client.post(URI, json={"event_id": event['id'], "reserver_id": id}).json()
+        for event, id in [(event1, '1'), (event1, '2'), (event1, '3'), (event2, '4')]
+    ]
+    body = {"event_id": event1['id']}
+    client.put(URI + f"/{bookings[2]['id']}/verify", json=body)
+
+    scans = [
+        {
+            'booking_id': bookings[0]['id'],
+            'event_id': event1['id'],
+            'scanned_at': '2022-01-01T01:30:00',
+        },
+        {
+            'booking_id': bookings[1]['id'],
+            'event_id': event1['id'],
+            'scanned_at': '2022-01-01T04:45:00Z',
+        },
+        {'booking_id': bookings[0]['id'], 'event_id': event1['id']},
+        {'booking_id': bookings[2]['id'], 'event_id': event1['id']},
+        {'booking_id': bookings[3]['id'], 'event_id': event1['id']},
+        {'booking_id': 'unknown', 'event_id': event1['id']},
+        {'booking_id': bookings[3]['id'], 'event_id': event2['id']},
+    ]
+    response = client.post(URI + '/verify', json={'scans': scans})
+    assert response.status_code == 200
+    results = response.json()
+    assert [result['index'] for result in results] == list(range(7))
+    statuses = [result['status'] for result in results]
+    assert statuses == [200, 200, 400, 400, 400, 404, 200]
+    assert [result['detail'] for result in results] == [
+        None,
+        None,
+        'booking_already_verified',
+        'booking_already_verified',
+        'incorrect_event',
+        'booking_not_found',
+        None,
+    ]
+
+    response = client.get(f"{URI}/event/{event1['id']}/verified")
+    assert [booking['verified_time'] for booking in response.json()] == [
+        '2022-01-01 01:30',
+        '2022-01-01 01:45',
+        '2022-01-01 02:00',
+    ]
+    response = client.get(f"{URI}/event/{event2['id']}/verified")
+    assert [booking['verified_time'] for booking in response.json()] == [
+        '2022-01-01 02:00'
+    ]
+    response = client.get(f"{EVENTS_URI}/{event1['id']}")
+    assert response.json()['verified_vacants'] == 3
+    response = client.get(f"{EVENTS_URI}/{event2['id']}")
+    assert response.json()['verified_vacants'] == 1
+    response = client.get(
+        'api/stats/rollups/check?start_date=2021-12-01&end_date=2022-01-31'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
+def test_check_in_many_skips_bookings_verified_elsewhere_in_the_same_minute(
+    monkeypatch,
+):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'organizer': organizer['id']})
+    client.put(f"{EVENTS_URI}/{event['id']}/publish")
+    ids = [
+        client.post(URI, json={"event_id": event['id'], "reserver_id": id}).json()['id']
+        for id in ['1', '2']
+    ]
+    bookings = booking_repository.get_bookings(ids)
+    for booking in bookings:
+        booking.verified_time = '2022-01-01 02:00'
+
+    # Another door checks in the first one meanwhile, within the same minute
+    assert booking_repository.check_in(ids[0], event['id'], '2022-01-01 02:00')
+    verified = booking_repository.check_in_many(bookings)
+    assert [booking.id for booking in verified] == [ids[1]]
+
+
+def test_verify_bookings_in_batch_needs_scans():
+    response = client.post(URI + '/verify', json={'scans': []})
+    assert response.status_code == 422
+
+
+def test_bookings_manifest(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'organizer': organizer['id']})
+    other_event = create_event({'organizer': organizer['id']})
+    for e in [event, other_event]:
+        client.put(f"{EVENTS_URI}/{e['id']}/publish")
+    bookings = [
+        client.post(URI, json={"event_id": e['id'], "reserver_id": id}).json()
+        for e, id in [(event, '1'), (event, '2'), (other_event, '3')]
+    ]
+    client.put(URI + f"/{bookings[1]['id']}/verify", json={"event_id": event['id']})
+
+    response = client.get(f"{URI}/event/{event['id']}/manifest")
+    assert response.status_code == 200
+    manifest = response.json()
+    assert manifest['event_id'] == event['id']
+    assert manifest['full']
+    assert manifest['bookings'] == sorted([bookings[0]['id'], bookings[1]['id']])
+    assert manifest['verified'] == [bookings[1]['id']]
+    assert manifest['sync_token']
+
+
+def test_bookings_manifest_delta(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'organizer': organizer['id'], 'vacants': 4})
+    client.put(f"{EVENTS_URI}/{event['id']}/publish")
+    bookings = [
+        client.post(URI, json={"event_id": event['id'], "reserver_id": id}).json()
+        for id in ['1', '2', '3']
+    ]
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 3})
+    manifest = client.get(f"{URI}/event/{event['id']}/manifest").json()
+
+    # Nothing changed since the manifest
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 3, 'min': 10})
+    response = client.get(
+        f"{URI}/event/{event['id']}/manifest?since={manifest['sync_token']}"
+    )
+    assert response.status_code == 200
+    delta = response.json()
+    assert not delta['full']
+    assert delta['bookings'] == []
+    assert delta['verified'] == []
+
+    new_booking = client.post(
+        URI, json={"event_id": event['id'], "reserver_id": '4'}
+    ).json()
+    client.put(URI + f"/{bookings[0]['id']}/verify", json={"event_id": event['id']})
+    scans = [{'booking_id': bookings[1]['id'], 'event_id': event['id']}]
+    client.post(URI + '/verify', json={'scans': scans})
+
+    response = client.get(
+        f"{URI}/event/{event['id']}/manifest?since={delta['sync_token']}"
+    )
+    delta = response.json()
+    assert delta['bookings'] == sorted(
+        [bookings[0]['id'], bookings[1]['id'], new_booking['id']]
+    )
+    assert delta['verified'] == sorted([bookings[0]['id'], bookings[1]['id']])
+
+    # Applying the deltas on the first manifest gives a full one
+    full = client.get(f"{URI}/event/{event['id']}/manifest").json()
+    assert full['bookings'] == sorted(set(manifest['bookings'] + delta['bookings']))
+    assert full['verified'] == sorted(set(manifest['verified'] + delta['verified']))
+
+
+def test_bookings_manifest_with_invalid_sync_token(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'organizer': organizer['id']})
+
+    for token in ['invalid', 'WyJhIl0=', 'WzIsICIyMDIyLTAxLTAxVDAyOjAwOjAwIl0=']:
+        response = client.get(f"{URI}/event/{event['id']}/manifest?since={token}")
+        assert response.status_code == 400
+        assert response.json()['detail'] == 'invalid_sync_token'
+
+
+def test_bookings_manifest_of_non_existing_event():
+    response = client.get(f"{URI}/event/unknown/manifest")
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'event_not_found'
+
+
 def test_booking_with_non_published_event(monkeypatch):
     mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
     organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
@@ -0,0 +1,354 @@
+import time
+from fastapi.testclient import TestClient
+import pytest
+from test.utils import mock_date
+
+from app.app import app
+from app.repositories.cache import LocalCache
+from app.repositories.config import db
+from app.commands.events import SuspendEventCommand, UnSuspendEventCommand
+from app.repositories.dependencies import (
+    event_repository,
+    event_cache,
+    geo_cache,
+    rollup_repository,
+    suggestion_repository,
+)
+from app.repositories.event import EventPosition, PersistentEventRepository
+from app.utils.geo import distance, tile, tile_center, tile_radius
+
+client = TestClient(app)
+
+URI = 'api/events'
+BOOKINGS_URI = 'api/bookings'
+
+
+def create_organizer(fields={}):
+    body = {
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email@mail.com',
+        'profession': 'profession',
+        'about_me': 'about_me',
+        'profile_picture': 'profile_picture',
+        'id': '123',
+    }
+
+    for k, v in fields.items():
+        body[k] = v
+
+    response = client.post("api/organizers", json=body)
+    return response.json()
+
+
+def create_event(fields={}):
+    body = {
+        'name': 'aName',
+        'description': 'aDescription',
+        'location': {
+            'description': 'a location description',
+            'lat': 23.4,
+            'lng': 32.23,
+        },
+        'type': 'Danza',
+        'images': ['image1', 'image2', 'image3'],
+        'preview_image': 'preview_image',
+        'date': '2023-03-29',
+        'start_time': '09:00:00',
+        'end_time': '12:00:00',
+        'scan_time': 10,
+        'organizer': 'anOwner',
+        'agenda': [
+            {
+                'time_init': '09:00',
+                'time_end': '12:00',
+                'owner': 'Pepe Cibrian',
+                'title': 'Noche de teatro en Bs As',
+                'description': 'Una noche de teatro unica',
+            }
+        ],
+        'vacants': 3,
+        'FAQ': [],
+    }
+
+    for k, v in fields.items():
+        body[k] = v
+
+    response = client.post("api/events", json=body)
+    return response.json()
+
+
+@pytest.fixture(autouse=True)
+def clear_db(monkeypatch):
+    # This runs before each test
+    mock_date(monkeypatch, {'year': 2022, 'month': 1, 'day': 1, 'hour': 2})
+
+    yield
+
+    # Ant this runs after each test
+    client.post('api/reset')
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.metrics.evictions == 1
+    assert cache.metrics.hits == 3
+    assert cache.metrics.misses == 1
+
+
+def test_local_cache_expires_entries():
+    cache = LocalCache(max_size=10, ttl=0.05)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+
+    assert cache.get('a') is None
+    assert cache.metrics.expirations == 1
+
+
+def test_local_cache_with_no_size_stores_nothing():
+    cache = LocalCache(max_size=0, ttl=60)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+
+def test_get_event_is_cached_and_returns_a_copy():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id']})
+
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.headers['X-DB-Operations'] == '1'
+    cached = event_repository.get_event(event['id'])
+    cached.name = 'changed'
+
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.headers['X-DB-Operations'] == '0'
+    assert response.json()['name'] == 'aName'
+
+
+def test_booking_invalidates_cached_vacants_left():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id'], 'vacants': 3})
+    client.put(f"{URI}/{event['id']}/publish")
+
+    for i in range(3):
+        response = client.get(f"{URI}/{event['id']}")
+        assert response.json()['vacants_left'] == 3 - i
+        body = {"event_id": event['id'], "reserver_id": str(i)}
+        response = client.post(BOOKINGS_URI, json=body)
+        assert response.status_code == 201
+
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.json()['vacants_left'] == 0
+
+
+def test_booking_through_another_replica_is_seen_once_the_cache_expires(
+    monkeypatch,
+):
+    monkeypatch.setattr(event_cache, 'ttl', 0.05)
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id'], 'vacants': 3})
+    client.put(f"{URI}/{event['id']}/publish")
+    client.get(f"{URI}/{event['id']}")
+
+    # Booked through another replica, which can't drop the copy cached here
+    PersistentEventRepository().reserve_vacant(event['id'])
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.json()['vacants_left'] == 3
+
+    time.sleep(0.06)
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.json()['vacants_left'] == 2
+
+
+def test_read_racing_a_write_is_not_cached(monkeypatch):
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id'], 'vacants': 3})
+    client.put(f"{URI}/{event['id']}/publish")
+
+    inner = event_repository.repository
+    get_event = inner.get_event
+
+    def get_event_then_write(id):
+        stale = get_event(id)
+        event_repository.reserve_vacant(id)
+        return stale
+
+    monkeypatch.setattr(inner, 'get_event', get_event_then_write)
+    assert event_repository.get_event(event['id']).vacants_left == 3
+    monkeypatch.setattr(inner, 'get_event', get_event)
+
+    assert event_repository.get_event(event['id']).vacants_left == 2
+
+
+def test_metrics_include_event_cache():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id']})
+    event_cache.metrics.hits = 0
+    client.get(f"{URI}/{event['id']}")
+    client.get(f"{URI}/{event['id']}")
+
+    response = client.get('api/metrics')
+    assert response.status_code == 200
+    assert response.json()['event_cache']['hits'] == 1
+
+
+@pytest.fixture
+def positions(monkeypatch):
+    # Geo queries run in memory, recording the areas asked for
+    inner = event_repository.repository
+    calls = []
+
+    def search_positions(location, type):
+        calls.append((location.lat, location.lng, location.dist))
+        return [
+            EventPosition(id=event['_id'], lat=lat, lng=lng)
+            for event in db['Events'].find()
+            for lng, lat in [event['location']['coordinates']]
+            if distance(location.lat, location.lng, lat, lng) <= location.dist
+            and (type is None or event['type'] == type.value)
+        ]
+
+    monkeypatch.setattr(inner, 'search_positions', search_positions)
+    return calls
+
+
+def location(lat, lng):
+    return {'description': 'location', 'lat': lat, 'lng': lng}
+
+
+def test_tile_covers_every_point_of_the_cell():
+    cell = tile(-34.6037, -58.3816, 0.01)
+    lat, lng = tile_center(cell, 0.01)
+    radius = tile_radius(cell, 0.01)
+    for corner_lat in [cell[0] * 0.01, (cell[0] + 1) * 0.01]:
+        for corner_lng in [cell[1] * 0.01, (cell[1] + 1) * 0.01]:
+            assert distance(lat, lng, corner_lat, corner_lng) <= radius
+
+
+def test_location_search_in_same_tile_is_served_from_cache(positions):
+    near = create_event({'name': 'near', 'location': location(-34.6037, -58.3816)})
+    create_event({'name': 'far', 'location': location(-34.6037, -58.5)})
+
+    response = client.get(f"{URI}?lat=-34.6031&lng=-58.3811&dist=1000")
+    assert [e['id'] for e in response.json()] == [near['id']]
+    assert 70 < response.json()[0]['distance_meters'] < 90
+    response = client.get(f"{URI}?lat=-34.6039&lng=-58.3819&dist=1000")
+    assert [e['id'] for e in response.json()] == [near['id']]
+
+    assert len(positions) == 1
+    assert geo_cache.metrics.hits >= 1
+
+
+def test_location_search_filters_by_exact_distance(positions):
+    create_event({'name': 'edge', 'location': location(1.0, 1.0095)})
+
+    # Both points share a tile, the event is 891m and 1047m away
+    response = client.get(f"{URI}?lat=1.0005&lng=1.0015&dist=1000")
+    assert len(response.json()) == 1
+    response = client.get(f"{URI}?lat=1.0005&lng=1.0001&dist=1000")
+    assert len(response.json()) == 0
+    assert len(positions) == 1
+
+
+def test_new_event_invalidates_location_searches(positions):
+    create_event({'name': 'first', 'location': location(10.0, 10.0)})
+    response = client.get(f"{URI}?lat=10&lng=10&dist=1000")
+    assert len(response.json()) == 1
+
+    create_event({'name': 'second', 'location': location(10.001, 10.001)})
+    response = client.get(f"{URI}?lat=10&lng=10&dist=1000")
+    assert len(response.json()) == 2
+    assert len(positions) == 2
+
+
+def test_metrics_include_geo_search(positions):
+    create_event({'location': location(10.0, 10.0)})
+    client.get(f"{URI}?lat=10&lng=10&dist=1000")
+
+    response = client.get('api/metrics')
+    data = response.json()
+    assert data['geo_search']['searches'] >= 1
+    assert 0 <= data['geo_cache']['hit_rate'] <= 1
+
+
+def test_update_from_a_stale_cached_event_keeps_its_counters():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id'], 'vacants': 3})
+    client.put(f"{URI}/{event['id']}/publish")
+    client.get(f"{URI}/{event['id']}")
+
+    # Written by another replica, which can't drop the copy cached here
+    db['Events'].update_one(
+        {'_id': event['id']},
+        {'$inc': {'vacants_left': -2, 'verified_vacants': 1}},
+    )
+    response = client.put(f"{URI}/{event['id']}", json={'name': 'other', 'vacants': 4})
+    assert response.status_code == 201
+    assert response.json()['vacants_left'] == 2
+    assert response.json()['verified_vacants'] == 1
+
+    response = client.put(f"{URI}/{event['id']}/add_collaborator/email@mail.com")
+    assert response.json()['vacants_left'] == 2
+    assert response.json()['collaborators'] == [
+        {'id': organizer['id'], 'email': 'email@mail.com'}
+    ]
+
+    # Fewer vacants than the ones booked in the database
+    response = client.put(f"{URI}/{event['id']}", json={'vacants': 1})
+    assert response.status_code == 400
+
+
+def test_update_of_an_event_cancelled_by_another_replica():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'owner': organizer['id']})
+    client.get(f"{URI}/{event['id']}")
+
+    db['Events'].update_one({'_id': event['id']}, {'$set': {'state': 'Cancelado'}})
+    response = client.put(f"{URI}/{event['id']}", json={'name': 'other'})
+    assert response.status_code == 400
+    assert db['Events'].find_one({'_id': event['id']})['name'] == 'aName'
+
+
+def in_another_replica(command, id):
+    # Written without going through the cache of this replica
+    command(
+        PersistentEventRepository(), id, suggestion_repository, rollup_repository
+    ).execute()
+
+
+def test_state_transitions_from_a_stale_cached_event():
+    organizer = create_organizer({'email': 'email@mail.com', 'id': '123'})
+    event = create_event({'organizer': organizer['id']})
+    client.put(f"{URI}/{event['id']}/publish")
+
+    client.get(f"{URI}/{event['id']}")
+    in_another_replica(SuspendEventCommand, event['id'])
+    response = client.put(f"{URI}/{event['id']}/unsuspend")
+    assert response.status_code == 200
+    assert response.json()['state'] == 'Publicado'
+
+    client.get(f"{URI}/{event['id']}")
+    in_another_replica(SuspendEventCommand, event['id'])
+    response = client.put(f"{URI}/{event['id']}/suspend")
+    assert response.status_code == 400
+    response = client.put(f"{URI}/{event['id']}/publish")
+    assert response.status_code == 400
+    assert db['Events'].find_one({'_id': event['id']})['state'] == 'Suspendido'
+
+    client.get(f"{URI}/{event['id']}")
+    in_another_replica(UnSuspendEventCommand, event['id'])
+    response = client.put(f"{URI}/{event['id']}/cancel")
+    assert response.json()['state'] == 'Cancelado'
+    response = client.get(
+        'api/stats/rollups/check?start_date=2021-12-01&end_date=2022-01-31'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
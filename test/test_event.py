@@ -1,10 +1,26 @@
 from fastapi.testclient import TestClient
 from pprint import pprint
 import pytest
+from pymongo.errors import BulkWriteError
 
 from app.app import app
+from app.models.event import Event, State
+from app.repositories.event import PersistentEventRepository
+from app.repositories.monitoring import track_db_operations, total_operations
+from app.repositories.indexes import INDEXES, create_indexes
+from app.repositories.dependencies import (
+    event_repository,
+    lease_repository,
+    rollup_repository,
+)
+from app.repositories.config import db
+from app.commands.events import FinalizeEventsCommand
+from app.utils.jobs import finalize_events_scheduler
+from app.utils.scheduler import Scheduler
 from test.utils import generate_invalid, mock_date
+import asyncio
 import datetime
+import time
 
 client = TestClient(app)
 
@@ -259,7 +275,7 @@ def test_search_event_by_type():
     response = client.get(f"{URI}?type=Danza")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event1, event3]))
@@ -276,7 +292,7 @@ def test_search_event_by_organizer(monkeypatch):
     response = client.get(f"{URI}?organizer=omar")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event1, event3]))
@@ -328,7 +344,7 @@ def test_search_event_without_filters_returns_everything():
     response = client.get(f"{URI}")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 4
     assert all(map(lambda e: e['name'] in data_names, [event1, event2, event3, event4]))
@@ -344,7 +360,7 @@ def test_search_event_with_multiple_filters(monkeypatch):
     response = client.get(f"{URI}?type=Moda&organizer=omar")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 1
     assert all(map(lambda e: e['name'] in data_names, [event1]))
@@ -363,6 +379,128 @@ def test_search_event_with_limit_returns_given_amount():
     assert len(data) == 3
 
 
+def test_search_event_default_page_size():
+    for i in range(60):
+        create_event({"name": f"event {i}"})
+
+    response = client.get(URI)
+
+    assert len(response.json()) == 50
+    assert 'X-Next-Cursor' in response.headers
+
+
+def test_search_event_pages_with_cursor():
+    for i in range(23):
+        create_event({"name": f"event {i}", "vacants": i % 5 + 1})
+
+    events = []
+    cursor = None
+    while True:
+        url = f"{URI}?limit=5" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        events += response.json()
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+
+    assert len(events) == 23
+    assert len({event['id'] for event in events}) == 23
+    assert [event['vacants'] for event in events] == sorted(
+        event['vacants'] for event in events
+    )
+
+
+def test_search_event_by_organizer_pages_by_date(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 3, "day": 1, "hour": 15})
+    for day in range(10, 20):
+        create_event({"date": f"2023-03-{day}", "organizer": "omar"})
+
+    first = client.get(f"{URI}?organizer=omar&limit=4")
+    second = client.get(
+        f"{URI}?organizer=omar&limit=4&cursor={first.headers['X-Next-Cursor']}"
+    )
+
+    dates = [event['date'] for event in first.json() + second.json()]
+    assert dates == [f"2023-03-{day}" for day in range(10, 18)]
+
+
+def test_search_event_last_page_has_no_cursor():
+    for i in range(4):
+        create_event({"name": f"event {i}"})
+
+    response = client.get(f"{URI}?limit=5")
+
+    assert len(response.json()) == 4
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_search_event_summary_view(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    event = create_event()
+
+    response = client.get(f"{URI}?view=summary")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data == [
+        {
+            'id': event['id'],
+            'name': event['name'],
+            'location': event['location'],
+            'type': event['type'],
+            'preview_image': event['preview_image'],
+            'date': event['date'],
+            'start_time': event['start_time'],
+            'end_time': event['end_time'],
+            'organizer': event['organizer'],
+            'vacants': event['vacants'],
+            'vacants_left': event['vacants_left'],
+            'state': event['state'],
+        }
+    ]
+
+
+def test_search_event_summary_view_pages_with_cursor():
+    for i in range(7):
+        create_event({"name": f"event {i}"})
+
+    first = client.get(f"{URI}?view=summary&limit=4")
+    second = client.get(
+        f"{URI}?view=summary&limit=4&cursor={first.headers['X-Next-Cursor']}"
+    )
+
+    ids = [event['id'] for event in first.json() + second.json()]
+    assert len(set(ids)) == 7
+    assert 'X-Next-Cursor' not in second.headers
+
+
+def test_search_event_summary_view_finished_state(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    create_event({"date": "2023-02-01"})
+
+    response = client.get(f"{URI}?view=summary")
+
+    assert response.json()[0]['state'] == 'Finalizado'
+
+
+def test_search_event_limit_is_capped():
+    assert client.get(f"{URI}?limit=100").status_code == 200
+    response = client.get(f"{URI}?limit=101")
+    assert response.status_code == 422
+
+
+def test_search_event_invalid_view():
+    response = client.get(f"{URI}?view=compact")
+    assert response.status_code == 422
+
+
+def test_search_event_invalid_cursor():
+    response = client.get(f"{URI}?cursor=invalid")
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'invalid_cursor'
+
+
 def test_search_event_by_name():
     event1 = create_event({"name": "event"})
     event2 = create_event({"name": "the eventual"})
@@ -371,13 +509,136 @@ def test_search_event_by_name():
     response = client.get(f"{URI}?name=event")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event1, event2]))
     assert not any(map(lambda e: e['name'] in data_names, [event3]))
 
 
+def test_search_event_by_name_ignores_accents_and_case():
+    create_event({"name": "Noche de Música"})
+    create_event({"name": "Festival de Gastronomía"})
+
+    response = client.get(f"{URI}?name=MUSICA")
+    assert [e['name'] for e in response.json()] == ["Noche de Música"]
+
+    response = client.get(f"{URI}?name=gastronomía")
+    assert [e['name'] for e in response.json()] == ["Festival de Gastronomía"]
+
+
+def test_search_event_by_name_prefix():
+    create_event({"name": "Festival de Gastronomía"})
+    create_event({"name": "Gastón en vivo"})
+    create_event({"name": "Rock nacional"})
+
+    response = client.get(f"{URI}?name=gast")
+    names = sorted(e['name'] for e in response.json())
+    assert names == ["Festival de Gastronomía", "Gastón en vivo"]
+
+    response = client.get(f"{URI}?name=gastro fest")
+    assert [e['name'] for e in response.json()] == ["Festival de Gastronomía"]
+
+
+def test_search_event_by_name_matches_description():
+    create_event({"name": "Noche especial", "description": "Tango en vivo"})
+    create_event({"name": "Otra noche"})
+
+    response = client.get(f"{URI}?name=tango")
+    assert [e['name'] for e in response.json()] == ["Noche especial"]
+
+
+def test_search_event_by_name_ranks_name_matches_first():
+    create_event({"name": "Clases", "description": "Taller de tango", "vacants": 1})
+    create_event({"name": "Tangos del sur", "vacants": 2})
+    create_event({"name": "Tango", "vacants": 3})
+
+    response = client.get(f"{URI}?name=tango")
+    names = [e['name'] for e in response.json()]
+    assert names == ["Tango", "Tangos del sur", "Clases"]
+
+
+def test_search_event_by_name_ranks_across_pages():
+    create_event({"name": "Clases", "description": "Taller de tango", "vacants": 1})
+    create_event({"name": "Tangos del sur", "vacants": 2})
+    create_event({"name": "Tango", "vacants": 3})
+
+    names = []
+    cursor = None
+    for _ in range(3):
+        params = f"&cursor={cursor}" if cursor else ""
+        response = client.get(f"{URI}?name=tango&limit=1{params}")
+        names += [e['name'] for e in response.json()]
+        cursor = response.headers['X-Next-Cursor']
+    assert names == ["Tango", "Tangos del sur", "Clases"]
+
+
+def test_search_event_by_name_with_explicit_sort_keeps_it():
+    create_event({"name": "Clases", "description": "Taller de tango", "vacants": 1})
+    create_event({"name": "Tango", "vacants": 3})
+
+    response = client.get(f"{URI}?name=tango&sort=vacants")
+    names = [e['name'] for e in response.json()]
+    assert names == ["Clases", "Tango"]
+
+
+def test_search_event_sorted_by_date_pages_with_cursor():
+    for day in range(10, 20):
+        create_event({"date": f"2030-03-{day}", "vacants": 30 - day})
+
+    first = client.get(f"{URI}?sort=date&limit=4")
+    second = client.get(
+        f"{URI}?sort=date&limit=4&cursor={first.headers['X-Next-Cursor']}"
+    )
+
+    dates = [event['date'] for event in first.json() + second.json()]
+    assert dates == [f"2030-03-{day}" for day in range(10, 18)]
+
+
+def test_search_event_sorted_by_distance_returns_distance():
+    near = create_event(
+        {"location": {'description': 'location', 'lat': 24.0, 'lng': 24.0}}
+    )
+    far = create_event(
+        {"location": {'description': 'location', 'lat': 24.0, 'lng': 23.0}}
+    )
+
+    response = client.get(f"{URI}?lat=24&lng=23.9&dist=200000&sort=distance")
+    data = response.json()
+
+    assert [e['id'] for e in data] == [near['id'], far['id']]
+    assert data[0]['distance_meters'] < data[1]['distance_meters']
+
+
+def test_search_event_sorted_by_distance_without_location():
+    response = client.get(f"{URI}?sort=distance")
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'distance_sort_without_location'
+
+
+def test_search_event_invalid_sort():
+    response = client.get(f"{URI}?sort=name")
+    assert response.status_code == 422
+
+
+def test_search_event_by_name_with_special_characters():
+    create_event({"name": "event"})
+
+    response = client.get(f"{URI}?name=(event*")
+    assert response.status_code == 200
+    assert [e['name'] for e in response.json()] == ["event"]
+
+
+def test_add_missing_search_tokens_to_legacy_events():
+    for _ in range(3):
+        create_event({"name": "Noche de Música"})
+    db['Events'].update_many({}, {'$unset': {'search_tokens': '', 'name_tokens': ''}})
+
+    assert client.get(f"{URI}?name=musica").json() == []
+    assert event_repository.add_missing_search_tokens(batch_size=2) == 3
+    assert len(client.get(f"{URI}?name=musica").json()) == 3
+
+
 def test_event_create_with_empty_faq():
     body = create_event({"FAQ": []})
     response = client.post(URI, json=body)
@@ -566,7 +827,7 @@ def test_search_event_only_pusblished():
     response = client.get(f"{URI}?only_published=True")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event1, event2]))
@@ -584,7 +845,7 @@ def test_search_event_published_false():
     response = client.get(f"{URI}?only_published=False")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 3
     assert all(map(lambda e: e['name'] in data_names, [event1, event2, event3]))
@@ -612,7 +873,7 @@ def test_search_events_not_finished(monkeypatch):
     response = client.get(f"{URI}?not_finished=True")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -628,7 +889,7 @@ def test_search_events_not_finished_false(monkeypatch):
     response = client.get(f"{URI}?not_finished=False")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 3
     assert all(map(lambda e: e['name'] in data_names, [event1, event2, event3]))
@@ -643,7 +904,7 @@ def test_search_events_not_finished_2(monkeypatch):
     response = client.get(f"{URI}?not_finished=True")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -659,7 +920,7 @@ def test_search_events_not_finished_3(monkeypatch):
     response = client.get(f"{URI}?not_finished=True")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -707,7 +968,7 @@ def test_search_events_not_finished_with_time(monkeypatch):
     response = client.get(f"{URI}?not_finished=True")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -913,7 +1174,7 @@ def test_event_update_terminado(monkeypatch):
 
     body = create_event_body({"date": "2022-02-02"})
     event = client.post(URI, json=body).json()
-    client.get(URI)
+    FinalizeEventsCommand(event_repository, rollup_repository).execute()
     id = event["id"]
 
     new_body = create_updated_body({"date": "2022-02-01"})
@@ -1292,6 +1553,73 @@ def test_unsuspend_organizer_event_cancelado(monkeypatch):
     assert data['state'] == 'Cancelado'
 
 
+def test_organizer_suspension_db_operations_do_not_grow_with_events(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    operations = []
+    for count in [2, 6]:
+        organizer = create_organizer_body(
+            {'id': f'organizer{count}', 'email': f'organizer{count}@mail.com'}
+        )
+        organizer = client.post(ORGANIZER_URI, json=organizer).json()
+        events = [
+            create_event({"organizer": organizer['id'], "date": "2024-02-01"})
+            for _ in range(count)
+        ]
+        for event in events:
+            client.put(f"{URI}/{event['id']}/publish")
+
+        suspend = client.put(f"{ORGANIZER_URI}/{organizer['id']}/suspend")
+        states = {client.get(f"{URI}/{e['id']}").json()['state'] for e in events}
+        assert states == {'Suspendido'}
+        unsuspend = client.put(f"{ORGANIZER_URI}/{organizer['id']}/unsuspend")
+        states = {client.get(f"{URI}/{e['id']}").json()['state'] for e in events}
+        assert states == {'Publicado'}
+        operations.append(
+            (
+                suspend.headers['X-DB-Operations'],
+                unsuspend.headers['X-DB-Operations'],
+            )
+        )
+
+    assert operations[0] == operations[1]
+    response = client.get(
+        'api/stats/rollups/check?start_date=2023-02-01&end_date=2023-02-28'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
+def test_organizer_suspension_counts_only_the_events_it_changes(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    organizer = client.post(ORGANIZER_URI, json=create_organizer_body()).json()
+    events = [
+        create_event({"organizer": organizer['id'], "date": "2024-02-01"})
+        for _ in range(4)
+    ]
+    for event in events[:3]:
+        client.put(f"{URI}/{event['id']}/publish")
+    client.put(f"{URI}/{events[0]['id']}/cancel")
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 5, "hour": 15})
+    client.put(f"{URI}/{events[1]['id']}/suspend")
+    client.put(f"{URI}/{events[1]['id']}/unsuspend")
+
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 9, "hour": 15})
+    client.put(f"{ORGANIZER_URI}/{organizer['id']}/suspend")
+    states = [client.get(f"{URI}/{e['id']}").json()['state'] for e in events]
+    assert states == ['Cancelado', 'Suspendido', 'Suspendido', 'Borrador']
+    response = client.get(
+        'api/stats/rollups/check?start_date=2023-02-01&end_date=2023-02-28'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+    client.put(f"{ORGANIZER_URI}/{organizer['id']}/unsuspend")
+    states = [client.get(f"{URI}/{e['id']}").json()['state'] for e in events]
+    assert states == ['Cancelado', 'Publicado', 'Publicado', 'Borrador']
+    response = client.get(
+        'api/stats/rollups/check?start_date=2023-02-01&end_date=2023-02-28'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
 def test_unsuspend_organizer_event_terminado(monkeypatch):
     mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
     organizer = create_organizer_body()
@@ -1463,7 +1791,7 @@ def test_search_event_collaborator(monkeypatch):
     response = client.get(f"{URI}?organizer=1234")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -1524,7 +1852,7 @@ def test_search_event_collaborator_two_has_events(monkeypatch):
 
     response = client.get(f"{URI}?organizer=1234")
     data = response.json()
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event2, event3]))
@@ -1546,7 +1874,7 @@ def test_search_event_collaborator_has_events_and_is_organizer(monkeypatch):
 
     response = client.get(f"{URI}?organizer=1234")
     data = response.json()
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 3
     assert all(map(lambda e: e['name'] in data_names, [event1, event2, event3]))
@@ -1587,7 +1915,7 @@ def test_search_event_by_organizer_4_days_ago(monkeypatch):
     response = client.get(f"{URI}?organizer=omar")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 1
     assert all(map(lambda e: e['name'] in data_names, [event3]))
@@ -1646,7 +1974,7 @@ def test_search_event_by_organizer_is_ordered_by_hour(monkeypatch):
     response = client.get(f"{URI}?organizer=omar")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event3, event1]))
@@ -1671,7 +1999,7 @@ def test_search_event_by_organizer_is_ordered_by_date(monkeypatch):
     response = client.get(f"{URI}?organizer=omar")
     data = response.json()
 
-    data_names = map(lambda e: e['name'], data)
+    data_names = list(map(lambda e: e['name'], data))
 
     assert len(data) == 2
     assert all(map(lambda e: e['name'] in data_names, [event3, event1]))
@@ -1719,6 +2047,99 @@ def test_create_event_with_agenda_not_ending():
     assert data['detail'] == 'agenda_can_not_end_before_event_ends'
 
 
+def test_create_events_in_bulk_reports_each_item(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    bodies = [
+        create_event_body({'name': 'first'}),
+        create_event_body({"start_time": "14:00:00", "end_time": "10:00:00"}),
+        create_event_body({'images': [f'image{i}' for i in range(10)]}),
+        create_event_body({'scan_time': 20}),
+        create_event_body({'name': 'second'}),
+    ]
+    response = client.post(f"{URI}/bulk", json=bodies)
+    assert response.status_code == 200
+    assert response.headers['X-DB-Operations'] == '2'
+    results = response.json()
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert [result['status'] for result in results] == [201, 400, 400, 422, 201]
+    assert results[1]['detail'] == 'end_time_must_be_greater_than_start_time'
+    assert results[2]['detail'] == 'max_number_of_images_is_10'
+    assert results[3]['detail'][0]['loc'] == ['scan_time']
+
+    for result, name in [(results[0], 'first'), (results[4], 'second')]:
+        response = client.get(f"{URI}/{result['id']}")
+        assert response.json()['name'] == name
+        assert response.json()['state'] == 'Borrador'
+    response = client.get(
+        'api/stats/rollups/check?start_date=2023-02-01&end_date=2023-02-28'
+    )
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
+def test_create_events_in_bulk_with_an_existing_event(monkeypatch):
+    inner = event_repository.repository
+    bodies = [create_event_body({'name': f'event{i}'}) for i in range(3)]
+    response = client.post(f"{URI}/bulk", json=bodies[:1])
+    existing = response.json()[0]['id']
+    # The second event gets the id of an existing one, so its insert fails
+    new_event = Event.new
+    ids = iter(['id1', existing, 'id3', 'id4', existing, 'id6'])
+
+    def new_event_with_id(**fields):
+        event = new_event(**fields)
+        event.id = next(ids)
+        return event
+
+    monkeypatch.setattr(Event, 'new', new_event_with_id)
+
+    response = client.post(f"{URI}/bulk", json=bodies)
+    statuses = [result['status'] for result in response.json()]
+    assert statuses == [201, 400, 201]
+    assert response.json()[1]['detail'] == 'event_already_exists'
+    response = client.post(f"{URI}/bulk?ordered=true", json=bodies)
+    results = response.json()
+    assert [result['status'] for result in results] == [201, 400, 424]
+    assert results[2]['detail'] == 'event_skipped_after_failure'
+    assert inner.event_exists('id4')
+    assert not inner.event_exists('id6')
+
+
+def test_create_events_in_bulk_with_a_failed_insert(monkeypatch):
+    inner = event_repository.repository
+    bodies = [create_event_body({'name': f'event{i}'}) for i in range(3)]
+    insert_many = inner.events.insert_many
+
+    def insert_failing_the_second(documents, ordered):
+        insert_many([documents[0], documents[2]], ordered=ordered)
+        error = {'index': 1, 'code': 121, 'errmsg': 'Document failed validation'}
+        raise BulkWriteError({'writeErrors': [error], 'nInserted': 2})
+
+    monkeypatch.setattr(inner.events, 'insert_many', insert_failing_the_second)
+
+    response = client.post(f"{URI}/bulk", json=bodies)
+    results = response.json()
+    assert [result['status'] for result in results] == [201, 500, 201]
+    assert results[1]['detail'] == 'event_not_inserted'
+
+    def insert_failing_the_first(documents, ordered):
+        error = {'index': 0, 'code': 121, 'errmsg': 'Document failed validation'}
+        raise BulkWriteError({'writeErrors': [error], 'nInserted': 0})
+
+    monkeypatch.setattr(inner.events, 'insert_many', insert_failing_the_first)
+    response = client.post(f"{URI}/bulk?ordered=true", json=bodies)
+    results = response.json()
+    assert [result['status'] for result in results] == [500, 424, 424]
+    assert results[0]['detail'] == 'event_not_inserted'
+
+
+def test_create_events_in_bulk_limits_the_batch(monkeypatch):
+    monkeypatch.setattr('app.controllers.events.views.BULK_EVENTS_LIMIT', 2)
+    bodies = [create_event_body() for _ in range(3)]
+    response = client.post(f"{URI}/bulk", json=bodies)
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'too_many_events'
+
+
 def update_event_time_error(monkeypatch):
     mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
 
@@ -2024,3 +2445,209 @@ def test_publish_event_date(monkeypatch):
     assert response.status_code == 200
     assert data['state'] == 'Publicado'
     assert data['published_at'] == '2023-02-02'
+
+
+def test_event_field_updates_write_only_the_changed_field():
+    event = create_event(
+        {
+            'images': [f'image{i}' for i in range(9)],
+            'FAQ': [
+                {'question': f'question {i}?', 'answer': f'answer number {i}'}
+                for i in range(10)
+            ],
+        }
+    )
+    repository = PersistentEventRepository()
+    updates = [
+        ('state', State.Publicado, repository.update_state_event),
+        ('vacants_left', 2, repository.update_vacants_left_event),
+        ('verified_vacants', 1, repository.update_verified_vacants),
+        ('suspended_at', '2023-02-03', repository.update_suspended_at),
+        ('published_at', '2023-02-02', repository.update_published_at),
+    ]
+
+    for field, value, update in updates:
+        # Previous implementation: read the event and rewrite the whole document
+        with track_db_operations() as full_rewrite:
+            data = repository.events.find_one({'_id': event['id']})
+            data[field] = value.value if isinstance(value, State) else value
+            repository.events.update_one({'_id': event['id']}, {'$set': data})
+
+        with track_db_operations() as partial_update:
+            updated = update(event['id'], value)
+
+        assert full_rewrite.calls == 2
+        assert partial_update.calls == 1
+        assert partial_update.bytes_sent * 3 < full_rewrite.bytes_sent
+        assert getattr(updated, field) == value
+
+
+def test_event_endpoints_db_operations(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    client.post(ORGANIZER_URI, json=create_organizer_body())
+    event = create_event()
+    id = event['id']
+
+    response = client.get(f"{URI}/{id}")
+    assert response.headers['X-DB-Operations'] == '1'
+    response = client.get(f"{URI}/{id}")
+    assert response.headers['X-DB-Operations'] == '0'
+    # State changes also update the stats rollups
+    response = client.put(f"{URI}/{id}/publish")
+    assert response.headers['X-DB-Operations'] == '3'
+    response = client.put(f"{URI}/{id}/suspend")
+    assert response.headers['X-DB-Operations'] == '3'
+    response = client.put(f"{URI}/{id}/unsuspend")
+    assert response.headers['X-DB-Operations'] == '2'
+    response = client.put(f"{URI}/{id}/add_collaborator/email@mail.com")
+    assert response.headers['X-DB-Operations'] == '3'
+    response = client.put(f"{URI}/{id}/cancel")
+    assert response.headers['X-DB-Operations'] == '2'
+
+    response = client.get(f"{URI}/notexists")
+    assert response.status_code == 404
+    assert response.headers['X-DB-Operations'] == '1'
+
+
+def test_requests_do_not_create_indexes(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    client.post(ORGANIZER_URI, json=create_organizer_body())
+    event = create_event()
+    client.put(f"{URI}/{event['id']}/publish")
+    created_indexes = total_operations.commands.get('createIndexes', 0)
+
+    for i in range(250):
+        client.get(f"{URI}/{event['id']}")
+        client.get(URI)
+        client.post(BOOKING_URI, json={'event_id': event['id'], 'reserver_id': str(i)})
+        client.get(f"{ORGANIZER_URI}/123")
+
+    assert total_operations.commands.get('createIndexes', 0) == created_indexes
+
+    create_indexes()
+    number_of_indexes = sum(len(indexes) for indexes in INDEXES.values())
+    assert (
+        total_operations.commands['createIndexes']
+        == created_indexes + number_of_indexes
+    )
+
+
+def test_search_does_not_write_expired_events(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+
+    for expired_events in [0, 1, 100]:
+        for _ in range(expired_events - len(client.get(f"{URI}?limit=100").json())):
+            create_event({"date": "2023-02-01"})
+        response = client.get(f"{URI}?limit=100")
+        data = response.json()
+        assert len(data) == expired_events
+        assert all(event['state'] == 'Finalizado' for event in data)
+        assert response.headers['X-DB-Operations'] == '1'
+
+
+def test_get_expired_event_is_finalized_by_background_job(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    event = create_event({"date": "2023-02-01"})
+    client.put(f"{URI}/{event['id']}/publish")
+
+    response = client.get(f"{URI}/{event['id']}")
+    assert response.json()['state'] == 'Finalizado'
+    assert event_repository.get_event(event['id']).state == State.Publicado
+
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 1
+    assert event_repository.get_event(event['id']).state == State.Finalizado
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 0
+
+
+def test_scheduler_finalizes_events_on_startup(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    event = create_event({"date": "2023-02-01"})
+
+    with TestClient(app):
+        for _ in range(50):
+            if event_repository.get_event(event['id']).state == State.Finalizado:
+                break
+            time.sleep(0.05)
+
+    assert event_repository.get_event(event['id']).state == State.Finalizado
+
+
+def test_finalize_events_only_touches_newly_expired_events(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 10})
+    for _ in range(20):
+        create_event({"date": "2023-02-01"})
+    create_event({"date": "2023-02-02"})
+    create_event({"date": "2023-02-03"})
+
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 20
+    pending = db['Events'].count_documents({'next_transition_at': {'$exists': True}})
+    assert pending == 2
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 0
+
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 13})
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 1
+
+
+def test_add_missing_transitions_to_legacy_events(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    event = create_event({"date": "2023-02-01"})
+    db['Events'].update_many({}, {'$unset': {'next_transition_at': ''}})
+
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 0
+    assert event_repository.add_missing_transitions(batch_size=2) == 1
+    assert FinalizeEventsCommand(event_repository, rollup_repository).execute() == 1
+    assert event_repository.get_event(event['id']).state == State.Finalizado
+
+
+def test_only_one_scheduler_holds_the_lease(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    create_event({"date": "2023-02-01"})
+    leader = Scheduler(
+        'job',
+        60,
+        lambda: FinalizeEventsCommand(event_repository, rollup_repository),
+        lease_repository,
+    )
+    replica = Scheduler(
+        'job',
+        60,
+        lambda: FinalizeEventsCommand(event_repository, rollup_repository),
+        lease_repository,
+    )
+
+    async def tick_both():
+        for _ in range(3):
+            await leader.tick()
+            await replica.tick()
+
+    asyncio.run(tick_both())
+
+    assert leader.metrics.is_leader
+    assert leader.metrics.ticks == 3
+    assert leader.metrics.total_processed == 1
+    assert not replica.metrics.is_leader
+    assert replica.metrics.ticks == 0
+    assert replica.metrics.skipped_ticks == 3
+
+
+def test_lease_is_taken_over_when_expired():
+    assert lease_repository.acquire('job', 'first', 60)
+    assert not lease_repository.acquire('job', 'second', 60)
+    assert lease_repository.acquire('job', 'first', 0)
+    time.sleep(0.01)
+    assert lease_repository.acquire('job', 'second', 60)
+    assert not lease_repository.acquire('job', 'first', 60)
+
+
+def test_scheduler_metrics_are_exposed(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    create_event({"date": "2023-02-01"})
+    create_event({"date": "2023-02-01"})
+    asyncio.run(finalize_events_scheduler.tick())
+
+    response = client.get("api/metrics")
+    assert response.status_code == 200
+    metrics = response.json()['finalize_events']
+    assert metrics['is_leader']
+    assert metrics['last_processed'] == 2
+    assert metrics['last_tick_duration'] > 0
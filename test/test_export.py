@@ -0,0 +1,242 @@
+from fastapi.testclient import TestClient
+import csv
+import io
+import json
+import tracemalloc
+import pytest
+
+from app.app import app
+from app.commands.export import ExportBookingsCommand
+from app.repositories.config import db
+from app.repositories.dependencies import booking_repository
+from app.schemas.bookings import BookingSchema
+from app.schemas.export import ExportFormat
+from app.utils.export import export
+
+client = TestClient(app)
+
+URI = 'api/export'
+EXPORTED_BOOKINGS = 1_000
+CHUNK_SIZE = 4 * 1024
+
+
+def create_user(fields={}):
+    body = {
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email@mail.com',
+        'identification_number': '40400400',
+        'phone_number': '1180808080',
+        "birth_date": "1990-01-01",
+        "id": "784578",
+    }
+
+    for k, v in fields.items():
+        body[k] = v
+
+    response = client.post("api/users", json=body)
+    return response.json()
+
+
+def create_organizer(fields={}):
+    body = {
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email@mail.com',
+        'profession': 'profession',
+        'about_me': 'about_me',
+        'profile_picture': 'profile_picture',
+        'id': '123',
+    }
+
+    for k, v in fields.items():
+        body[k] = v
+
+    response = client.post("api/organizers", json=body)
+    return response.json()
+
+
+def create_event(fields={}):
+    body = {
+        'name': 'aName',
+        'description': 'aDescription',
+        'location': {
+            'description': 'a location description',
+            'lat': 23.4,
+            'lng': 32.23,
+        },
+        'type': 'Danza',
+        'images': ['image1', 'image2', 'image3'],
+        'preview_image': 'preview_image',
+        'date': '2023-03-29',
+        'start_time': '09:00:00',
+        'end_time': '12:00:00',
+        'scan_time': 10,
+        'organizer': 'anOwner',
+        'agenda': [
+            {
+                'time_init': '09:00',
+                'time_end': '12:00',
+                'owner': 'Pepe Cibrian',
+                'title': 'Noche de teatro en Bs As',
+                'description': 'Una noche de teatro unica',
+            }
+        ],
+        'vacants': 3,
+        'FAQ': [],
+    }
+
+    for k, v in fields.items():
+        body[k] = v
+
+    response = client.post("api/events", json=body)
+    return response.json()
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture(autouse=True)
+def clear_db():
+    # This runs before each test
+
+    yield
+
+    # Ant this runs after each test
+    client.post('api/reset')
+
+
+def test_export_events_as_ndjson():
+    events = [create_event({'name': f'event{i}'}) for i in range(3)]
+
+    response = client.get(f"{URI}/events")
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert 'events.ndjson' in response.headers['content-disposition']
+    exported = sorted(ndjson(response), key=lambda event: event['name'])
+    assert exported == events
+
+
+def test_export_events_as_csv():
+    event = create_event()
+
+    response = client.get(f"{URI}/events?format=csv")
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]['id'] == event['id']
+    assert rows[0]['vacants'] == '3'
+    assert json.loads(rows[0]['agenda']) == event['agenda']
+    assert json.loads(rows[0]['location']) == event['location']
+
+
+def test_export_bookings_of_an_event():
+    organizer = create_organizer()
+    events = [
+        create_event({'organizer': organizer['id'], 'date': '2030-03-29'})
+        for _ in range(2)
+    ]
+    for event in events:
+        client.put(f"api/events/{event['id']}/publish")
+    bookings = [
+        client.post(
+            'api/bookings', json={'event_id': event['id'], 'reserver_id': reserver}
+        ).json()
+        for event in events
+        for reserver in ['1', '2']
+    ]
+
+    response = client.get(f"{URI}/bookings?event_id={events[0]['id']}")
+    exported = sorted(ndjson(response), key=lambda booking: booking['reserver_id'])
+    assert exported == bookings[:2]
+    response = client.get(f"{URI}/bookings")
+    assert len(ndjson(response)) == 4
+    response = client.get(f"{URI}/bookings?event_id=unknown")
+    assert response.text == ''
+
+
+def test_export_complaints_as_csv():
+    organizer = create_organizer()
+    complainer = create_user({'email': 'complainer@mail.com', 'id': '234'})
+    event = create_event({'organizer': organizer['id']})
+    complaint = client.post(
+        'api/complaints',
+        json={
+            "event_id": event['id'],
+            "complainer_id": complainer['id'],
+            "type": "Spam",
+            "description": "a description",
+        },
+    ).json()
+
+    response = client.get(f"{URI}/complaints?format=csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows == [{key: str(value) for key, value in complaint.items()}]
+
+
+def test_export_with_invalid_format():
+    response = client.get(f"{URI}/events?format=xml")
+    assert response.status_code == 422
+
+
+def test_export_streams_bookings_as_they_are_read(monkeypatch):
+    db['Bookings'].insert_many(
+        [
+            {
+                '_id': f'booking-{i}',
+                'event_id': f'event-{i % 10}',
+                'reserver_id': f'reserver-{i}',
+                'verified': False,
+                'verified_time': None,
+            }
+            for i in range(EXPORTED_BOOKINGS)
+        ]
+    )
+    read = []
+    iterate_bookings = booking_repository.iterate_bookings
+
+    def iterate_counting(event_id, batch_size):
+        for booking in iterate_bookings(event_id, batch_size):
+            read.append(booking.id)
+            yield booking
+
+    monkeypatch.setattr(booking_repository, 'iterate_bookings', iterate_counting)
+    monkeypatch.setattr('app.utils.export.CHUNK_SIZE', CHUNK_SIZE)
+    command = ExportBookingsCommand(booking_repository, None, ExportFormat.ndjson, 100)
+    chunks = command.execute()
+
+    first = next(chunks)
+    assert len(read) < EXPORTED_BOOKINGS / 10
+    sizes = [len(first)] + [len(chunk) for chunk in chunks]
+    assert len(read) == EXPORTED_BOOKINGS
+    assert max(sizes) < CHUNK_SIZE + 1024
+
+
+def test_export_memory_does_not_grow_with_rows(monkeypatch):
+    # Small chunks, so both exports go well past the first one
+    monkeypatch.setattr('app.utils.export.CHUNK_SIZE', CHUNK_SIZE)
+
+    def bookings(amount: int):
+        for i in range(amount):
+            yield BookingSchema(
+                id=f'booking-{i}',
+                event_id='event',
+                reserver_id=f'reserver-{i}',
+                verified=False,
+                verified_time='Not_verified',
+            )
+
+    peaks = []
+    for amount in [1_000, 10_000]:
+        tracemalloc.start()
+        size = sum(
+            len(chunk)
+            for chunk in export(bookings(amount), BookingSchema, ExportFormat.csv)
+        )
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert size > amount * 50
+
+    assert peaks[1] < 1.5 * peaks[0]
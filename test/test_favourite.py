@@ -141,6 +141,37 @@ def test_user_with_one_favourite(monkeypatch):
     assert data == [event]
 
 
+def test_user_favourites_summary_view(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 3, "hour": 17})
+    user_id = create_user()['id']
+    event = create_event({'date': '2023-03-29'})
+    client.post(favourites_uri(user_id), json={'event_id': event['id']})
+
+    response = client.get(f"{favourites_uri(user_id)}?view=summary")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data == [
+        {
+            field: event[field]
+            for field in [
+                'id',
+                'name',
+                'location',
+                'type',
+                'preview_image',
+                'date',
+                'start_time',
+                'end_time',
+                'organizer',
+                'vacants',
+                'vacants_left',
+                'state',
+            ]
+        }
+    ]
+
+
 def test_user_with_multiple_favourites(monkeypatch):
     mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 3, "hour": 17})
     # Create user
@@ -0,0 +1,238 @@
+from fastapi.testclient import TestClient
+from datetime import date, datetime
+import pytest
+from test.utils import mock_date, profile_queries
+
+from app.app import app
+from app.models.event import State, Type
+from app.repositories.config import db
+from app.repositories.complaints import Filter
+from app.repositories.event import Search, SearchLocation
+from app.repositories.indexes import INDEXES, check_indexes
+from app.utils.now import getNow
+from app.repositories.dependencies import (
+    event_repository,
+    booking_repository,
+    complaint_repository,
+    organizer_repository,
+    user_repository,
+)
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_db():
+    # This runs before each test
+
+    yield
+
+    # Ant this runs after each test
+    client.post('api/reset')
+
+
+def assert_uses_indexes(queries):
+    for name, query in queries.items():
+        with profile_queries(db) as plans:
+            query()
+        assert plans, name
+        assert all('COLLSCAN' not in plan for plan in plans), (name, plans)
+
+
+def test_all_indexes_are_created():
+    for report in check_indexes():
+        assert report.missing == []
+        assert report.extra == []
+
+
+def test_indexes_are_created_on_startup(monkeypatch):
+    monkeypatch.setattr('app.app.schedulers', [])
+    for collection in INDEXES:
+        db[collection].drop_indexes()
+
+    with TestClient(app):
+        pass
+
+    for report in check_indexes():
+        assert report.missing == []
+
+
+def test_check_indexes_reports_missing_and_extra_indexes():
+    db['Users'].drop_index(INDEXES['Users'][0].document['name'])
+    db['Users'].create_index('first_name')
+
+    reports = {report.collection: report for report in check_indexes()}
+
+    assert reports['Users'].missing == [INDEXES['Users'][0].document['name']]
+    assert reports['Users'].extra == ['first_name_1']
+    assert reports['Events'].missing == []
+    assert reports['Events'].extra == []
+
+
+def test_event_queries_use_indexes(monkeypatch):
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+    search = Search(
+        organizer='123',
+        type=Type.Danza,
+        location=None,
+        limit=10,
+        name=None,
+        only_published=True,
+        not_finished=True,
+    )
+    name_search = Search(
+        organizer=None,
+        type=None,
+        location=None,
+        limit=10,
+        name='musica',
+        only_published=False,
+        not_finished=False,
+    )
+    location_search = Search(
+        organizer=None,
+        type=None,
+        location=SearchLocation(lat=23.4, lng=32.23, dist=5000),
+        limit=10,
+        name=None,
+        only_published=False,
+        not_finished=False,
+    )
+
+    assert_uses_indexes(
+        {
+            'event_exists': lambda: event_repository.event_exists('1'),
+            'search_events': lambda: event_repository.search_events(search),
+            'search_events_name': lambda: event_repository.search_events(name_search),
+            'search_event_summaries': (
+                lambda: event_repository.search_event_summaries(search)
+            ),
+            'search_events_location': lambda: event_repository.search_events(
+                location_search
+            ),
+            'search_positions': lambda: event_repository.search_positions(
+                location_search.location, None
+            ),
+            'get_events_by_id': lambda: event_repository.get_events_by_id(['1']),
+            'get_events_by_id_with_date_filter': (
+                lambda: event_repository.get_events_by_id_with_date_filter(['1'])
+            ),
+            'reserve_vacant': lambda: event_repository.reserve_vacant('1'),
+            'get_expired_events_stat': lambda: event_repository.get_expired_events_stat(
+                getNow()
+            ),
+            'update_state_all_events': lambda: event_repository.update_state_all_events(
+                getNow()
+            ),
+            'get_event_states_stat': lambda: event_repository.get_event_states_stat(
+                '2023-01-01', '2023-03-01'
+            ),
+            'get_top_organizers_stat': (
+                lambda: event_repository.get_top_organizers_stat(
+                    '2023-01-01', '2023-03-01'
+                )
+            ),
+            'get_events_by_time': lambda: event_repository.get_events_by_time(
+                '2023-01-01', '2023-03-01'
+            ),
+            'get_events_published_by_time': (
+                lambda: event_repository.get_events_published_by_time(
+                    '2023-01-01', '2023-03-01'
+                )
+            ),
+            'get_suspended_by_time': lambda: event_repository.get_suspended_by_time(
+                '2023-01-01', '2023-03-01'
+            ),
+            'get_event_stats': lambda: event_repository.get_event_stats(
+                '2023-01-01', '2023-03-01'
+            ),
+            'update_organizer_events_state': (
+                lambda: event_repository.update_organizer_events_state(
+                    '1', State.Publicado, State.Suspendido, '2023-01-01'
+                )
+            ),
+        }
+    )
+
+
+def test_booking_queries_use_indexes():
+    assert_uses_indexes(
+        {
+            'booking_exists': lambda: booking_repository.booking_exists('1', '2'),
+            'get_bookings_by_reserver': (
+                lambda: booking_repository.get_bookings_by_reserver('2')
+            ),
+            'get_bookings_by_event': lambda: booking_repository.get_bookings_by_event(
+                '1'
+            ),
+            'get_bookings_by_event_since': (
+                lambda: booking_repository.get_bookings_by_event(
+                    '1', datetime(2023, 1, 1)
+                )
+            ),
+            'get_bookings_by_event_verified': (
+                lambda: booking_repository.get_bookings_by_event_verified('1')
+            ),
+            'iterate_bookings': (
+                lambda: list(booking_repository.iterate_bookings('1', 1000))
+            ),
+            'get_bookings': lambda: booking_repository.get_bookings(['1']),
+            'check_in': lambda: booking_repository.check_in(
+                '1', '1', '2023-01-01 10:00'
+            ),
+            'get_bookings_by_hour': lambda: booking_repository.get_bookings_by_hour(
+                '1'
+            ),
+            'get_verified_bookings_stat': (
+                lambda: booking_repository.get_verified_bookings_stat(
+                    '2023-01-01', '2023-03-01', 'day'
+                )
+            ),
+        }
+    )
+
+
+def test_complaint_queries_use_indexes():
+    filter = Filter(start=date(2023, 1, 1), end=date(2023, 3, 1))
+    no_filter = Filter(start=None, end=None)
+
+    assert_uses_indexes(
+        {
+            'complaint_exists': lambda: complaint_repository.complaint_exists('1', '2'),
+            'get_complaints_by_organizer': (
+                lambda: complaint_repository.get_complaints_by_organizer('1', no_filter)
+            ),
+            'get_complaints_by_event': (
+                lambda: complaint_repository.get_complaints_by_event('1', no_filter)
+            ),
+            'get_complaints_ranking_by_organizer': (
+                lambda: complaint_repository.get_complaints_ranking_by_organizer(filter)
+            ),
+            'get_complaints_ranking_by_event': (
+                lambda: complaint_repository.get_complaints_ranking_by_event(filter)
+            ),
+            'get_complaints_by_time': (
+                lambda: complaint_repository.get_complaints_by_time(
+                    '2023-01-01', '2023-03-01'
+                )
+            ),
+        }
+    )
+
+
+def test_user_and_organizer_queries_use_indexes():
+    assert_uses_indexes(
+        {
+            'organizer_exists': lambda: organizer_repository.organizer_exists('1'),
+            'organizer_exists_by_email': (
+                lambda: organizer_repository.organizer_exists_by_email('a@mail.com')
+            ),
+            'get_organizer_names': (
+                lambda: organizer_repository.get_organizer_names(['1', '2'])
+            ),
+            'user_exists': lambda: user_repository.user_exists('1'),
+            'user_exists_by_email': (
+                lambda: user_repository.user_exists_by_email('a@mail.com')
+            ),
+        }
+    )
@@ -199,3 +199,16 @@ def test_unsuspend_non_existing_organizer():
     assert response.status_code == 400
     data = response.json()
     assert data["detail"] == "organizer_not_found"
+
+
+def test_get_organizer_does_a_single_db_operation():
+    body = create_organizer_body()
+    client.post(URI, json=body)
+
+    response = client.get(URI + f"/{body['id']}")
+    assert response.status_code == 200
+    assert response.headers['X-DB-Operations'] == '1'
+
+    response = client.get(URI + "/notexists")
+    assert response.status_code == 404
+    assert response.headers['X-DB-Operations'] == '1'
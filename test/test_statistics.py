@@ -1,8 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient
+import datetime
 import pytest
+import time
 from test.utils import generate_invalid, mock_date
 
 from app.app import app
+from app.commands.events import FinalizeEventsCommand
+from app.repositories.config import db
+from app.repositories.dates import to_local
+from app.repositories.bookings import PersistentBookingRepository
+from app.repositories.complaints import PersistentComplaintRepository
+from app.repositories.event import FACET, PersistentEventRepository
+from app.repositories.rollups import PersistentStatsRollupRepository
+from app.repositories.dependencies import event_repository, rollup_repository
+from app.utils.migrations import migrate, migrate_dates
 
 client = TestClient(app)
 
@@ -141,6 +153,7 @@ def test_stat_event_state(monkeypatch):
     client.put(f'api/events/{event_suspendido["id"]}/suspend')
 
     mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 8, 'hour': 16})
+    FinalizeEventsCommand(event_repository, rollup_repository).execute()
 
     response = client.get(URI + '?start_date=2022-05-05&end_date=2022-05-07')
     assert response.status_code == 200
@@ -195,6 +208,7 @@ def test_stat_event_state_with_some_0(monkeypatch):
     client.put(f'api/events/{event_suspendido["id"]}/suspend')
 
     mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 8, 'hour': 16})
+    FinalizeEventsCommand(event_repository, rollup_repository).execute()
 
     response = client.get(URI + '?start_date=2022-05-05&end_date=2022-05-07')
     assert response.status_code == 200
@@ -253,6 +267,7 @@ def test_stat_event_state_diferrent_dates(monkeypatch):
     client.put(f'api/events/{event_suspendido["id"]}/suspend')
 
     mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 8, 'hour': 16})
+    FinalizeEventsCommand(event_repository, rollup_repository).execute()
 
     response = client.get(URI + '?start_date=2022-05-05&end_date=2022-05-07')
     assert response.status_code == 200
@@ -950,3 +965,349 @@ def test_events_published_by_date_2(monkeypatch):
         {"date": "2020-05", "events": 1},
         {"date": "2020-06", "events": 1},
     ]
+
+
+def test_ping_latency_is_flat_while_stats_are_running(monkeypatch):
+    get_stats = PersistentStatsRollupRepository.get_stats
+
+    def slow_get_stats(self, start_date, end_date, group_by):
+        time.sleep(1)
+        return get_stats(self, start_date, end_date, group_by)
+
+    monkeypatch.setattr(PersistentStatsRollupRepository, 'get_stats', slow_get_stats)
+
+    # Using the client as a context manager serves every request on one event loop
+    with TestClient(app) as shared_client:
+
+        def ping():
+            start = time.perf_counter()
+            response = shared_client.get('api/ping')
+            assert response.status_code == 200
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            stats = [
+                executor.submit(
+                    shared_client.get,
+                    URI + '?start_date=2022-05-05&end_date=2022-05-07',
+                )
+                for _ in range(8)
+            ]
+            time.sleep(0.1)
+            pings = [executor.submit(ping) for _ in range(100)]
+            latencies = sorted(future.result() for future in pings)
+            responses = [future.result() for future in stats]
+
+    assert all(response.status_code == 200 for response in responses)
+    p99 = latencies[98]
+    assert p99 < 0.25
+
+
+def create_activity(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 4, 'hour': 2})
+    organizer = create_organizer()
+    user = create_user()
+    events = [
+        create_event({"date": date, "organizer": organizer["id"]})
+        for date in ["2022-05-07", "2022-05-10", "2022-05-10", "2022-05-10"]
+    ]
+    for event in events[:3]:
+        client.put(f'api/events/{event["id"]}/publish')
+    response = client.post(
+        'api/bookings', json={"event_id": events[1]["id"], "reserver_id": user["id"]}
+    )
+    booking = response.json()
+
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 6, 'hour': 15})
+    client.put(f'api/events/{events[2]["id"]}/suspend')
+    client.put(f'api/events/{events[3]["id"]}/cancel')
+    client.put(
+        f'api/bookings/{booking["id"]}/verify', json={"event_id": events[1]["id"]}
+    )
+    client.post(
+        "api/complaints",
+        json={
+            "event_id": events[1]['id'],
+            "complainer_id": user['id'],
+            "type": "Spam",
+            "description": "description",
+        },
+    )
+
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 8, 'hour': 16})
+    FinalizeEventsCommand(event_repository, rollup_repository).execute()
+
+
+def test_stats_rollups_match_raw_stats(monkeypatch):
+    create_activity(monkeypatch)
+
+    response = client.get(
+        URI + '/rollups/check?start_date=2022-05-01&end_date=2022-05-31'
+    )
+    assert response.status_code == 200
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+    response = client.get(URI + '?start_date=2022-05-01&end_date=2022-05-31')
+    data = response.json()
+    assert data["event_states"] == {
+        "Borrador": 0,
+        "Publicado": 1,
+        "Cancelado": 1,
+        "Finalizado": 1,
+        "Suspendido": 1,
+    }
+    assert data["verified_bookings"] == [{"date": "2022-05-06", "bookings": 1}]
+    assert data["complaints_by_time"] == [{"date": "2022-05", "complaints": 1}]
+
+
+def test_stats_rollups_rebuild_repairs_drift(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+    expected = client.get(URI + params).json()
+    db['StatsRollups'].drop()
+
+    response = client.get(URI + '/rollups/check' + params)
+    assert response.json()["consistent"] is False
+    assert "event_states" in response.json()["mismatches"]
+
+    response = client.post(URI + '/rollups/rebuild')
+    assert response.status_code == 200
+    assert response.json()["days"] > 0
+    assert client.get(URI + params).json() == expected
+    response = client.get(URI + '/rollups/check' + params)
+    assert response.json()["consistent"] is True
+
+
+def test_stats_rollups_group_verified_bookings_by_hour(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31&group_by=hour'
+
+    response = client.get(URI + params)
+    assert response.json()["verified_bookings"] == [
+        {"date": "2022-05-06 15", "bookings": 1}
+    ]
+    response = client.get(URI + '/rollups/check' + params)
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
+def test_stats_rollups_maintenance_requires_the_admin_token(monkeypatch):
+    monkeypatch.setattr('app.controllers.utils.admin.ADMIN_TOKEN', 'secret')
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+
+    assert client.get(URI + '/rollups/check' + params).status_code == 403
+    assert client.post(URI + '/rollups/rebuild').status_code == 403
+    assert client.post('api/reset').status_code == 403
+    headers = {'X-Admin-Token': 'secret'}
+    response = client.get(URI + '/rollups/check' + params, headers=headers)
+    assert response.status_code == 200
+    response = client.post(URI + '/rollups/rebuild', headers=headers)
+    assert response.status_code == 200
+    assert client.get(URI + params).status_code == 200
+
+
+def test_stats_rollups_escape_organizer_ids(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 4, 'hour': 2})
+    user = create_user()
+    for id in ['org.1', '$org', 'org%2E1']:
+        create_organizer({'id': id, 'email': f'{id}@mail.com'})
+        event = create_event({"date": "2022-05-10", "organizer": id})
+        client.put(f'api/events/{event["id"]}/publish')
+        booking = client.post(
+            'api/bookings', json={"event_id": event["id"], "reserver_id": user["id"]}
+        ).json()
+        client.put(
+            f'api/bookings/{booking["id"]}/verify', json={"event_id": event["id"]}
+        )
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+
+    response = client.get(URI + params)
+    top_organizers = response.json()["top_organizers"]
+    assert sorted(organizer["id"] for organizer in top_organizers) == [
+        '$org',
+        'org%2E1',
+        'org.1',
+    ]
+    response = client.get(URI + '/rollups/check' + params)
+    assert response.json() == {"consistent": True, "mismatches": []}
+    client.post(URI + '/rollups/rebuild')
+    response = client.get(URI + '/rollups/check' + params)
+    assert response.json() == {"consistent": True, "mismatches": []}
+
+
+def test_stats_report_server_timing(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+
+    response = client.get(URI + params)
+    timings = response.headers['Server-Timing'].split(', ')
+    assert [timing.split(';')[0] for timing in timings] == ['rollups', 'organizers']
+
+    response = client.get(URI + '/rollups/check' + params)
+    timings = response.headers['Server-Timing'].split(', ')
+    assert len(timings) == 4
+    assert all(';dur=' in timing for timing in timings)
+
+
+def test_raw_stats_queries_run_concurrently(monkeypatch):
+    create_activity(monkeypatch)
+    queries = [
+        (PersistentEventRepository, 'get_event_stats'),
+        (PersistentBookingRepository, 'get_verified_bookings_stat'),
+        (PersistentComplaintRepository, 'get_complaints_by_time'),
+    ]
+
+    def slowed(query):
+        def slow_query(self, *args):
+            time.sleep(0.3)
+            return query(self, *args)
+
+        return slow_query
+
+    for repository, query in queries:
+        monkeypatch.setattr(repository, query, slowed(getattr(repository, query)))
+
+    start = time.perf_counter()
+    response = client.get(
+        URI + '/rollups/check?start_date=2022-05-01&end_date=2022-05-31'
+    )
+    assert time.perf_counter() - start < 0.3 * len(queries) / 2
+    assert response.json()["consistent"] is True
+
+
+def as_dict(stats):
+    return {
+        name: [vars(stat) for stat in value] if isinstance(value, list) else vars(value)
+        for name, value in vars(stats).items()
+    }
+
+
+def test_event_stats_facet_matches_separate_pipelines(monkeypatch):
+    create_activity(monkeypatch)
+    mock_date(monkeypatch, {'year': 2022, 'month': 6, 'day': 2, 'hour': 2})
+    event = create_event({"date": "2022-06-10", "organizer": "123"})
+    client.put(f'api/events/{event["id"]}/publish')
+    client.put(f'api/events/{event["id"]}/suspend')
+
+    facet = PersistentEventRepository(FACET)
+    separate = PersistentEventRepository("separate")
+    for start, end in [
+        ('2022-05-01', '2022-06-30'),
+        ('2022-05-05', '2022-05-31'),
+        ('2022-06-01', '2022-06-30'),
+        ('2023-01-01', '2023-12-31'),
+    ]:
+        expected = as_dict(separate.get_event_stats(start, end))
+        assert as_dict(facet.get_event_stats(start, end)) == expected
+
+    stats = facet.get_event_stats('2022-05-01', '2022-06-30')
+    assert [vars(stat) for stat in stats.suspended_by_time] == [
+        {'date': '2022-05', 'suspended': 1},
+        {'date': '2022-06', 'suspended': 1},
+    ]
+
+
+def test_top_organizer_names_are_fetched_in_one_query_and_cached(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+
+    response = client.get(URI + params)
+    assert response.headers['X-DB-Operations'] == '2'
+    assert response.json()["top_organizers"] == [
+        {"name": "first_name last_name", "verified_bookings": 1, "id": "123"}
+    ]
+    response = client.get(URI + params)
+    assert response.headers['X-DB-Operations'] == '1'
+
+    client.put(
+        'api/organizers/123', json={"first_name": "renamed", "last_name": "organizer"}
+    )
+    response = client.get(URI + params)
+    assert response.json()["top_organizers"][0]["name"] == "renamed organizer"
+
+
+def test_verified_bookings_are_grouped_in_local_time(monkeypatch):
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 1, 'hour': 2})
+    organizer = create_organizer()
+    event = create_event({"date": "2022-05-20", "organizer": organizer["id"]})
+    client.put(f'api/events/{event["id"]}/publish')
+    bookings = []
+    for i in range(2):
+        user = create_user({"id": f"user{i}", "email": f"user{i}@mail.com"})
+        body = {"event_id": event["id"], "reserver_id": user["id"]}
+        bookings.append(client.post('api/bookings', json=body).json())
+
+    # A saturday night, already sunday in UTC, and the next monday
+    body = {"event_id": event["id"]}
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 7, 'hour': 23, 'min': 30})
+    client.put(f'api/bookings/{bookings[0]["id"]}/verify', json=body)
+    mock_date(monkeypatch, {'year': 2022, 'month': 5, 'day': 9, 'hour': 10})
+    client.put(f'api/bookings/{bookings[1]["id"]}/verify', json=body)
+
+    stored = db['Bookings'].find_one({'_id': bookings[0]["id"]})
+    assert stored['verified_time'] == datetime.datetime(2022, 5, 8, 2, 30)
+
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+    response = client.get(URI + params)
+    assert response.json()["verified_bookings"] == [
+        {"date": "2022-05-07", "bookings": 1},
+        {"date": "2022-05-09", "bookings": 1},
+    ]
+    response = client.get(URI + params + '&group_by=week')
+    assert response.json()["verified_bookings"] == [
+        {"date": "2022-05-02", "bookings": 1},
+        {"date": "2022-05-09", "bookings": 1},
+    ]
+    response = client.get(URI + '/rollups/check' + params + '&group_by=week')
+    assert response.json()["consistent"] is True
+
+
+def test_migrate_builds_missing_rollups(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+    expected = client.get(URI + params).json()
+    db['StatsRollups'].delete_many({})
+
+    migrate()
+    assert client.get(URI + params).json() == expected
+    assert client.get(URI + '/rollups/check' + params).json()["consistent"] is True
+
+
+def test_migrate_dates_rewrites_string_dates(monkeypatch):
+    create_activity(monkeypatch)
+    params = '?start_date=2022-05-01&end_date=2022-05-31'
+    expected = client.get(URI + '/rollups/check' + params).json()
+    assert expected["consistent"] is True
+
+    def day(value, unset):
+        return unset if value is None else str(to_local(value).date())
+
+    # Documents as they were stored before dates were BSON dates
+    for event in db['Events'].find():
+        legacy = {
+            'created_at': day(event['created_at'], None),
+            'published_at': day(event['published_at'], "Not_published"),
+            'suspended_at': day(event['suspended_at'], "Not_suspended"),
+        }
+        db['Events'].update_one({'_id': event['_id']}, {'$set': legacy})
+    for booking in db['Bookings'].find():
+        verified_time = booking['verified_time']
+        if verified_time is None:
+            verified_time = "Not_verified"
+        else:
+            verified_time = to_local(verified_time).strftime('%Y-%m-%d %H:%M')
+        db['Bookings'].update_one(
+            {'_id': booking['_id']}, {'$set': {'verified_time': verified_time}}
+        )
+    for complaint in db['Complaints'].find():
+        db['Complaints'].update_one(
+            {'_id': complaint['_id']}, {'$set': {'date': day(complaint['date'], None)}}
+        )
+    event_repository.clear()
+
+    assert migrate_dates(batch_size=2) == 6
+    assert migrate_dates() == 0
+    assert client.get(URI + '/rollups/check' + params).json() == expected
+    for event in db['Events'].find():
+        assert not isinstance(event['created_at'], str)
+        assert not isinstance(event['published_at'], str)
+        assert not isinstance(event['suspended_at'], str)
@@ -0,0 +1,173 @@
+from fastapi.testclient import TestClient
+import pytest
+from test.utils import mock_date
+
+from app.app import app
+from app.commands.events import RebuildSuggestionsCommand
+from app.repositories.dependencies import (
+    event_repository,
+    organizer_repository,
+    suggestion_repository,
+)
+
+client = TestClient(app)
+
+URI = 'api/events'
+SUGGEST_URI = 'api/events/suggest'
+ORGANIZER_URI = 'api/organizers'
+
+
+@pytest.fixture(autouse=True)
+def clear_db(monkeypatch):
+    # This runs before each test
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 2, "hour": 15})
+
+    yield
+
+    # Ant this runs after each test
+    client.post('api/reset')
+
+
+def create_organizer(fields={}):
+    body = {
+        'first_name': 'Gustavo',
+        'last_name': 'Cerati',
+        'email': 'email@mail.com',
+        'profession': 'profession',
+        'about_me': 'about_me',
+        'profile_picture': 'profile_picture',
+        'id': '123',
+    }
+    for k, v in fields.items():
+        body[k] = v
+    return client.post(ORGANIZER_URI, json=body).json()
+
+
+def create_event(fields={}, publish=True):
+    body = {
+        'name': 'aName',
+        'description': 'aDescription',
+        'location': {
+            'description': 'a location description',
+            'lat': 23.4,
+            'lng': 32.23,
+        },
+        'type': 'Danza',
+        'images': ['image1'],
+        'preview_image': 'preview_image',
+        'date': '2023-03-29',
+        'start_time': '09:00:00',
+        'end_time': '12:00:00',
+        'scan_time': 5,
+        'organizer': '123',
+        'agenda': [
+            {
+                'time_init': '09:00',
+                'time_end': '12:00',
+                'owner': 'Pepe Cibrian',
+                'title': 'Noche de teatro en Bs As',
+                'description': 'Una noche de teatro unica',
+            }
+        ],
+        'vacants': 3,
+        'FAQ': [],
+    }
+    for k, v in fields.items():
+        body[k] = v
+    event = client.post(URI, json=body).json()
+    if publish:
+        client.put(f"{URI}/{event['id']}/publish")
+    return event
+
+
+def suggest(q, limit=None):
+    url = f"{SUGGEST_URI}?q={q}" + (f"&limit={limit}" if limit else "")
+    response = client.get(url)
+    assert response.status_code == 200
+    return [suggestion['text'] for suggestion in response.json()]
+
+
+def test_suggest_published_events_by_word_prefix():
+    event = create_event({"name": "Festival de Gastronomía"})
+
+    response = client.get(f"{SUGGEST_URI}?q=gastro")
+
+    assert response.json() == [
+        {'id': event['id'], 'text': 'Festival de Gastronomía', 'type': 'event'}
+    ]
+    assert suggest("FEST") == ["Festival de Gastronomía"]
+    assert suggest("de gas") == ["Festival de Gastronomía"]
+    assert suggest("rock") == []
+
+
+def test_suggest_does_not_return_draft_events():
+    create_event({"name": "Festival"}, publish=False)
+
+    assert suggest("fest") == []
+
+
+def test_suggest_respects_limit():
+    for i in range(5):
+        create_event({"name": f"Tango {i}"})
+
+    assert len(suggest("tango", limit=3)) == 3
+
+
+def test_suggest_requires_query():
+    assert client.get(SUGGEST_URI).status_code == 422
+
+
+def test_suggest_is_updated_by_event_commands():
+    event = create_event({"name": "Noche de tango"})
+
+    client.put(f"{URI}/{event['id']}", json={"name": "Noche de jazz"})
+    assert suggest("tango") == []
+    assert suggest("jazz") == ["Noche de jazz"]
+
+    client.put(f"{URI}/{event['id']}/suspend")
+    assert suggest("jazz") == []
+
+    client.put(f"{URI}/{event['id']}/unsuspend")
+    assert suggest("jazz") == ["Noche de jazz"]
+
+    client.put(f"{URI}/{event['id']}/cancel")
+    assert suggest("jazz") == []
+
+
+def test_suggest_does_not_return_finished_events(monkeypatch):
+    create_event({"name": "Noche de tango", "date": "2023-02-03"})
+    assert suggest("tango") == ["Noche de tango"]
+
+    mock_date(monkeypatch, {"year": 2023, "month": 2, "day": 4, "hour": 15})
+    assert suggest("tango") == []
+
+
+def test_rebuild_suggestions_loads_events_and_organizers():
+    create_organizer()
+    create_event({"name": "Noche de rock"})
+    create_event({"name": "Noche de tango"}, publish=False)
+    suggestion_repository.replace_all([], [])
+
+    RebuildSuggestionsCommand(
+        event_repository, organizer_repository, suggestion_repository
+    ).execute()
+
+    assert suggest("noche") == ["Noche de rock"]
+    assert suggest("cerati") == ["Gustavo Cerati"]
+    assert client.get(f"{SUGGEST_URI}?q=gus").json()[0]['type'] == 'organizer'
+
+
+def test_suggest_is_updated_when_organizer_is_suspended():
+    create_organizer()
+    create_event({"name": "Noche de rock"})
+    RebuildSuggestionsCommand(
+        event_repository, organizer_repository, suggestion_repository
+    ).execute()
+
+    client.put(f"{ORGANIZER_URI}/123/suspend")
+    assert suggest("noche") == []
+    assert suggest("gustavo") == []
+
+    client.put(f"{ORGANIZER_URI}/123/unsuspend")
+    assert suggest("noche") == ["Noche de rock"]
+    assert suggest("gustavo") == ["Gustavo Cerati"]
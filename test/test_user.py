@@ -102,3 +102,16 @@ def test_create_without_last_name():
     data = response.json()
     assert "id" in data
     assert data['last_name'] == body["first_name"]
+
+
+def test_get_user_does_a_single_db_operation():
+    body = create_user_body()
+    client.post(URI, json=body)
+
+    response = client.get(URI + f"/{body['id']}")
+    assert response.status_code == 200
+    assert response.headers['X-DB-Operations'] == '1'
+
+    response = client.get(URI + "/notexists")
+    assert response.status_code == 404
+    assert response.headers['X-DB-Operations'] == '1'
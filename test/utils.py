@@ -1,4 +1,5 @@
 import copy
+from contextlib import contextmanager
 import datetime
 
 
@@ -31,3 +32,18 @@ def mock_date(monkeypatch, date):
             )
 
     monkeypatch.setattr(datetime, 'datetime', MyDatetime)
+
+
+@contextmanager
+def profile_queries(db):
+    # Collects the plan summary of every operation run against db while active
+    db.command('profile', 0)
+    db.drop_collection('system.profile')
+    db.command('profile', 2)
+    plans = []
+    try:
+        yield plans
+    finally:
+        db.command('profile', 0)
+    profile = db['system.profile'].find({'planSummary': {'$exists': True}})
+    plans.extend(f"{entry['ns']}: {entry['planSummary']}" for entry in profile)